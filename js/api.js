@@ -82,4 +82,19 @@ export function getDictBatchUrl() {
     return `${API_BASE}/api/dict/batch`;
 }
 
+/**
+ * 获取单词卡预加载数据包 API URL（释义 + 例句 + 同词根词汇）
+ */
+export function getDictPreloadUrl() {
+    return `${API_BASE}/api/dict/preload`;
+}
+
+/**
+ * 获取单词卡音频雪碧图 URL
+ * @param {string} [key] - 雪碧图键（省略时返回生成清单的接口）
+ */
+export function getTtsSpriteUrl(key) {
+    return key ? `${API_BASE}/api/tts/sprite/${key}` : `${API_BASE}/api/tts/sprite`;
+}
+
 
@@ -29,6 +29,8 @@ export {
 export {
     pullFromCloud,
     pushToCloud,
+    pullChangesFromCloud,
+    pushDeltaToCloud,
     syncLayoutToCloud
 } from './sync.js';
 
@@ -99,6 +99,84 @@ export async function pushToCloud(data) {
     }
 }
 
+/**
+ * 增量拉取：只获取 since 版本之后的变更
+ * @param {number} since - 上一次 pull/changes/push 返回的 version
+ * 返回 resync: true 时 since 已超出服务端删除记录的保留范围，需改用 pullFromCloud 全量拉取
+ * @returns {Promise<{version?: number, unchanged?: boolean, resync?: boolean, wordcards?: object, folders?: object, deleted?: object, error?: string}>}
+ */
+export async function pullChangesFromCloud(since) {
+    if (!isLoggedIn()) {
+        return { error: '未登录' };
+    }
+
+    try {
+        const response = await fetch(`${API_BASE}/api/sync/changes?since=${encodeURIComponent(since)}`, {
+            method: 'GET',
+            headers: getAuthHeader()
+        });
+
+        if (response.status === 401) {
+            return { error: '登录已过期，请重新登录', needReauth: true };
+        }
+
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => ({}));
+            console.error('[Sync] 增量拉取失败:', errorData);
+            return { error: errorData.error || '同步失败' };
+        }
+
+        const changes = await response.json();
+        if (changes.resync) {
+            console.log(`[Sync] 增量拉取: ${since} 早于删除记录保留范围，需全量同步`);
+        } else if (!changes.unchanged) {
+            console.log(`[Sync] 增量拉取: ${since} -> ${changes.version}`);
+        }
+        return changes;
+    } catch (e) {
+        console.error('[Sync] 网络错误:', e);
+        return { error: '网络错误' };
+    }
+}
+
+/**
+ * 增量推送：只提交发生变化的实体
+ * @param {object} delta - { wordcards, deletedWordcards, folders, deletedFolders, layout }
+ * @returns {Promise<{success: boolean, result?: object, error?: string, statusCode?: number}>}
+ */
+export async function pushDeltaToCloud(delta) {
+    if (!isLoggedIn()) {
+        return { error: '未登录' };
+    }
+
+    setSyncStatus('syncing');
+
+    try {
+        const response = await fetch(`${API_BASE}/api/sync/push/delta`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                ...getAuthHeader()
+            },
+            body: JSON.stringify(delta)
+        });
+
+        if (!response.ok) {
+            console.error(`[Sync] 增量推送失败: ${response.status}`);
+            setSyncStatus('error');
+            return { error: '同步失败', statusCode: response.status };
+        }
+
+        const result = await response.json();
+        setSyncStatus('idle');
+        return { success: true, result };
+    } catch (e) {
+        console.error('[Sync] 网络错误:', e);
+        setSyncStatus('error');
+        return { error: '网络错误' };
+    }
+}
+
 /**
  * 同步布局配置到云端
  * @param {object} layout 布局配置
@@ -22,8 +22,10 @@ import {
 } from './utils.js';
 import {
     getTtsUrl,
-    getDictBatchUrl
+    getTtsSpriteUrl,
+    getDictPreloadUrl
 } from './api.js';
+import { isLoggedIn, getAuthHeader } from './auth/state.js';
 
 // 追踪上一次的 loading 状态
 let wasLoading = false;
@@ -248,12 +250,21 @@ export async function startPreload(forceReload = false) {
     const wordsNeedInfo = entries
         .filter(e => !e.definition && !preloadCache.wordInfo[e.word] && isValidWord(e.word))
         .map(e => e.word);
+    const wordsNeedInfoSet = new Set(wordsNeedInfo);
 
-    // localStorage 缓存已移除，直接从后端 API 获取所有需要的单词
-    const wordsToFetch = wordsNeedInfo;
+    // 预加载数据包：释义（仅未缓存的词）+ 例句 + 词根（仅英文）
+    // 例句对所有有效单词加载（包括自定义释义的单词）
+    const wordsToFetch = [...new Set(entries
+        .map(e => e.word)
+        .filter(word => isValidWord(word) && (wordsNeedInfoSet.has(word) || !preloadCache.examples[word])))];
 
-    // 从 DeepSeek 获取完整单词信息（音标、翻译、释义、例句等）
-    const BATCH_SIZE = 5;
+    preloadCache.examplesTotal = wordsToFetch.length;
+    preloadCache.examplesLoaded = 0;
+    preloadCache.lemmaTotal = 0;
+    preloadCache.lemmaLoaded = 0;
+
+    // 后端一次请求返回释义、例句和词根（集合查询，单批最多 500 个）；分批只为了更新进度
+    const BATCH_SIZE = 100;
 
     const wordInfoPromise = (async () => {
         if (wordsToFetch.length === 0) return;
@@ -266,21 +277,22 @@ export async function startPreload(forceReload = false) {
             const batch = wordsToFetch.slice(i, i + BATCH_SIZE);
             console.log('[请求] 开始请求批次:', batch, 'targetLang:', targetLang, 'translationLang:', translationLang);
 
-            // 请求 DeepSeek 获取完整单词信息
-            let deepseekData = null;
+            let bundle = null;
             try {
-                const detailsRes = await fetch(getDictBatchUrl(), {
+                const res = await fetch(getDictPreloadUrl(), {
                     method: 'POST',
                     headers: { 'Content-Type': 'application/json' },
                     body: JSON.stringify({
                         words: batch,
                         targetLang: targetLang,
-                        nativeLang: translationLang
+                        nativeLang: translationLang,
+                        exampleLimit: 2,
+                        lemmaLimit: 30
                     }),
                     signal
                 });
-                if (detailsRes.ok) {
-                    deepseekData = await detailsRes.json();
+                if (res.ok) {
+                    bundle = await res.json();
                 }
             } catch (e) {
                 console.log('[请求] 请求失败:', e.message);
@@ -289,11 +301,19 @@ export async function startPreload(forceReload = false) {
             if (myId !== preloadCache.loadId) return;
 
             // 处理结果
-            const deepseekResults = deepseekData?.results || {};
+            const results = bundle?.results || {};
             const invalidWords = []; // 收集验证失败的单词
 
             batch.forEach(word => {
-                const info = deepseekResults[word] || {};
+                // 例句（请求失败时不缓存，下次重新加载）
+                if (bundle) {
+                    preloadCache.examples[word] = bundle.examples?.[word] || [];
+                }
+                preloadCache.examplesLoaded++;
+
+                if (!wordsNeedInfoSet.has(word)) return;
+
+                const info = results[word] || {};
 
                 // 检查是否为有道验证失败的单词
                 if (info.error === 'word_not_found') {
@@ -333,6 +353,16 @@ export async function startPreload(forceReload = false) {
                 preloadCache.translationLoaded++;
             });
 
+            // 同词根词汇
+            const lemmaWords = bundle?.lemmaWords || {};
+            Object.entries(lemmaWords).forEach(([lemma, words]) => {
+                if (!preloadCache.lemmaWords[lemma]) {
+                    preloadCache.lemmaWords[lemma] = words;
+                    preloadCache.lemmaTotal++;
+                    preloadCache.lemmaLoaded++;
+                }
+            });
+
             // 显示验证失败的提示
             if (invalidWords.length > 0) {
                 const message = `${invalidWords.length} 个单词验证失败: ${invalidWords.join(', ')}`;
@@ -341,7 +371,6 @@ export async function startPreload(forceReload = false) {
                 console.warn(`[验证] ${message}`);
             }
 
-            // localStorage 缓存已移除，不再保存到本地
             updatePreloadProgress();
         }
     })();
@@ -396,6 +425,45 @@ export async function startPreload(forceReload = false) {
         }
     };
 
+    // 整张卡未缓存的音频先打包为一个雪碧图请求，按字节区间切分为每个单词的 Blob
+    // 雪碧图中缺失的单词仍由下面的逐个加载补齐；生成雪碧图需要登录，未登录时直接逐个加载
+    const loadAudioSprite = async (texts, accent, lang) => {
+        if (!isLoggedIn()) return;
+        const missing = texts.filter(text => !preloadCache.audioUrls[`${text}:${accent}:${lang}`]);
+        if (missing.length < 2) return;
+
+        try {
+            const res = await fetchWithTimeout(getTtsSpriteUrl(), {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json', ...getAuthHeader() },
+                body: JSON.stringify({ words: missing, lang, accent }),
+                signal
+            }, 60000);
+            if (!res.ok) return;
+            const sprite = await res.json();
+
+            const audioRes = await fetchWithTimeout(getTtsSpriteUrl(sprite.key), { signal }, 60000);
+            if (!audioRes.ok) return;
+            const blob = await audioRes.blob();
+
+            if (myId !== preloadCache.loadId) return;
+            for (const item of sprite.items) {
+                const cacheKey = `${item.text}:${accent}:${lang}`;
+                if (preloadCache.audioUrls[cacheKey]) continue;
+
+                const part = blob.slice(item.byteOffset, item.byteOffset + item.byteLength, 'audio/mpeg');
+                preloadCache.audioUrls[cacheKey] = audioBlobManager.create(part, cacheKey);
+                preloadCache.audioPartial[item.text] = (preloadCache.audioPartial[item.text] || 0) + 1;
+                if (preloadCache.audioPartial[item.text] === audioVariants) {
+                    preloadCache.audioLoaded++;
+                }
+            }
+            updatePreloadProgress();
+        } catch (e) {
+            console.warn(`[TTS Sprite] 雪碧图加载失败，改为逐个加载: ${e.message}`);
+        }
+    };
+
     // 并行加载所有音频（限制并发数为 6，避免浏览器连接数耗尽）
     // 只加载正常速度和当前口音（使用上面已声明的 currentAccent）
     const accents = targetLang === 'en' ? [currentAccent] : ['us']; // 只加载当前口音
@@ -436,15 +504,12 @@ export async function startPreload(forceReload = false) {
 
     if (myId !== preloadCache.loadId) return;
 
-    // 收集所有单词用于预加载例句和词根
-    const allWords = entries.map(e => e.word);
-
-    // 并行预加载：音频、例句、词根（仅英文）
-    await Promise.all([
-        promiseAllWithLimit(audioTasks, 6),
-        preloadExamples(allWords, targetLang, signal, myId),
-        targetLang === 'en' ? preloadLemmaWords(allWords, signal, myId) : Promise.resolve()
-    ]);
+    // 并行预加载音频（例句、词根已随预加载数据包返回）
+    if (accents.length === 1) {
+        await loadAudioSprite([...textsToPreload], accents[0], targetLang);
+        if (myId !== preloadCache.loadId) return;
+    }
+    await promiseAllWithLimit(audioTasks, 6);
 
     if (myId === preloadCache.loadId) {
         preloadCache.loading = false;
@@ -452,139 +517,6 @@ export async function startPreload(forceReload = false) {
     }
 }
 
-/**
- * 预加载例句（静默失败）
- */
-async function preloadExamples(words, targetLang, signal, loadId) {
-    if (!words || words.length === 0) return;
-
-    console.log('[Preload Examples] 开始预加载例句，单词数:', words.length);
-    console.log('[Server] 开始预加载例句，单词数:', words.length);
-
-    preloadCache.examplesTotal = words.length;
-    preloadCache.examplesLoaded = 0;
-
-    const tasks = words.map(word => async () => {
-        if (loadId !== preloadCache.loadId) return;
-
-        // 跳过已缓存的
-        if (preloadCache.examples[word]) {
-            preloadCache.examplesLoaded++;
-            return;
-        }
-
-        try {
-            const response = await fetch(
-                `/api/dict/examples/${encodeURIComponent(word)}?lang=${targetLang}&limit=2`,
-                { signal }
-            );
-
-            if (loadId !== preloadCache.loadId) return;
-
-            if (response.ok) {
-                const data = await response.json();
-                if (data.examples && data.examples.length > 0) {
-                    preloadCache.examples[word] = data.examples;
-                    console.log(`[Preload Examples] ✓ 已缓存: ${word}, 例句数=${data.examples.length}`);
-                    console.log(`[Server] ✓ 已缓存例句: ${word}, 例句数=${data.examples.length}`);
-                } else {
-                    preloadCache.examples[word] = [];
-                    console.log(`[Preload Examples] ⚠ 无例句: ${word}`);
-                }
-            } else {
-                console.warn(`[Preload Examples] ✗ 请求失败: ${word}, status=${response.status}`);
-            }
-        } catch (err) {
-            if (err.name !== 'AbortError') {
-                console.warn(`[Preload Examples] ✗ 加载失败: ${word}, error=${err.message}`);
-            }
-        } finally {
-            if (loadId === preloadCache.loadId) {
-                preloadCache.examplesLoaded++;
-                updatePreloadProgress();
-            }
-        }
-    });
-
-    await promiseAllWithLimit(tasks, 6);
-    console.log('[Preload Examples] 预加载完成');
-    console.log('[Server] 例句预加载完成');
-}
-
-/**
- * 预加载同词根词汇（仅英文，静默失败）
- */
-async function preloadLemmaWords(words, signal, loadId) {
-    if (!words || words.length === 0) return;
-
-    console.log('[Preload Lemma] 开始预加载词根，单词数:', words.length);
-    console.log('[Server] 开始预加载词根，单词数:', words.length);
-
-    // 提取所有唯一的 lemma
-    const lemmas = new Set();
-    words.forEach(word => {
-        const wordInfo = preloadCache.wordInfo[word];
-        if (wordInfo?.lemma && wordInfo.lemma !== '-') {
-            lemmas.add(wordInfo.lemma);
-        }
-    });
-
-    const lemmaList = Array.from(lemmas);
-    preloadCache.lemmaTotal = lemmaList.length;
-    preloadCache.lemmaLoaded = 0;
-
-    if (lemmaList.length === 0) {
-        console.log('[Preload Lemma] 无需预加载（无有效词根）');
-        return;
-    }
-
-    const tasks = lemmaList.map(lemma => async () => {
-        if (loadId !== preloadCache.loadId) return;
-
-        // 跳过已缓存的
-        if (preloadCache.lemmaWords[lemma]) {
-            preloadCache.lemmaLoaded++;
-            return;
-        }
-
-        try {
-            const response = await fetch(
-                `/api/dict/lemma/${encodeURIComponent(lemma)}?limit=30`,
-                { signal }
-            );
-
-            if (loadId !== preloadCache.loadId) return;
-
-            if (response.ok) {
-                const data = await response.json();
-                if (data.words && data.words.length > 0) {
-                    preloadCache.lemmaWords[lemma] = data.words;
-                    console.log(`[Preload Lemma] ✓ 已缓存: ${lemma}, 词汇数=${data.words.length}`);
-                    console.log(`[Server] ✓ 已缓存词根: ${lemma}, 词汇数=${data.words.length}`);
-                } else {
-                    preloadCache.lemmaWords[lemma] = [];
-                    console.log(`[Preload Lemma] ⚠ 无词汇: ${lemma}`);
-                }
-            } else {
-                console.warn(`[Preload Lemma] ✗ 请求失败: ${lemma}, status=${response.status}`);
-            }
-        } catch (err) {
-            if (err.name !== 'AbortError') {
-                console.warn(`[Preload Lemma] ✗ 加载失败: ${lemma}, error=${err.message}`);
-            }
-        } finally {
-            if (loadId === preloadCache.loadId) {
-                preloadCache.lemmaLoaded++;
-                updatePreloadProgress();
-            }
-        }
-    });
-
-    await promiseAllWithLimit(tasks, 6);
-    console.log('[Preload Lemma] 预加载完成');
-    console.log('[Server] 词根预加载完成');
-}
-
 // 防抖版本的预加载函数
 export const debouncedPreload = debounce(startPreload, 500);
 
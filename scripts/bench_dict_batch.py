@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+基准测试：/api/dict/batch 词典批量查询
+对比逐词查询（每词 1 次 SQL）与集合查询（每种语言 1 次 SQL）
+从本地词典数据库中取词，每轮前清空 wordinfo 缓存，保证两种方式都实际查库
+用法: python scripts/bench_dict_batch.py [词数]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# 添加 server 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / 'server'))
+
+from dict_db import dict_db
+
+ROUNDS = 10
+
+
+def sample_words(conn, column, count):
+    """从词典中取样词语"""
+    if conn is None:
+        return []
+    rows = conn.execute(f"SELECT {column} FROM words ORDER BY rowid LIMIT ?", (count,)).fetchall()
+    return [row[0] for row in rows]
+
+
+def per_word(words, lang):
+    """旧流程：逐词查询"""
+    return {w: dict_db.lookup_wordinfo(w, lang) for w in words}
+
+
+def batched(words, lang):
+    """新流程：集合查询"""
+    return dict_db.lookup_wordinfo_batch(words, lang)
+
+
+def run(label, func, words, lang):
+    """执行若干轮，统计单轮平均耗时"""
+    elapsed = 0.0
+    for _ in range(ROUNDS):
+        dict_db.wordinfo_cache.clear()
+        start = time.perf_counter()
+        func(words, lang)
+        elapsed += time.perf_counter() - start
+    elapsed = elapsed / ROUNDS * 1000
+    print(f"  {label:<10} 平均耗时: {elapsed:>8.2f} ms")
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    print("=" * 60)
+    print(f"基准测试: dict batch（{count} 个词）")
+    print("=" * 60)
+
+    samples = {
+        'en': sample_words(dict_db.en_conn, 'word', count),
+        'zh': sample_words(dict_db.zh_conn, 'simplified', count),
+    }
+
+    for lang, words in samples.items():
+        if not words:
+            print(f"\n[{lang}] 词典数据库不可用，跳过")
+            continue
+
+        # 结果一致性检查
+        dict_db.wordinfo_cache.clear()
+        expected = {w: r for w, r in per_word(words, lang).items() if r}
+        dict_db.wordinfo_cache.clear()
+        if batched(words, lang) != expected:
+            print(f"\n✗ [{lang}] 集合查询结果与逐词查询不一致")
+            return 1
+
+        print(f"\n[{lang}] {len(words)} 个词，找到 {len(expected)} 个")
+        legacy = run('逐词查询', per_word, words, lang)
+        batch = run('集合查询', batched, words, lang)
+        print(f"  ✓ 加速比: {legacy / batch:.1f}x")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+基准测试：词典词条精确查询
+- 查询计划检查：EXPLAIN QUERY PLAN 断言英文精确查询走 idx_words_lookup_key 索引、
+  中文精确查询走 lookup_keys 主键（简繁体一次查找），均不全表扫描
+- 对比 COLLATE NOCASE 等值查询（BINARY 索引不可用，全表扫描）与归一化查询键索引查找
+查询词为词典中的词条随机改写大小写、撇号和连字符写法，两种方式都应命中
+用法: python scripts/bench_dict_lookup.py [词数]
+"""
+
+import sys
+import json
+import time
+import random
+from pathlib import Path
+
+# 添加 server 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / 'server'))
+
+from dict_db import dict_db
+from lookup_key import normalize_en_key
+
+ROUNDS = 5
+
+
+def sample_words(conn, count):
+    """从词典中取样词条（偏向含撇号、连字符的词）"""
+    rows = conn.execute('''
+        SELECT word FROM words
+        WHERE word LIKE '%''%' OR word LIKE '%-%'
+        ORDER BY random() LIMIT ?
+    ''', (count // 5,)).fetchall()
+    rows += conn.execute("SELECT word FROM words ORDER BY random() LIMIT ?", (count - len(rows),)).fetchall()
+    return [row[0] for row in rows]
+
+
+def vary(word):
+    """改写为用户可能输入的写法：大小写、弯撇号、Unicode 连字符"""
+    variant = random.choice([word.upper(), word.title(), word.capitalize(), word])
+    return variant.replace("'", '’').replace('-', '‐')
+
+
+def query_plan(conn, sql, params):
+    """EXPLAIN QUERY PLAN 的 detail 列"""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def check_plan():
+    """断言英文批量精确查询是索引查找；返回是否通过"""
+    plan = query_plan(dict_db.en_conn, dict_db._en_lookup_sql(), (json.dumps(['apple', "don't"]),))
+    print("查询计划（lookup_key）:")
+    for detail in plan:
+        print(f"  {detail}")
+
+    words_steps = [d for d in plan if 'words' in d.split()]
+    ok = bool(words_steps) and all('idx_words_lookup_key' in d for d in words_steps) \
+        and not any(d.startswith('SCAN words') for d in words_steps)
+    print(f"  {'✓' if ok else '✗'} words 表{'通过 idx_words_lookup_key 索引查找' if ok else '未使用 lookup_key 索引'}")
+
+    plan = query_plan(dict_db.en_conn, "SELECT word FROM words WHERE word = ? COLLATE NOCASE", ('apple',))
+    print("查询计划（COLLATE NOCASE，对照）:")
+    for detail in plan:
+        print(f"  {detail}")
+    return ok
+
+
+def check_zh_plan():
+    """断言中文批量精确查询是 lookup_keys 主键查找 + rowid 定位；返回是否通过"""
+    if not dict_db.zh_conn:
+        print("⚠ 中文词典数据库不可用，跳过中文查询计划检查")
+        return True
+    if not dict_db.zh_has_lookup_key:
+        print("✗ 中文查询键表不可用，请先运行: python scripts/build_lookup_key.py zh")
+        return False
+
+    plan = query_plan(dict_db.zh_conn, dict_db._zh_lookup_sql(), (json.dumps(['学习', '學習']),))
+    print("查询计划（中文 lookup_keys）:")
+    for detail in plan:
+        print(f"  {detail}")
+
+    ok = any(d.startswith('SEARCH k USING PRIMARY KEY') for d in plan) \
+        and any(d.startswith('SEARCH w USING INTEGER PRIMARY KEY') for d in plan) \
+        and not any(d.startswith('SCAN k') or d.startswith('SCAN w') or 'TEMP B-TREE' in d for d in plan)
+    print(f"  {'✓' if ok else '✗'} {'主键查找，简繁体一次定位' if ok else '未使用 lookup_keys 主键'}")
+    return ok
+
+
+def nocase(words):
+    """旧流程：逐词 COLLATE NOCASE 查询"""
+    cursor = dict_db.en_conn.cursor()
+    found = 0
+    for word in words:
+        key = word.replace('’', "'").replace('‐', '-')
+        cursor.execute("SELECT word FROM words WHERE word = ? COLLATE NOCASE", (key,))
+        found += cursor.fetchone() is not None
+    return found
+
+
+def lookup_key(words):
+    """新流程：逐词按归一化查询键索引查询"""
+    found = 0
+    for word in words:
+        found += word in dict_db._query_english_rows([word])
+    return found
+
+
+def run(label, func, words):
+    """执行若干轮，统计单词平均耗时"""
+    elapsed = 0.0
+    found = 0
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        found = func(words)
+        elapsed += time.perf_counter() - start
+    per_word = elapsed / ROUNDS / len(words) * 1e6
+    print(f"  {label:<14} 每词 {per_word:>10.1f} µs，命中 {found}/{len(words)}")
+    return per_word
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    print("=" * 60)
+    print(f"基准测试: 英文精确查询（{count} 个词）")
+    print("=" * 60)
+
+    if not dict_db.en_conn:
+        print("✗ 英文词典数据库不可用")
+        return 1
+    if not dict_db.en_has_lookup_key:
+        print("✗ 查询键不可用，请先运行: python scripts/build_lookup_key.py")
+        return 1
+
+    if not check_plan() or not check_zh_plan():
+        return 1
+
+    words = [vary(w) for w in sample_words(dict_db.en_conn, count)]
+    missing = [w for w in words if w not in dict_db._query_english_rows([w])]
+    if missing:
+        print(f"✗ {len(missing)} 个改写后的词未命中，例如: {missing[:5]}"
+              f"（键: {[normalize_en_key(w) for w in missing[:5]]}）")
+        return 1
+
+    print(f"\n{len(words)} 个词（随机改写大小写、撇号、连字符）")
+    legacy = run('COLLATE NOCASE', nocase, words)
+    current = run('lookup_key', lookup_key, words)
+    print(f"  ✓ 加速比: {legacy / current:.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
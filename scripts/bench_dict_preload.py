@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+基准测试：单词卡预加载
+对比前端原有的请求扇出（/api/dict/batch 每 5 个词一次 + 每词一次 /api/dict/examples
++ 每个词根一次 /api/dict/lemma）与一次 /api/dict/preload 数据包请求
+通过 Flask test client 调用，统计请求数和总耗时（不含网络往返，实际差距更大；TTS 音频不在比较范围内）
+用法: python scripts/bench_dict_preload.py [词数]
+"""
+
+import io
+import os
+import sys
+import time
+import tempfile
+import contextlib
+from pathlib import Path
+
+# 使用临时用户数据库，避免污染真实数据
+os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(), 'bench_user_data.db')
+
+# 添加 server 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / 'server'))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from app import app
+    from dict_db import dict_db
+
+ROUNDS = 5
+LEGACY_BATCH_SIZE = 5
+
+
+def fan_out(client, words):
+    """原流程：分批释义 + 每词例句 + 每个词根一次请求"""
+    requests_made = 0
+    results = {}
+    for i in range(0, len(words), LEGACY_BATCH_SIZE):
+        res = client.post('/api/dict/batch', json={'words': words[i:i + LEGACY_BATCH_SIZE], 'targetLang': 'en'})
+        results.update(res.get_json()['results'])
+        requests_made += 1
+
+    for word in words:
+        client.get(f'/api/dict/examples/{word}?lang=en&limit=2')
+        requests_made += 1
+
+    lemmas = {info.get('lemma') for info in results.values() if info.get('lemma') and info['lemma'] != '-'}
+    for lemma in lemmas:
+        client.get(f'/api/dict/lemma/{lemma}?limit=30')
+        requests_made += 1
+    return requests_made
+
+
+def bundle(client, words):
+    """新流程：一次预加载数据包请求"""
+    client.post('/api/dict/preload', json={'words': words, 'targetLang': 'en', 'exampleLimit': 2, 'lemmaLimit': 30})
+    return 1
+
+
+def run(label, func, client, words):
+    """每轮清空服务端缓存后执行，统计平均耗时"""
+    elapsed = 0.0
+    requests_made = 0
+    for _ in range(ROUNDS):
+        dict_db.wordinfo_cache.clear()
+        dict_db.examples_cache.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            requests_made = func(client, words)
+            elapsed += time.perf_counter() - start
+    elapsed = elapsed / ROUNDS * 1000
+    print(f"  {label:<10} 请求数: {requests_made:>5}  平均耗时: {elapsed:>8.2f} ms")
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    if not dict_db.en_conn:
+        print("✗ 英文词典数据库不可用")
+        return 1
+
+    words = [r[0] for r in dict_db.en_conn.execute(
+        "SELECT word FROM words WHERE frequency > 0 ORDER BY frequency LIMIT ?", (count,))]
+
+    print("=" * 60)
+    print(f"基准测试: 单词卡预加载（{len(words)} 个英文单词）")
+    print("=" * 60)
+
+    client = app.test_client()
+    legacy = run('请求扇出', fan_out, client, words)
+    single = run('预加载包', bundle, client, words)
+    print(f"\n✓ 加速比: {legacy / single:.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+基准测试：/api/dict/search 自动补全
+模拟逐键输入：从词典中取样词语，依次查询其每个前缀（英文、汉字、无声调拼音）
+统计前缀索引查询的 p50 / p99 延迟，并与原 LIKE 查询对比
+用法: python scripts/bench_dict_search.py [取样词数]
+"""
+
+import sys
+import time
+import random
+from pathlib import Path
+
+# 添加 server 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / 'server'))
+
+from dict_db import dict_db
+from prefix_index import normalize_pinyin
+
+
+def keystroke_prefixes(words, max_len=8):
+    """每个词的逐键前缀"""
+    prefixes = []
+    for word in words:
+        for i in range(1, min(len(word), max_len) + 1):
+            prefixes.append(word[:i])
+    return prefixes
+
+
+def percentile(samples, p):
+    """百分位数（毫秒）"""
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+
+
+def measure(label, func, prefixes):
+    """逐个查询并统计延迟分布"""
+    samples = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        func(prefix)
+        samples.append(time.perf_counter() - start)
+    print(f"  {label:<14} 查询数: {len(samples):>6}  p50: {percentile(samples, 0.5):>7.3f} ms  "
+          f"p99: {percentile(samples, 0.99):>7.3f} ms  max: {max(samples) * 1000:>7.3f} ms")
+
+
+def legacy_like(conn, column):
+    """原实现：LIKE 前缀查询"""
+    def run(prefix):
+        return conn.execute(f"SELECT {column} FROM words WHERE {column} LIKE ? LIMIT 20",
+                            (f'{prefix}%',)).fetchall()
+    return run
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    random.seed(42)
+
+    print("=" * 60)
+    print(f"基准测试: dict search（取样 {count} 个词，逐键前缀）")
+    print("=" * 60)
+
+    cases = []
+    if dict_db.en_conn:
+        words = [r[0] for r in dict_db.en_conn.execute("SELECT word FROM words")]
+        cases.append(('en', 'en', keystroke_prefixes(random.sample(words, min(count, len(words)))),
+                      legacy_like(dict_db.en_conn, 'word')))
+    if dict_db.zh_conn:
+        rows = dict_db.zh_conn.execute("SELECT simplified, pinyin FROM words").fetchall()
+        sample = random.sample(rows, min(count, len(rows)))
+        cases.append(('zh 汉字', 'zh', keystroke_prefixes([r[0] for r in sample]),
+                      legacy_like(dict_db.zh_conn, 'simplified')))
+        cases.append(('zh 拼音', 'zh', keystroke_prefixes([normalize_pinyin(r[1]) for r in sample]),
+                      legacy_like(dict_db.zh_conn, 'pinyin')))
+
+    for label, lang, prefixes, legacy in cases:
+        print(f"\n[{label}]")
+        start = time.perf_counter()
+        dict_db.search_prefix(prefixes[0], lang)  # 触发索引加载
+        print(f"  索引加载: {(time.perf_counter() - start) * 1000:.0f} ms")
+        measure('LIKE 查询', legacy, prefixes)
+        measure('前缀索引', lambda p: dict_db.search_prefix(p, lang), prefixes)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
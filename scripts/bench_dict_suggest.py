@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+基准测试：英文拼写建议（SymSpell 对称删除索引）
+- 正确性：与逐个候选词计算编辑距离的暴力搜索结果比对（前 SUGGEST_LIMIT 个建议应一致）
+- 耗时：单词查询、批量查询的每词平均耗时
+查询词为词典中的候选词随机做 1~2 次编辑（插入、删除、替换、相邻交换）
+用法: python scripts/bench_dict_suggest.py [词数]
+"""
+
+import sys
+import time
+import random
+from pathlib import Path
+
+# 添加 server 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / 'server'))
+
+from dict_db import dict_db
+from constants import SUGGEST_LIMIT
+from spelling import MAX_EDIT_DISTANCE, edit_distance
+
+ROUNDS = 5
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def load_candidates(index):
+    """索引中的全部候选词 [(查询键, 原词)]，按词频从高到低"""
+    return [index.term(term_id) for term_id in range(index.num_terms)]
+
+
+def misspell(word, rng):
+    """随机做 1~2 次编辑"""
+    for _ in range(rng.randint(1, MAX_EDIT_DISTANCE)):
+        i = rng.randrange(len(word))
+        op = rng.choice('idst')
+        if op == 'i':
+            word = word[:i] + rng.choice(LETTERS) + word[i:]
+        elif op == 'd' and len(word) > 2:
+            word = word[:i] + word[i + 1:]
+        elif op == 's':
+            word = word[:i] + rng.choice(LETTERS) + word[i + 1:]
+        elif op == 't' and i + 1 < len(word):
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word
+
+
+def brute_force(key, candidates):
+    """暴力搜索：对每个候选词计算编辑距离（不含查询词本身）"""
+    ranked = []
+    for rank, (term_key, word) in enumerate(candidates):
+        distance = edit_distance(key, term_key)
+        if 0 < distance <= MAX_EDIT_DISTANCE:
+            ranked.append((distance, rank, word))
+    return [word for _, _, word in sorted(ranked)[:SUGGEST_LIMIT]]
+
+
+def run(label, func, words):
+    """执行若干轮，统计单词平均耗时"""
+    elapsed = 0.0
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        func(words)
+        elapsed += time.perf_counter() - start
+    per_word = elapsed / ROUNDS / len(words) * 1e6
+    print(f"  {label:<10} 每词 {per_word:>10.1f} µs")
+    return per_word
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    print("=" * 60)
+    print(f"基准测试: 英文拼写建议（{count} 个词）")
+    print("=" * 60)
+
+    if not dict_db.en_conn:
+        print("✗ 英文词典数据库不可用")
+        return 1
+    if dict_db.spelling is None:
+        print("✗ 拼写建议索引不可用，请先运行: python scripts/build_spelling.py")
+        return 1
+
+    rng = random.Random(0)
+    candidates = load_candidates(dict_db.spelling)
+    originals = [key for key, _ in rng.sample(candidates, min(count, len(candidates)))]
+    words = [misspell(word, rng) for word in originals]
+
+    suggestions = dict_db.suggest_batch(words)
+    mismatches = [w for w in words if suggestions[w] != brute_force(w, candidates)]
+    recall = sum(o in suggestions[w] for o, w in zip(originals, words))
+    print(f"\n{len(words)} 个拼写错误的词，{len(candidates):,} 个候选词")
+    print(f"  {'✓' if not mismatches else '✗'} 与暴力搜索一致: {len(words) - len(mismatches)}/{len(words)}"
+          + (f"，例如: {mismatches[:5]}" if mismatches else ''))
+    print(f"  原词出现在建议中: {recall}/{len(words)}")
+
+    brute = run('暴力搜索', lambda ws: [brute_force(w, candidates) for w in ws[:20]], words[:20])
+    single = run('逐词', lambda ws: [dict_db.suggest(w) for w in ws], words)
+    run('批量', dict_db.suggest_batch, words)
+    print(f"  ✓ 加速比（逐词 vs 暴力搜索）: {brute / single:.0f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
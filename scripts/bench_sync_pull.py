@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+基准测试：/api/sync/pull 数据加载
+对比逐表 + N+1 查询的旧流程与单读事务快照（SyncSnapshotRepository）
+在临时数据库中构造大用户数据，统计 SQL 语句数和耗时
+用法: python scripts/bench_sync_pull.py [卡片数] [公开引用数]
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+from pathlib import Path
+
+# 使用临时数据库，避免污染真实数据
+os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(), 'bench_user_data.db')
+
+# 添加 server 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / 'server'))
+
+from db import init_db, get_db
+from repositories import (WordcardRepository, LayoutRepository, FolderRepository,
+                          PublicFolderRepository, SettingsRepository, SyncSnapshotRepository)
+
+ROUNDS = 20
+
+
+class QueryCounter:
+    """通过 sqlite3 trace 回调统计执行的 SQL 语句"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, statement):
+        self.count += 1
+
+
+def seed(card_count, ref_count):
+    """构造测试数据：读者用户 + 发布者用户"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO users (email, password_hash) VALUES ('reader@test', 'x')")
+        reader_id = cursor.lastrowid
+        cursor.execute("INSERT INTO users (email, password_hash) VALUES ('owner@test', 'x')")
+        owner_id = cursor.lastrowid
+
+        words = '\n'.join(f'word{i}' for i in range(30))
+        for user_id in (reader_id, owner_id):
+            cursor.executemany(
+                "INSERT INTO wordcards (user_id, name, words, color) VALUES (?, ?, ?, 'blue')",
+                [(user_id, f'card{i}', words) for i in range(card_count)]
+            )
+
+        reader_cards = [r[0] for r in cursor.execute("SELECT id FROM wordcards WHERE user_id = ?", (reader_id,))]
+        owner_cards = [r[0] for r in cursor.execute("SELECT id FROM wordcards WHERE user_id = ?", (owner_id,))]
+
+        for i in range(max(1, card_count // 20)):
+            cursor.execute("INSERT INTO folders (user_id, name, cards) VALUES (?, ?, ?)",
+                           (reader_id, f'folder{i}', json.dumps(reader_cards[i * 20:(i + 1) * 20])))
+
+        for i in range(ref_count):
+            cursor.execute("INSERT INTO folders (user_id, name, cards, is_public) VALUES (?, ?, ?, TRUE)",
+                           (owner_id, f'public{i}', json.dumps(owner_cards[i % card_count:i % card_count + 10])))
+            cursor.execute("""
+                INSERT INTO public_folders (user_id, folder_id, owner_id, owner_name, display_name)
+                VALUES (?, ?, ?, 'owner@test', ?)
+            """, (reader_id, cursor.lastrowid, owner_id, f'ref{i}'))
+
+        cursor.execute("INSERT INTO layout (user_id, layout) VALUES (?, ?)",
+                       (reader_id, json.dumps([f'card_{c}' for c in reader_cards])))
+        cursor.execute("INSERT INTO user_settings (user_id) VALUES (?)", (reader_id,))
+    return reader_id
+
+
+def legacy_pull(user_id):
+    """旧流程：逐表查询 + 每个公开引用 1 次文件夹查询和最多 4 次卡片查询"""
+    wordcards = WordcardRepository.get_all_by_user(user_id)
+    layout = LayoutRepository.get_by_user(user_id)
+    folders = FolderRepository.get_all_by_user(user_id)
+
+    with get_db() as conn:
+        refs = conn.execute("SELECT * FROM public_folders WHERE user_id = ?", (user_id,)).fetchall()
+    public_folders = []
+    for row in refs:
+        folder = FolderRepository.get_by_id(row['folder_id'])
+        preview = []
+        if folder and folder['is_public']:
+            for card_id in folder['cards'][:4]:
+                card = WordcardRepository.get_by_id(folder['user_id'], card_id)
+                if card:
+                    preview.append({'id': card['id'], 'name': card['name'], 'color': card['color']})
+        public_folders.append(preview)
+
+    settings = SettingsRepository.get_by_user(user_id)
+    return wordcards, layout, folders, public_folders, settings
+
+
+def run(label, func, user_id, counter):
+    """执行若干轮并统计单次平均语句数和耗时"""
+    func(user_id)  # 预热
+    counter.count = 0
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(user_id)
+    elapsed = (time.perf_counter() - start) / ROUNDS * 1000
+    print(f"  {label:<12} 语句数: {counter.count / ROUNDS:>7.1f}  平均耗时: {elapsed:>8.2f} ms")
+    return elapsed
+
+
+def main():
+    card_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    ref_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    print("=" * 60)
+    print(f"基准测试: sync pull（{card_count} 张卡片，{ref_count} 个公开引用）")
+    print("=" * 60)
+
+    init_db()
+    user_id = seed(card_count, ref_count)
+
+    # 单线程下连接池始终复用同一连接，在其上挂 trace 回调即可统计所有语句
+    counter = QueryCounter()
+    with get_db() as conn:
+        conn.set_trace_callback(counter)
+
+    legacy = run('旧流程', legacy_pull, user_id, counter)
+    snapshot = run('快照加载', SyncSnapshotRepository.load, user_id, counter)
+
+    print(f"\n✓ 加速比: {legacy / snapshot:.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
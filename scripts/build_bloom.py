@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+构建词典布隆过滤器
+对英文、中文词典的全部词条查询键（与服务端查询使用同一归一化规则）生成布隆过滤器，
+服务端启动时 mmap 映射，确定不在词典中的词直接返回默认释义，不查询 SQLite
+
+- 输出 data/databases/en_dict.bloom、zh_dict.bloom（与词典数据库同目录）
+- 英文同时收录词形索引（lemma_forms）中的词形，词典外的词形变化仍能回退到词根词条
+- 文件头记录查询键版本和源词条数（英文含词形数），与词典不一致时服务端不使用该过滤器（避免漏判）
+- 构建后用随机的非词条字符串实测误判率
+
+由 build_en_dict.py / build_dict.py 在最后一步调用，也可单独运行：
+用法: python scripts/build_bloom.py [en|zh] [--fp-rate 0.01]
+"""
+
+import sys
+import time
+import random
+import sqlite3
+from pathlib import Path
+
+# 添加 server 目录到路径（共用归一化逻辑和过滤器实现）
+sys.path.insert(0, str(Path(__file__).parent.parent / 'server'))
+
+from bloom import BloomFilter
+from lookup_key import LOOKUP_KEY_VERSION, normalize_en_key, normalize_zh_key
+
+# 路径配置
+DB_DIR = Path(__file__).parent.parent / 'data' / 'databases'
+DICT_DBS = {
+    'en': DB_DIR / 'en_dict.db',
+    'zh': DB_DIR / 'zh_dict.db',
+}
+
+DEFAULT_FP_RATE = 0.01
+# 实测误判率使用的随机探测串数量
+PROBE_COUNT = 100000
+
+
+def bloom_path(db_path):
+    """词典数据库对应的过滤器文件路径"""
+    return Path(db_path).with_suffix('.bloom')
+
+
+class BloomBuilder:
+    """布隆过滤器构建器"""
+
+    def __init__(self, db_path, lang, fp_rate=DEFAULT_FP_RATE):
+        self.db_path = db_path
+        self.lang = lang
+        self.fp_rate = fp_rate
+        self.conn = None
+        self.has_lemma_forms = False
+
+    def connect(self):
+        """连接数据库（只读）"""
+        self.conn = sqlite3.connect(f"{Path(self.db_path).resolve().as_uri()}?mode=ro", uri=True)
+        print(f"✓ 连接数据库: {self.db_path}")
+        if self.lang == 'en':
+            self.has_lemma_forms = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'lemma_forms'").fetchone() is not None
+
+    def iter_keys(self):
+        """词典中全部词条的查询键（中文简体、繁体各一个）"""
+        if self.lang == 'en':
+            for (word,) in self.conn.execute('SELECT word FROM words'):
+                key = normalize_en_key(word or '')
+                if key:
+                    yield key
+            if self.has_lemma_forms:
+                for (form_key,) in self.conn.execute('SELECT form_key FROM lemma_forms'):
+                    yield form_key
+        else:
+            for simplified, traditional in self.conn.execute('SELECT simplified, traditional FROM words'):
+                for word in {simplified, traditional}:
+                    key = normalize_zh_key(word or '')
+                    if key:
+                        yield key
+
+    def build(self):
+        """生成过滤器，返回 BloomFilter"""
+        rows = self.conn.execute('SELECT COUNT(*) FROM words').fetchone()[0]
+        if self.has_lemma_forms:
+            rows += self.conn.execute('SELECT COUNT(*) FROM lemma_forms').fetchone()[0]
+        capacity = rows
+        if self.lang == 'zh':
+            # 繁体与简体不同的词条各占两个键
+            capacity += self.conn.execute(
+                'SELECT COUNT(*) FROM words WHERE traditional IS NOT NULL AND traditional <> simplified'
+            ).fetchone()[0]
+        bloom = BloomFilter.create(capacity, self.fp_rate, key_version=LOOKUP_KEY_VERSION, source_rows=rows)
+        print(f"生成布隆过滤器（{rows:,} 个词条，目标误判率 {self.fp_rate:.2%}，"
+              f"{bloom.size_bytes() / 1024:,.0f} KB，{bloom.num_hashes} 个哈希函数）...")
+
+        start = time.time()
+        for count, key in enumerate(self.iter_keys(), 1):
+            bloom.add(key)
+            if count % 100000 == 0:
+                print(f"  已加入 {count:,} 个键...", end='\r')
+        print(f"\n✓ 过滤器生成完成，共 {bloom.num_keys:,} 个键，耗时 {time.time() - start:.1f}s")
+        return bloom
+
+    def _random_probe(self, rng):
+        """随机探测串（英文为小写字母串，中文为常用汉字区间的 2~4 字组合）"""
+        if self.lang == 'en':
+            return ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 12)))
+        return ''.join(chr(rng.randint(0x4E00, 0x9FA5)) for _ in range(rng.randint(2, 4)))
+
+    def _in_dict(self, key):
+        """探测串是否确实是词条"""
+        if self.lang == 'en':
+            sql = 'SELECT 1 FROM words WHERE word = ?'
+            params = (key,)
+            if self.has_lemma_forms:
+                sql += ' UNION ALL SELECT 1 FROM lemma_forms WHERE form_key = ?'
+                params = (key, key)
+        else:
+            sql = 'SELECT 1 FROM words WHERE simplified = ? OR traditional = ?'
+            params = (key, key)
+        return self.conn.execute(sql, params).fetchone() is not None
+
+    def measure(self, bloom):
+        """用随机非词条字符串实测误判率"""
+        rng = random.Random(0)
+        probes = 0
+        false_positives = 0
+        while probes < PROBE_COUNT:
+            key = self._random_probe(rng)
+            if key not in bloom:
+                probes += 1
+            elif not self._in_dict(key):
+                probes += 1
+                false_positives += 1
+
+        measured = false_positives / probes
+        print(f"✓ 误判率: 实测 {measured:.3%}（{false_positives}/{probes} 个随机非词条），"
+              f"理论 {bloom.expected_fp_rate():.3%}")
+        return measured
+
+    def run(self):
+        """完整构建流程"""
+        self.connect()
+        bloom = self.build()
+        self.measure(bloom)
+        path = bloom_path(self.db_path)
+        bloom.save(path)
+        print(f"✓ 已写入: {path}")
+        self.close()
+
+    def close(self):
+        """关闭数据库"""
+        if self.conn:
+            self.conn.close()
+
+
+def main():
+    """主函数"""
+    args = sys.argv[1:]
+    fp_rate = DEFAULT_FP_RATE
+    if '--fp-rate' in args:
+        index = args.index('--fp-rate')
+        fp_rate = float(args[index + 1])
+        del args[index:index + 2]
+    langs = args or ['en', 'zh']
+
+    print("=" * 60)
+    print("构建词典布隆过滤器")
+    print("=" * 60)
+
+    for lang in langs:
+        db_path = DICT_DBS.get(lang)
+        if db_path is None:
+            print(f"✗ 不支持的语言: {lang}（可选: en, zh）")
+            return 1
+        if not db_path.exists():
+            print(f"⚠ 词典数据库不存在，跳过: {db_path}")
+            continue
+
+        print(f"\n[{lang}]")
+        BloomBuilder(db_path, lang, fp_rate).run()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
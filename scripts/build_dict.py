@@ -171,6 +171,27 @@ def main():
 
         zh_builder.close()
 
+        # 查询键表（简繁体统一查找）
+        try:
+            from build_lookup_key import LookupKeyBuilder
+            LookupKeyBuilder(ZH_DB, 'zh').run()
+        except Exception as e:
+            print(f"⚠ 查询键生成失败（运行时将按简体/繁体字段查询）: {e}")
+
+        # 预编译 wordinfo
+        try:
+            from build_wordinfo import WordinfoBuilder
+            WordinfoBuilder(ZH_DB, 'zh').run()
+        except Exception as e:
+            print(f"⚠ wordinfo 预编译失败（运行时将实时格式化）: {e}")
+
+        # 词条布隆过滤器
+        try:
+            from build_bloom import BloomBuilder
+            BloomBuilder(ZH_DB, 'zh').run()
+        except Exception as e:
+            print(f"⚠ 布隆过滤器生成失败（运行时未命中的词将查询数据库）: {e}")
+
         print("=" * 60)
         print("✓ 中文词典构建完成（含扩展数据）！")
         print("=" * 60)
@@ -241,6 +241,16 @@ def main():
     print("=" * 60)
     print()
 
+    # 归一化查询键（服务端精确查询只走该索引）
+    try:
+        print("1. 生成查询键...")
+        from build_lookup_key import LookupKeyBuilder
+        LookupKeyBuilder(EN_DB, 'en').run()
+        print()
+    except Exception as e:
+        print(f"⚠ 查询键生成失败（运行时将按小写词条查询）: {e}")
+        print()
+
     # 集成 Lemma 词根数据
     try:
         print("2. 集成 Lemma 词根数据...")
@@ -249,6 +259,7 @@ def main():
         lemma.connect()
         lemma.add_lemma_columns()
         lemma.integrate_lemma(SOURCE_DIR.parent / 'auxiliary' / 'lemma.en.txt')
+        lemma.build_form_index()
         lemma.create_index()
         lemma.close()
         print()
@@ -256,6 +267,36 @@ def main():
         print(f"⚠ Lemma 集成失败: {e}")
         print()
 
+    # 预编译 wordinfo（必须在所有源字段写入之后）
+    try:
+        print("3. 预编译 wordinfo...")
+        from build_wordinfo import WordinfoBuilder
+        WordinfoBuilder(EN_DB, 'en').run()
+        print()
+    except Exception as e:
+        print(f"⚠ wordinfo 预编译失败（运行时将实时格式化）: {e}")
+        print()
+
+    # 拼写建议索引
+    try:
+        print("4. 生成拼写建议索引...")
+        from build_spelling import SpellingBuilder
+        SpellingBuilder(EN_DB).run()
+        print()
+    except Exception as e:
+        print(f"⚠ 拼写建议索引生成失败（未找到的词不返回建议）: {e}")
+        print()
+
+    # 词条布隆过滤器（必须在词条全部写入之后）
+    try:
+        print("5. 生成布隆过滤器...")
+        from build_bloom import BloomBuilder
+        BloomBuilder(EN_DB, 'en').run()
+        print()
+    except Exception as e:
+        print(f"⚠ 布隆过滤器生成失败（运行时未命中的词将查询数据库）: {e}")
+        print()
+
     print("=" * 60)
     print("✓ 英文词典构建完成（含扩展数据）！")
     print("=" * 60)
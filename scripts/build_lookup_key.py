@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+构建词典查询键
+服务端所有精确查询都通过查询键索引一次定位（等值匹配，不依赖 COLLATE NOCASE 或多个条件的 OR）
+
+- 英文：words.lookup_key 字段（NFKC、casefold、统一撇号和连字符）+ idx_words_lookup_key 索引
+- 中文：lookup_keys(lookup_key, priority, word_rowid) 表，简体（priority 0）和繁体（priority 1）
+  各一行，主键即覆盖索引（WITHOUT ROWID），一次查找即得到词条 rowid，简体匹配优先
+  lookup_keys 引用 words 的 rowid，words 表重建或 VACUUM 后需要重新运行本脚本
+
+- 归一化逻辑与服务端共用（server/lookup_key.py）
+- 构建信息写入 build_info 表（lookup_key_version），归一化规则变化后服务端识别为过期并回退
+
+由 build_en_dict.py / build_dict.py 在导入词条后调用，也可对已有词典单独运行：
+用法: python scripts/build_lookup_key.py [en|zh]
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+# 添加 server 目录到路径（共用归一化逻辑）
+sys.path.insert(0, str(Path(__file__).parent.parent / 'server'))
+
+from lookup_key import LOOKUP_KEY_VERSION, normalize_en_key, normalize_zh_key
+
+# 路径配置
+DB_DIR = Path(__file__).parent.parent / 'data' / 'databases'
+DICT_DBS = {
+    'en': DB_DIR / 'en_dict.db',
+    'zh': DB_DIR / 'zh_dict.db',
+}
+
+
+class LookupKeyBuilder:
+    """查询键构建器"""
+
+    def __init__(self, db_path, lang='en'):
+        self.db_path = db_path
+        self.lang = lang
+        self.conn = None
+
+    def connect(self):
+        """连接数据库"""
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        print(f"✓ 连接数据库: {self.db_path}")
+
+    def prepare(self):
+        """添加查询键字段（英文）或查询键表（中文），以及构建信息表"""
+        cursor = self.conn.cursor()
+        if self.lang == 'en':
+            cursor.execute("PRAGMA table_info(words)")
+            if 'lookup_key' not in {row[1] for row in cursor.fetchall()}:
+                cursor.execute('ALTER TABLE words ADD COLUMN lookup_key TEXT')
+                print("✓ 添加 lookup_key 字段")
+        else:
+            cursor.execute('DROP TABLE IF EXISTS lookup_keys')
+            cursor.execute('''
+                CREATE TABLE lookup_keys (
+                    lookup_key TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    word_rowid INTEGER NOT NULL,
+                    PRIMARY KEY (lookup_key, priority, word_rowid)
+                ) WITHOUT ROWID
+            ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS build_info (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+        self.conn.commit()
+
+    def build_en(self):
+        """逐行生成英文查询键，返回条数"""
+        # 先删除索引，批量写入后再重建
+        self.conn.execute('DROP INDEX IF EXISTS idx_words_lookup_key')
+
+        read_cursor = self.conn.cursor()
+        read_cursor.execute('SELECT rowid, word FROM words')
+
+        count = 0
+        batch = []
+        for rowid, word in read_cursor:
+            batch.append((normalize_en_key(word or ''), rowid))
+            count += 1
+            if len(batch) >= 5000:
+                self.conn.executemany('UPDATE words SET lookup_key = ? WHERE rowid = ?', batch)
+                batch = []
+                print(f"  已生成 {count} 个词条...", end='\r')
+
+        if batch:
+            self.conn.executemany('UPDATE words SET lookup_key = ? WHERE rowid = ?', batch)
+
+        self.conn.execute('CREATE INDEX idx_words_lookup_key ON words(lookup_key)')
+        return count
+
+    def build_zh(self):
+        """生成中文查询键表（简体、繁体各一行），返回词条数"""
+        read_cursor = self.conn.cursor()
+        read_cursor.execute('SELECT rowid, simplified, traditional FROM words')
+
+        count = 0
+        batch = []
+        for rowid, simplified, traditional in read_cursor:
+            keys = {}
+            for priority, word in enumerate((simplified, traditional)):
+                key = normalize_zh_key(word or '')
+                if key:
+                    keys.setdefault(key, priority)
+            batch.extend((key, priority, rowid) for key, priority in keys.items())
+            count += 1
+            if len(batch) >= 5000:
+                self.conn.executemany('INSERT OR IGNORE INTO lookup_keys VALUES (?, ?, ?)', batch)
+                batch = []
+                print(f"  已生成 {count} 个词条...", end='\r')
+
+        if batch:
+            self.conn.executemany('INSERT OR IGNORE INTO lookup_keys VALUES (?, ?, ?)', batch)
+        return count
+
+    def build(self):
+        """生成查询键，返回条数"""
+        print(f"生成查询键（版本 {LOOKUP_KEY_VERSION}）...")
+        count = self.build_en() if self.lang == 'en' else self.build_zh()
+        self.conn.commit()
+        print(f"\n✓ 查询键生成完成，共 {count} 个词条")
+        return count
+
+    def write_build_info(self, count):
+        """写入构建信息（服务端据此判断查询键是否过期）"""
+        self.conn.executemany('INSERT OR REPLACE INTO build_info (key, value) VALUES (?, ?)', [
+            ('lookup_key_version', str(LOOKUP_KEY_VERSION)),
+            ('lookup_key_rows', str(count)),
+        ])
+        self.conn.commit()
+        print(f"✓ 构建信息: 查询键版本 {LOOKUP_KEY_VERSION}")
+
+    def run(self):
+        """完整构建流程"""
+        self.connect()
+        self.prepare()
+        count = self.build()
+        self.write_build_info(count)
+        self.close()
+
+    def close(self):
+        """关闭数据库"""
+        if self.conn:
+            self.conn.close()
+
+
+def main():
+    """主函数"""
+    langs = sys.argv[1:] or ['en', 'zh']
+
+    print("=" * 60)
+    print("构建词典查询键")
+    print("=" * 60)
+
+    for lang in langs:
+        db_path = DICT_DBS.get(lang)
+        if db_path is None:
+            print(f"✗ 不支持的语言: {lang}（可选: en, zh）")
+            return 1
+        if not db_path.exists():
+            print(f"⚠ 词典数据库不存在，跳过: {db_path}")
+            continue
+
+        print(f"\n[{lang}]")
+        LookupKeyBuilder(db_path, lang).run()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+构建英文拼写建议索引（SymSpell 对称删除）
+英文词典未找到的词，服务端据此返回编辑距离 2 以内、按词频排序的"您是不是要找"建议
+
+- 候选词：有词频（frequency > 0）的词条查询键（与服务端查询使用同一归一化规则），
+  同一查询键只保留一个词条（原词与键一致者优先，其次词频高者），按词频排序编号
+- 输出 data/databases/en_dict.spell（与词典数据库同目录），格式见 server/spelling.py
+- 文件头记录查询键版本和源词条数，与词典不一致时服务端不使用该索引
+
+由 build_en_dict.py 在生成查询键之后调用，也可对已有词典单独运行：
+用法: python scripts/build_spelling.py
+"""
+
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+# 添加 server 目录到路径（共用归一化、删除键生成逻辑和索引实现）
+sys.path.insert(0, str(Path(__file__).parent.parent / 'server'))
+
+from lookup_key import LOOKUP_KEY_VERSION, normalize_en_key
+from spelling import SPELLING_INDEX_VERSION, SpellingIndex, is_candidate
+
+# 路径配置
+DB_DIR = Path(__file__).parent.parent / 'data' / 'databases'
+EN_DB = DB_DIR / 'en_dict.db'
+
+
+def spelling_path(db_path):
+    """词典数据库对应的拼写索引文件路径"""
+    return Path(db_path).with_suffix('.spell')
+
+
+class SpellingBuilder:
+    """拼写建议索引构建器"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = None
+
+    def connect(self):
+        """连接数据库（只读）"""
+        self.conn = sqlite3.connect(f"{Path(self.db_path).resolve().as_uri()}?mode=ro", uri=True)
+        print(f"✓ 连接数据库: {self.db_path}")
+
+    def load_terms(self):
+        """候选词 [(查询键, 原词)]，按词频从高到低排列，同一查询键只取排序最靠前的词条"""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT word, frequency FROM words WHERE frequency > 0')
+
+        best = {}
+        for word, frequency in cursor:
+            key = normalize_en_key(word or '')
+            if not is_candidate(key):
+                continue
+            rank = (word != key, frequency)
+            if key not in best or rank < best[key][0]:
+                best[key] = (rank, word)
+
+        ranked = sorted(best.items(), key=lambda item: (item[1][0][1], item[0]))
+        return [(key, word) for key, (_, word) in ranked]
+
+    def build(self):
+        """生成索引文件"""
+        print(f"生成拼写建议索引（版本 {SPELLING_INDEX_VERSION}）...")
+        start = time.time()
+
+        rows = self.conn.execute('SELECT COUNT(*) FROM words').fetchone()[0]
+        terms = self.load_terms()
+        path = spelling_path(self.db_path)
+        count, entries = SpellingIndex.write(path, terms, key_version=LOOKUP_KEY_VERSION, source_rows=rows)
+
+        index = SpellingIndex.load(path)
+        print(f"✓ 拼写建议索引生成完成: {count:,} 个候选词，{entries:,} 个删除变体，"
+              f"{index.size_bytes() / 1024 / 1024:.1f} MB，耗时 {time.time() - start:.1f}s")
+        print(f"✓ 已写入: {path}")
+
+    def run(self):
+        """完整构建流程"""
+        self.connect()
+        self.build()
+        self.close()
+
+    def close(self):
+        """关闭数据库"""
+        if self.conn:
+            self.conn.close()
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("构建英文拼写建议索引")
+    print("=" * 60)
+
+    if not EN_DB.exists():
+        print(f"✗ 数据库不存在: {EN_DB}")
+        print("请先运行: python scripts/build_en_dict.py")
+        return 1
+
+    SpellingBuilder(EN_DB).run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+构建前端静态资源
+- CSS：入口样式表内联本地 @import（外部 @import 提到文件开头）并压缩空白和注释，每个入口一个文件
+- JS：每个 ES 模块按内容哈希命名（不打包，保留模块间的 live binding 和循环依赖），
+  index.html 中注入 import map 把原路径映射到带哈希的路径，并对入口的静态依赖加 modulepreload，
+  首次加载时所有模块并行请求，不再逐层发现依赖
+- 每个文件写出 gzip（以及安装了 brotli 时的 br）预压缩版本
+- 输出 dist/ 目录和 dist/manifest.json，服务端据此直接发送预压缩文件，带哈希的文件设为 immutable
+
+用法: python scripts/build_static.py
+"""
+
+import re
+import sys
+import gzip
+import json
+import time
+import shutil
+import hashlib
+from pathlib import Path
+
+# 可选依赖：brotli
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+BASE_DIR = Path(__file__).parent.parent
+DIST_DIR = BASE_DIR / 'dist'
+MANIFEST_VERSION = 1
+HASH_LENGTH = 10
+
+# 小于该大小的文件不压缩（压缩收益不抵请求头开销）
+MIN_COMPRESS_SIZE = 512
+
+_CSS_IMPORT = re.compile(r'''@import\s+(?:url\(\s*)?['"]?([^'")\s]+)['"]?\s*\)?\s*;''')
+_JS_STATIC_IMPORT = re.compile(
+    r'''^\s*(?:import|export)\b[^'";]*?\bfrom\s*['"]([^'"]+)['"]|^\s*import\s*['"]([^'"]+)['"]''',
+    re.MULTILINE
+)
+_INDEX_CSS = re.compile(r'<link rel="stylesheet" href="(css/[^"]+\.css)">')
+_INDEX_JS = re.compile(r'<script type="module" src="(js/[^"]+\.js)"></script>')
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def hashed_name(rel_path: str, digest: str) -> str:
+    """js/app.js -> js/app.<hash>.js"""
+    stem, dot, ext = rel_path.rpartition('.')
+    return f"{stem}.{digest}.{ext}"
+
+
+# ===================== CSS =====================
+
+def bundle_css(path: Path, seen=None) -> tuple:
+    """递归内联本地 @import，返回 (外部 @import 列表, 样式内容)"""
+    seen = seen if seen is not None else set()
+    if path in seen:
+        return [], ''
+    seen.add(path)
+
+    external = []
+    text = path.read_text(encoding='utf-8')
+
+    def replace(match):
+        target = match.group(1)
+        if re.match(r'^(https?:)?//', target):
+            external.append(match.group(0))
+            return ''
+        child_external, child = bundle_css((path.parent / target).resolve(), seen)
+        external.extend(child_external)
+        return child
+
+    return external, _CSS_IMPORT.sub(replace, text)
+
+
+def minify_css(text: str) -> str:
+    """去注释、合并空白（不改动选择器中的冒号和空格语义）"""
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.DOTALL)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    return text.replace(';}', '}').strip()
+
+
+# ===================== JS =====================
+
+def js_imports(path: Path) -> list:
+    """模块中的静态 import / export from 依赖（相对路径，已解析为绝对路径）"""
+    text = path.read_text(encoding='utf-8')
+    deps = []
+    for match in _JS_STATIC_IMPORT.finditer(text):
+        spec = match.group(1) or match.group(2)
+        if spec.startswith('.'):
+            deps.append((path.parent / spec).resolve())
+    return deps
+
+
+def static_graph(entries: list) -> list:
+    """入口模块的全部静态依赖（深度优先，依赖在前）"""
+    order = []
+    visited = set()
+
+    def visit(path):
+        if path in visited or not path.is_file():
+            return
+        visited.add(path)
+        for dep in js_imports(path):
+            visit(dep)
+        order.append(path)
+
+    for entry in entries:
+        visit(entry)
+    return order
+
+
+# ===================== 输出 =====================
+
+def write_asset(rel_path: str, data: bytes, hashed: bool = True) -> dict:
+    """写出文件及其预压缩版本，返回清单项"""
+    digest = content_hash(data)
+    out_rel = hashed_name(rel_path, digest) if hashed else rel_path
+    out_path = DIST_DIR / out_rel
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_bytes(data)
+
+    encodings = []
+    if len(data) >= MIN_COMPRESS_SIZE:
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(compressed) < len(data):
+            (DIST_DIR / f"{out_rel}.gz").write_bytes(compressed)
+            encodings.append('gzip')
+        if HAS_BROTLI:
+            compressed = brotli.compress(data, quality=11)
+            if len(compressed) < len(data):
+                (DIST_DIR / f"{out_rel}.br").write_bytes(compressed)
+                encodings.append('br')
+
+    return {'path': out_rel, 'hash': digest, 'size': len(data), 'encodings': encodings}
+
+
+def build_index(html: str, files: dict, preload: list) -> str:
+    """改写 index.html：样式表和入口脚本指向带哈希的文件，注入 import map 和 modulepreload"""
+    html = _INDEX_CSS.sub(lambda m: f'<link rel="stylesheet" href="{files[m.group(1)]["path"]}">'
+                          if m.group(1) in files else m.group(0), html)
+
+    imports = {f"./{src}": f"./{entry['path']}" for src, entry in files.items() if src.endswith('.js')}
+    import_map = json.dumps({'imports': imports}, ensure_ascii=False, separators=(',', ':'))
+    head = [f'<script type="importmap">{import_map}</script>']
+    head += [f'<link rel="modulepreload" href="{files[src]["path"]}">' for src in preload]
+
+    # import map 必须出现在第一个模块脚本之前
+    first_module = _INDEX_JS.search(html)
+    if first_module:
+        indent = html[html.rfind('\n', 0, first_module.start()) + 1:first_module.start()]
+        html = html[:first_module.start()] + f'\n{indent}'.join(head) + f'\n{indent}' + html[first_module.start():]
+
+    return _INDEX_JS.sub(lambda m: f'<script type="module" src="{files[m.group(1)]["path"]}"></script>'
+                         if m.group(1) in files else m.group(0), html)
+
+
+def main():
+    print("=" * 60)
+    print("构建前端静态资源")
+    print("=" * 60)
+    if not HAS_BROTLI:
+        print("⚠ brotli 未安装，只生成 gzip 版本（安装方法: pip install brotli）")
+
+    if DIST_DIR.exists():
+        shutil.rmtree(DIST_DIR)
+    DIST_DIR.mkdir(parents=True)
+
+    html = (BASE_DIR / 'index.html').read_text(encoding='utf-8')
+    files = {}
+
+    # 1. CSS 入口
+    raw_size = 0
+    for rel_path in _INDEX_CSS.findall(html):
+        source = BASE_DIR / rel_path
+        external, body = bundle_css(source.resolve())
+        css = '\n'.join(external) + '\n' + minify_css(body) if external else minify_css(body)
+        files[rel_path] = write_asset(rel_path, css.encode('utf-8'))
+        raw_size += len(body.encode('utf-8'))
+    print(f"✓ CSS: {len(files)} 个入口，{raw_size / 1024:.1f} KB -> "
+          f"{sum(f['size'] for f in files.values()) / 1024:.1f} KB")
+
+    # 2. JS 模块
+    js_count = 0
+    for source in sorted((BASE_DIR / 'js').rglob('*.js')):
+        rel_path = source.relative_to(BASE_DIR).as_posix()
+        files[rel_path] = write_asset(rel_path, source.read_bytes())
+        js_count += 1
+
+    entries = [(BASE_DIR / rel).resolve() for rel in _INDEX_JS.findall(html)]
+    preload = [p.relative_to(BASE_DIR.resolve()).as_posix() for p in static_graph(entries)]
+    preload = [rel for rel in preload if rel in files]
+    print(f"✓ JS: {js_count} 个模块，其中 {len(preload)} 个由入口静态引用（modulepreload）")
+
+    # 3. index.html（不带哈希，服务端以 no-cache + ETag 发送）
+    index = write_asset('index.html', build_index(html, files, preload).encode('utf-8'), hashed=False)
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'built_at': time.time(),
+        'index': index,
+        'files': files
+    }
+    (DIST_DIR / 'manifest.json').write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True), encoding='utf-8')
+
+    total = sum(f['size'] for f in files.values())
+    gz_total = sum((DIST_DIR / f"{f['path']}.gz").stat().st_size if 'gzip' in f['encodings'] else f['size']
+                   for f in files.values())
+    print(f"✓ 预压缩: {total / 1024:.1f} KB -> gzip {gz_total / 1024:.1f} KB")
+    print(f"✓ 清单已写入: {DIST_DIR / 'manifest.json'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
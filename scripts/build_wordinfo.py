@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+预编译词典 wordinfo
+将每个词条最终返回给前端的 wordinfo JSON 预先生成到 words.wordinfo 字段，
+运行时 dict_db 直接读取，无需在 Python 中逐词转换格式
+
+- 格式化逻辑与服务端共用（server/dict_format.py），输出确定（键有序、紧凑）
+- 构建信息写入 build_info 表：格式版本、源字段、条数、校验和，服务端据此识别过期的构建
+- 触发器：源字段被修改（如 enhance_word_forms.py）时清空该行 wordinfo，运行时回退到实时格式化
+
+由 build_en_dict.py / build_dict.py 在最后一步调用，也可单独运行：
+用法: python scripts/build_wordinfo.py [en|zh]
+"""
+
+import sqlite3
+import hashlib
+import sys
+from pathlib import Path
+
+# 添加 server 目录到路径（共用格式化逻辑）
+sys.path.insert(0, str(Path(__file__).parent.parent / 'server'))
+
+from dict_format import (WORDINFO_FORMAT_VERSION, wordinfo_source_columns, dump_wordinfo,
+                         chinese_row_to_result, english_row_to_result,
+                         format_chinese_to_wordinfo, format_english_to_wordinfo)
+
+# 路径配置
+DB_DIR = Path(__file__).parent.parent / 'data' / 'databases'
+DICT_DBS = {
+    'en': DB_DIR / 'en_dict.db',
+    'zh': DB_DIR / 'zh_dict.db',
+}
+
+
+class WordinfoBuilder:
+    """wordinfo 预编译器"""
+
+    def __init__(self, db_path, lang):
+        self.db_path = db_path
+        self.lang = lang
+        self.key = 'word' if lang == 'en' else 'simplified'
+        self.conn = None
+
+    def connect(self):
+        """连接数据库"""
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        print(f"✓ 连接数据库: {self.db_path}")
+
+    def get_columns(self):
+        """获取 words 表字段"""
+        cursor = self.conn.cursor()
+        cursor.execute("PRAGMA table_info(words)")
+        return {row[1] for row in cursor.fetchall()}
+
+    def prepare(self):
+        """添加 wordinfo 字段和构建信息表"""
+        cursor = self.conn.cursor()
+        if 'wordinfo' not in self.get_columns():
+            cursor.execute('ALTER TABLE words ADD COLUMN wordinfo TEXT')
+            print("✓ 添加 wordinfo 字段")
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS build_info (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+        self.conn.commit()
+
+    def to_wordinfo(self, row, columns):
+        """词条行 -> wordinfo（与服务端 dict_db 的实时格式化一致）"""
+        if self.lang == 'en':
+            has_lemma = 'lemma' in columns
+            return format_english_to_wordinfo(english_row_to_result(row, has_lemma))
+        return format_chinese_to_wordinfo(chinese_row_to_result(row))
+
+    def build(self):
+        """逐行生成 wordinfo，返回 (条数, 校验和)"""
+        print(f"预编译 wordinfo（格式版本 {WORDINFO_FORMAT_VERSION}）...")
+
+        columns = self.get_columns()
+        source_columns = wordinfo_source_columns(self.lang, columns)
+        read_cursor = self.conn.cursor()
+        read_cursor.execute(f'''
+            SELECT rowid, {', '.join(source_columns)}
+            FROM words
+            ORDER BY {self.key}
+        ''')
+
+        # 先移除过期触发器，避免写入时触发
+        self.conn.execute('DROP TRIGGER IF EXISTS words_wordinfo_stale')
+
+        checksum = hashlib.sha256()
+        count = 0
+        failed = 0
+        batch = []
+        for row in read_cursor:
+            try:
+                data = dump_wordinfo(self.to_wordinfo(row, columns))
+            except Exception:
+                data = None
+                failed += 1
+
+            if data is not None:
+                checksum.update(row[self.key].encode('utf-8'))
+                checksum.update(b'\0')
+                checksum.update(data.encode('utf-8'))
+                checksum.update(b'\n')
+                count += 1
+
+            batch.append((data, row['rowid']))
+            if len(batch) >= 5000:
+                self.conn.executemany('UPDATE words SET wordinfo = ? WHERE rowid = ?', batch)
+                batch = []
+                print(f"  已生成 {count} 个词条...", end='\r')
+
+        if batch:
+            self.conn.executemany('UPDATE words SET wordinfo = ? WHERE rowid = ?', batch)
+
+        self.conn.commit()
+        print(f"\n✓ wordinfo 生成完成，共 {count} 个词条" + (f"（{failed} 个格式异常，运行时实时格式化）" if failed else ""))
+        return count, checksum.hexdigest()
+
+    def create_stale_trigger(self):
+        """源字段更新时清空该行的预编译 wordinfo"""
+        source_columns = wordinfo_source_columns(self.lang, self.get_columns())
+        self.conn.execute(f'''
+            CREATE TRIGGER words_wordinfo_stale
+            AFTER UPDATE OF {', '.join(source_columns)} ON words
+            BEGIN
+                UPDATE words SET wordinfo = NULL WHERE rowid = NEW.rowid;
+            END
+        ''')
+        self.conn.commit()
+
+    def write_build_info(self, count, checksum):
+        """写入构建信息（服务端据此判断预编译数据是否过期）"""
+        source_columns = wordinfo_source_columns(self.lang, self.get_columns())
+        self.conn.executemany('INSERT OR REPLACE INTO build_info (key, value) VALUES (?, ?)', [
+            ('wordinfo_format', str(WORDINFO_FORMAT_VERSION)),
+            ('wordinfo_columns', ','.join(source_columns)),
+            ('wordinfo_rows', str(count)),
+            ('wordinfo_checksum', checksum),
+        ])
+        self.conn.commit()
+        print(f"✓ 构建信息: 格式版本 {WORDINFO_FORMAT_VERSION}，校验和 {checksum[:12]}")
+
+    def run(self):
+        """完整构建流程"""
+        self.connect()
+        self.prepare()
+        count, checksum = self.build()
+        self.create_stale_trigger()
+        self.write_build_info(count, checksum)
+        self.close()
+
+    def close(self):
+        """关闭数据库"""
+        if self.conn:
+            self.conn.close()
+
+
+def main():
+    """主函数"""
+    langs = sys.argv[1:] or ['en', 'zh']
+
+    print("=" * 60)
+    print("预编译词典 wordinfo")
+    print("=" * 60)
+
+    for lang in langs:
+        db_path = DICT_DBS.get(lang)
+        if db_path is None:
+            print(f"✗ 不支持的语言: {lang}（可选: en, zh）")
+            return 1
+        if not db_path.exists():
+            print(f"⚠ 词典数据库不存在，跳过: {db_path}")
+            continue
+
+        print(f"\n[{lang}]")
+        WordinfoBuilder(db_path, lang).run()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,12 +2,21 @@
 """
 集成英文词根（Lemma）数据到英文词典
 数据源：lemma.en.txt (2.2MB, 186,523个词条, 84,487个词根组)
+
+- words.lemma / lemma_frequency：词典中已有词条的词根
+- lemma_forms(form_key, lemma_key) 表：词典中没有的词形 -> 词根查询键，
+  服务端查不到词形变化时据此回退到词根词条（键与 words.lookup_key 同一归一化规则，需先生成查询键）
 """
 
 import sqlite3
 import sys
 from pathlib import Path
 
+# 添加 server 目录到路径（共用归一化逻辑）
+sys.path.insert(0, str(Path(__file__).parent.parent / 'server'))
+
+from lookup_key import LOOKUP_KEY_VERSION, normalize_en_key
+
 # 路径配置
 DB_DIR = Path(__file__).parent.parent / 'data' / 'databases'
 SOURCE_DIR = Path(__file__).parent.parent / 'data' / 'resources' / 'auxiliary'
@@ -21,6 +30,8 @@ class LemmaIntegrator:
     def __init__(self, db_path):
         self.db_path = db_path
         self.conn = None
+        # 词形查询键 -> (词根频率, 词根查询键)，同一词形属于多个词根时保留频率最高的
+        self.form_lemmas = {}
 
     def connect(self):
         """连接数据库"""
@@ -118,6 +129,7 @@ class LemmaIntegrator:
                 forms = result['forms']
 
                 lemma_count += 1
+                self._add_forms(lemma, frequency, forms)
 
                 # 添加词根本身
                 batch.append((lemma, frequency, lemma))
@@ -157,6 +169,64 @@ class LemmaIntegrator:
 
         return True
 
+    def _add_forms(self, lemma, frequency, forms):
+        """记录词形 -> 词根（供 build_form_index 使用）"""
+        lemma_key = normalize_en_key(lemma)
+        for form in forms:
+            form_key = normalize_en_key(form)
+            if not form_key or form_key == lemma_key:
+                continue
+            current = self.form_lemmas.get(form_key)
+            if current is None or frequency > current[0]:
+                self.form_lemmas[form_key] = (frequency, lemma_key)
+
+    def build_form_index(self):
+        """
+        生成词形 -> 词根索引表 lemma_forms（需先运行 integrate_lemma）
+        只收录词典中没有词条、且词根有词条的词形：有词条的词形直接查到，词根没有词条的回退不到任何释义
+        """
+        print("生成词形 -> 词根索引...")
+        cursor = self.conn.cursor()
+
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_words_lookup_key'")
+        if cursor.fetchone() is None:
+            print("⚠ 缺少查询键索引，跳过（先运行: python scripts/build_lookup_key.py en）")
+            return False
+
+        cursor.execute('DROP TABLE IF EXISTS lemma_forms')
+        cursor.execute('''
+            CREATE TABLE lemma_forms (
+                form_key TEXT PRIMARY KEY,
+                lemma_key TEXT NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        cursor.executemany(
+            'INSERT INTO lemma_forms VALUES (?, ?)',
+            ((form_key, lemma_key) for form_key, (_, lemma_key) in self.form_lemmas.items())
+        )
+        # 删除词典中已有的词形和没有词条的词根
+        cursor.execute('''
+            DELETE FROM lemma_forms
+            WHERE EXISTS (SELECT 1 FROM words WHERE lookup_key = lemma_forms.form_key)
+               OR NOT EXISTS (SELECT 1 FROM words WHERE lookup_key = lemma_forms.lemma_key)
+        ''')
+        cursor.execute('SELECT COUNT(*) FROM lemma_forms')
+        count = cursor.fetchone()[0]
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS build_info (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+        cursor.executemany('INSERT OR REPLACE INTO build_info (key, value) VALUES (?, ?)', [
+            ('lemma_forms_version', str(LOOKUP_KEY_VERSION)),
+            ('lemma_forms_rows', str(count)),
+        ])
+        self.conn.commit()
+        print(f"✓ 词形索引生成完成: {count} 个词典外词形（共 {len(self.form_lemmas)} 个词形）")
+        return True
+
     def create_index(self):
         """为 lemma 字段创建索引"""
         print("创建索引...")
@@ -201,6 +271,7 @@ def main():
         print("✗ 集成失败")
         return 1
 
+    integrator.build_form_index()
     integrator.create_index()
     integrator.close()
 
@@ -52,6 +52,7 @@ class TatoebaIntegrator:
         # 创建索引
         self.conn.execute('CREATE INDEX IF NOT EXISTS idx_sentence_en ON sentence_pairs(en_sentence)')
         self.conn.execute('CREATE INDEX IF NOT EXISTS idx_sentence_zh ON sentence_pairs(zh_sentence)')
+        self.remove_duplicates()
 
         # 创建 FTS5 全文搜索表
         try:
@@ -63,6 +64,14 @@ class TatoebaIntegrator:
                     content_rowid=id
                 )
             ''')
+            # 中文 FTS5：每个汉字作为一个词元，词语查询用短语匹配相邻汉字，
+            # 任意长度的词都能走索引并按 bm25 排序（trigram 分词器不支持 1~2 字的词）
+            self.conn.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS sentence_pairs_zh_fts USING fts5(
+                    zh_chars,
+                    content=''
+                )
+            ''')
             print("✓ FTS5 全文搜索表创建成功")
         except Exception as e:
             print(f"⚠ FTS5 创建失败（将使用 LIKE 搜索）: {e}")
@@ -83,6 +92,45 @@ class TatoebaIntegrator:
         words = [w for w in words if len(w) >= 2]
         return list(set(words))
 
+    @staticmethod
+    def split_chinese_chars(text):
+        """汉字之间插入空格，供中文 FTS5 按单字建立索引（与 dict_db 的查询方式一致）"""
+        return re.sub(r'([\u4e00-\u9fff])', r' \1 ', text)
+
+    def remove_duplicates(self):
+        """删除中英文都相同的重复句子对，并以唯一索引保证不再写入重复数据"""
+        cursor = self.conn.execute('''
+            DELETE FROM sentence_pairs
+            WHERE id NOT IN (
+                SELECT MIN(id) FROM sentence_pairs GROUP BY en_sentence, zh_sentence
+            )
+        ''')
+        if cursor.rowcount:
+            print(f"✓ 删除重复句子对 {cursor.rowcount} 条")
+        self.conn.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_sentence_pair_unique
+            ON sentence_pairs(en_sentence, zh_sentence)
+        ''')
+        self.conn.commit()
+
+    def rebuild_fts(self):
+        """重建英文、中文 FTS5 索引"""
+        try:
+            print("同步到 FTS5 全文搜索索引...")
+            self.conn.execute("INSERT INTO sentence_pairs_fts(sentence_pairs_fts) VALUES('rebuild')")
+
+            self.conn.execute("INSERT INTO sentence_pairs_zh_fts(sentence_pairs_zh_fts) VALUES('delete-all')")
+            rows = self.conn.execute("SELECT id, zh_sentence FROM sentence_pairs").fetchall()
+            self.conn.executemany(
+                "INSERT INTO sentence_pairs_zh_fts(rowid, zh_chars) VALUES (?, ?)",
+                ((row_id, self.split_chinese_chars(zh)) for row_id, zh in rows)
+            )
+            self.conn.execute("INSERT INTO sentence_pairs_zh_fts(sentence_pairs_zh_fts) VALUES('optimize')")
+            self.conn.commit()
+            print(f"✓ FTS5 索引同步完成（中文 {len(rows)} 条）")
+        except Exception as e:
+            print(f"⚠ FTS5 同步失败（将使用 LIKE 搜索）: {e}")
+
     def integrate_tatoeba(self):
         """集成 Tatoeba 数据"""
         print(f"读取句子数据: {SENTENCES_CSV}")
@@ -131,6 +179,7 @@ class TatoebaIntegrator:
         # 第二步：读取翻译链接并构建句子对
         print("构建句子对...")
         sentence_pairs = []
+        seen_pairs = set()
         processed = 0
 
         with open(LINKS_CSV, 'r', encoding='utf-8') as f:
@@ -155,6 +204,11 @@ class TatoebaIntegrator:
                 else:
                     continue
 
+                # 双向链接等会产生相同的句子对，构建时去重
+                if (en_text, zh_text) in seen_pairs:
+                    continue
+                seen_pairs.add((en_text, zh_text))
+
                 # 提取关键词（可选，用于加速查询）
                 en_words = self.extract_english_words(en_text)
                 zh_words = self.extract_chinese_words(zh_text)
@@ -180,7 +234,7 @@ class TatoebaIntegrator:
         for i in range(0, len(sentence_pairs), batch_size):
             batch = sentence_pairs[i:i+batch_size]
             self.conn.executemany('''
-                INSERT INTO sentence_pairs (en_sentence, zh_sentence, en_words, zh_words)
+                INSERT OR IGNORE INTO sentence_pairs (en_sentence, zh_sentence, en_words, zh_words)
                 VALUES (?, ?, ?, ?)
             ''', batch)
             inserted += len(batch)
@@ -190,13 +244,7 @@ class TatoebaIntegrator:
         print(f"\n✓ 数据导入完成")
 
         # 第四步：同步到 FTS5
-        try:
-            print("同步到 FTS5 全文搜索索引...")
-            self.conn.execute("INSERT INTO sentence_pairs_fts(sentence_pairs_fts) VALUES('rebuild')")
-            self.conn.commit()
-            print("✓ FTS5 索引同步完成")
-        except Exception as e:
-            print(f"⚠ FTS5 同步失败（将使用 LIKE 搜索）: {e}")
+        self.rebuild_fts()
 
         return True
 
@@ -241,12 +289,28 @@ class TatoebaIntegrator:
 
 
 def main():
-    """主函数"""
+    """
+    主函数
+    用法: python scripts/integrate_tatoeba.py            导入 Tatoeba 数据
+          python scripts/integrate_tatoeba.py --reindex  仅对已有数据库去重并重建 FTS5 索引
+    """
     print("=" * 60)
     print("集成 Tatoeba 例句数据")
     print("=" * 60)
     print()
 
+    if '--reindex' in sys.argv[1:]:
+        if not SENTENCE_PAIRS_DB.exists():
+            print(f"✗ 例句数据库不存在: {SENTENCE_PAIRS_DB}")
+            return 1
+        integrator = TatoebaIntegrator(SENTENCE_PAIRS_DB)
+        integrator.connect()
+        integrator.create_tables()
+        integrator.rebuild_fts()
+        integrator.close()
+        print("\n✓ 例句索引重建完成")
+        return 0
+
     # 检查数据文件
     if not SENTENCES_CSV.exists():
         print(f"✗ 数据文件不存在: {SENTENCES_CSV}")
@@ -66,7 +66,7 @@ def test_chinese_synonyms():
     db = DictDatabase()
 
     # 测试词语 "人"
-    result = db.query_chinese_word("人")
+    result = db.query_chinese_word("人", include_synonyms=True)
     if result:
         print(f"✓ 查询词语: {result['word']}")
         print(f"  拼音: {result['pinyin']}")
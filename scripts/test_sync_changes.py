@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+测试增量同步（/api/sync/changes、/api/sync/push/delta）
+在临时数据库中通过 Flask 测试客户端调用接口，验证增量结果与全量拉取一致
+用法: python scripts/test_sync_changes.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 使用临时数据库，避免污染真实数据
+os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(), 'test_user_data.db')
+# 缩小墓碑保留范围，便于测试过期后的全量同步
+os.environ['SYNC_TOMBSTONE_RETENTION'] = '10'
+
+# 添加 server 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / 'server'))
+
+from app import app
+from db import get_db
+from repositories import UserRepository, SessionRepository
+from security import generate_session_token, calculate_expiry
+
+client = app.test_client()
+failures = []
+
+
+def check(condition, message):
+    """记录一条断言结果"""
+    print(f"  {'✓' if condition else '✗'} {message}")
+    if not condition:
+        failures.append(message)
+
+
+def create_user(email):
+    """直接创建用户和会话（跳过注册接口的密码哈希），返回请求头"""
+    user_id = UserRepository.create(email, 'x')
+    token = generate_session_token()
+    SessionRepository.create(user_id, token, calculate_expiry(days=1))
+    return {'Authorization': f'Bearer {token}'}
+
+
+def pull(headers):
+    """全量拉取"""
+    return client.get('/api/sync/pull', headers=headers).get_json()
+
+
+def changes(headers, since):
+    """增量拉取"""
+    return client.get('/api/sync/changes', query_string={'since': since}, headers=headers).get_json()
+
+
+def test_public_folder_invalidation():
+    """发布者取消公开后，订阅者的增量拉取应看到引用失效"""
+    print("=" * 60)
+    print("测试 1: 发布者取消公开 -> 订阅者增量拉取")
+    print("=" * 60)
+
+    owner = create_user('owner@test')
+    reader = create_user('reader@test')
+
+    client.post('/api/sync/push', headers=owner, json={
+        'wordcards': {'animals': {'words': 'cat\ndog', 'color': 'blue'}},
+        'folders': {}
+    })
+    card_id = pull(owner)['wordcards']['animals']['id']
+    client.post('/api/sync/push', headers=owner, json={
+        'wordcards': {'animals': {'id': card_id, 'words': 'cat\ndog', 'color': 'blue'}},
+        'folders': {'zoo': {'cards': [card_id]}}
+    })
+    result = client.post('/api/public/folder/set', headers=owner,
+                         json={'folderName': 'zoo', 'isPublic': True}).get_json()
+    client.post('/api/public/folder/add', headers=reader,
+                json={'folderId': result['folderId'], 'displayName': 'shared zoo'})
+
+    version = pull(reader)['version']
+    client.post('/api/public/folder/set', headers=owner, json={'folderName': 'zoo', 'isPublic': False})
+
+    full = pull(reader)['publicFolders']
+    delta = changes(reader, version)
+    check(full and full[0]['isInvalid'], "全量拉取: 引用已失效")
+    check(not delta.get('unchanged'), "增量拉取: 有变更")
+    refs = delta.get('publicFolders') or []
+    check(len(refs) == 1 and refs[0]['isInvalid'] and refs[0]['preview_cards'] == [],
+          "增量拉取: 引用已失效，预览卡片已清空")
+
+    version = delta['version']
+    client.post('/api/sync/push/delta', headers=owner, json={
+        'wordcards': {'animals': {'id': card_id, 'words': 'cat\ndog', 'color': 'red'}}
+    })
+    client.post('/api/public/folder/set', headers=owner, json={'folderName': 'zoo', 'isPublic': True})
+    refs = changes(reader, version).get('publicFolders') or []
+    check(len(refs) == 1 and not refs[0]['isInvalid'] and refs[0]['preview_cards'][0]['color'] == 'red',
+          "重新公开后增量拉取: 引用恢复，预览卡片颜色已更新")
+
+    version = pull(reader)['version']
+    folder_id = pull(owner)['folders']['zoo']['id']
+    client.post('/api/sync/push/delta', headers=owner, json={'deletedFolders': [folder_id]})
+    delta = changes(reader, version)
+    check(refs[0]['id'] in (delta.get('deleted') or {}).get('public_folder', []) and not pull(reader)['publicFolders'],
+          "删除文件夹后增量拉取: 引用出现在删除记录中，与全量拉取一致")
+    print()
+
+
+def test_delta_rename():
+    """增量推送按 ID 重命名文件夹时，以 folder.name 为新名称"""
+    print("=" * 60)
+    print("测试 2: 增量推送重命名文件夹")
+    print("=" * 60)
+
+    user = create_user('rename@test')
+    client.post('/api/sync/push/delta', headers=user, json={'folders': {'old': {'name': 'old', 'cards': []}}})
+    folder_id = pull(user)['folders']['old']['id']
+
+    result = client.post('/api/sync/push/delta', headers=user, json={
+        'folders': {'old': {'id': folder_id, 'name': 'new', 'cards': []}}
+    }).get_json()
+    folders = pull(user)['folders']
+    check(list(folders) == ['new'] and folders['new']['id'] == folder_id, "按 ID 重命名为 folder.name，保留 ID")
+    check(result['folderIdMap'].get('old') == folder_id, "folderIdMap 按请求中的键返回")
+    print()
+
+
+def test_tombstone_retention():
+    """墓碑只保留最近 SYNC_TOMBSTONE_RETENTION 个版本，更早的 since 返回全量同步标记"""
+    print("=" * 60)
+    print("测试 3: 删除记录保留范围")
+    print("=" * 60)
+
+    user = create_user('tombstone@test')
+    start = pull(user)['version']
+    deleted_ids = []
+    for i in range(20):
+        result = client.post('/api/sync/push/delta', headers=user,
+                             json={'wordcards': {f'card{i}': {'words': 'a'}}}).get_json()
+        card_id = result['cardIdMap'][f'card{i}']
+        client.post('/api/sync/push/delta', headers=user, json={'deletedWordcards': [card_id]})
+        deleted_ids.append(card_id)
+    version = pull(user)['version']
+
+    with get_db() as conn:
+        user_id = conn.execute("SELECT id FROM users WHERE email = 'tombstone@test'").fetchone()['id']
+        kept = conn.execute("SELECT COUNT(*) FROM sync_tombstones WHERE user_id = ?", (user_id,)).fetchone()[0]
+    check(kept <= 10, f"墓碑数量受保留范围限制（{kept} 条）")
+
+    stale = changes(user, start)
+    check(stale.get('resync') is True and stale['version'] == version, "since 早于保留范围: 返回全量同步标记")
+    recent = changes(user, version - 2)
+    check(not recent.get('resync') and recent['deleted']['wordcard'] == deleted_ids[-1:],
+          "since 在保留范围内: 正常返回删除记录")
+    print()
+
+
+def test_invalid_folder_cards():
+    """文件夹 cards 中的非整数元素不应导致写入失败，也不进入 folder_cards"""
+    print("=" * 60)
+    print("测试 4: 文件夹卡片列表包含非整数元素")
+    print("=" * 60)
+
+    user = create_user('dirty@test')
+    result = client.post('/api/sync/push/delta', headers=user,
+                         json={'wordcards': {'fruit': {'words': 'apple\npear'}}}).get_json()
+    card_id = result['cardIdMap']['fruit']
+
+    cards = [None, 'x', [1], {'id': 2}, card_id]
+    response = client.post('/api/sync/push', headers=user, json={
+        'wordcards': {'fruit': {'id': card_id, 'words': 'apple\npear'}},
+        'folders': {'dirty': {'cards': cards}}
+    })
+    check(response.status_code == 200, "全量推送: 含非整数元素的文件夹写入成功")
+    folder_id = pull(user)['folders']['dirty']['id']
+
+    response = client.post('/api/sync/push/delta', headers=user, json={
+        'folders': {'dirty': {'id': folder_id, 'name': 'dirty', 'cards': cards + ['y']}}
+    })
+    check(response.status_code == 200, "增量推送: 更新含非整数元素的文件夹成功")
+
+    with get_db() as conn:
+        rows = conn.execute("SELECT card_id FROM folder_cards WHERE folder_id = ?", (folder_id,)).fetchall()
+    check([row['card_id'] for row in rows] == [card_id], "folder_cards 只包含整数卡片 ID")
+    print()
+
+
+def main():
+    test_public_folder_invalidation()
+    test_delta_rename()
+    test_tombstone_retention()
+    test_invalid_folder_cards()
+
+    if failures:
+        print(f"✗ {len(failures)} 项失败")
+        return 1
+    print("✓ 全部通过")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
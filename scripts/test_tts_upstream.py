@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+测试 TTS 上游请求（连接池、重试、请求合并）和响应缓存头
+启动本地假 dictvoice 服务，通过 Flask test client 调用 /api/tts，无需访问有道
+- 同一单词并发未命中只请求一次上游
+- 上游返回 503 时按退避重试
+- 多次请求复用 keep-alive 连接
+- ETag / If-None-Match / Range / immutable
+- /api/tts/warm 批量预热
+- /api/tts/sprite 单词卡音频雪碧图
+用法: python scripts/test_tts_upstream.py
+"""
+
+import io
+import os
+import sys
+import time
+import tempfile
+import threading
+import contextlib
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+
+
+def fake_mp3(seed: bytes) -> bytes:
+    """生成假 MP3：ID3 标签 + Xing 信息帧 + 若干个 MPEG1 Layer III 帧（128kbps，44.1kHz，每帧 417 字节）"""
+    header = b'\xff\xfb\x90\x00'
+    payload = (seed * 417)[:413]
+    id3 = b'ID3\x03\x00\x00\x00\x00\x00\x05' + b'\x00' * 5
+    xing = header + b'\x00' * 32 + b'Xing' + b'\x00' * 377
+    frames = header + payload
+    return id3 + xing + frames * (3 + len(seed) % 5)
+
+
+class FakeDictvoice(BaseHTTPRequestHandler):
+    """假 dictvoice：延迟返回固定音频，记录请求数和连接数；fail_next 次请求返回 503"""
+
+    protocol_version = 'HTTP/1.1'  # 支持 keep-alive
+    delay = 0.2
+    fail_next = 0
+    requests = 0
+    connections = set()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.requests += 1
+            cls.connections.add(self.client_address)
+            fail = cls.fail_next > 0
+            if fail:
+                cls.fail_next -= 1
+
+        time.sleep(cls.delay)
+        body = b'' if fail else fake_mp3(self.path.encode())
+        self.send_response(503 if fail else 200)
+        self.send_header('Content-Type', 'audio/mpeg')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+    @classmethod
+    def reset(cls):
+        with cls.lock:
+            cls.requests = 0
+            cls.connections = set()
+
+
+server = ThreadingHTTPServer(('127.0.0.1', 0), FakeDictvoice)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+# 指向假服务，使用临时数据库和缓存目录
+os.environ['TTS_UPSTREAM_URL'] = f"http://127.0.0.1:{server.server_address[1]}/dictvoice"
+os.environ['TTS_UPSTREAM_BACKOFF'] = '0.05'
+os.environ['DATABASE_PATH'] = os.path.join(tempfile.mkdtemp(), 'test_user_data.db')
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'server'))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import tts
+    from app import app
+    from audio_cache import AudioCache
+    from repositories import UserRepository, SessionRepository
+    from security import generate_session_token, calculate_expiry
+
+tts.audio_cache = AudioCache(Path(tempfile.mkdtemp()), max_bytes=0)
+client = app.test_client()
+
+
+def get_tts(word):
+    return client.get('/api/tts', query_string={'word': word, 'lang': 'en'})
+
+
+def auth_headers(email):
+    """直接创建用户和会话，返回请求头（预热、生成雪碧图需要登录）"""
+    token = generate_session_token()
+    SessionRepository.create(UserRepository.create(email, 'x'), token, calculate_expiry(days=1))
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_coalescing():
+    """测试 1: 同一单词 20 个并发未命中只请求一次上游"""
+    FakeDictvoice.reset()
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=20) as pool:
+        responses = list(pool.map(get_tts, ['classroom'] * 20))
+
+    assert all(r.status_code == 200 for r in responses)
+    assert len({r.data for r in responses}) == 1
+    assert FakeDictvoice.requests == 1, FakeDictvoice.requests
+    print(f"✓ 20 个并发请求 -> 上游 {FakeDictvoice.requests} 次")
+
+
+def test_retry():
+    """测试 2: 上游连续两次 503 后成功"""
+    FakeDictvoice.reset()
+    FakeDictvoice.fail_next = 2
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = get_tts('retry')
+
+    assert response.status_code == 200, response.get_json()
+    assert FakeDictvoice.requests == 3, FakeDictvoice.requests
+    print(f"✓ 两次 503 后重试成功（上游 {FakeDictvoice.requests} 次）")
+
+
+def test_retry_exhausted():
+    """测试 3: 重试次数用尽返回 500 和错误信息"""
+    FakeDictvoice.reset()
+    FakeDictvoice.fail_next = 10
+    response = get_tts('unavailable')
+    FakeDictvoice.fail_next = 0
+
+    assert response.status_code == 500
+    assert '503' in response.get_json()['error']
+    print(f"✓ 重试用尽: {response.get_json()['error']}")
+
+
+def test_keep_alive():
+    """测试 4: 顺序请求不同单词复用连接"""
+    FakeDictvoice.reset()
+    FakeDictvoice.delay = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(10):
+            assert get_tts(f'word{i}').status_code == 200
+
+    assert len(FakeDictvoice.connections) == 1, len(FakeDictvoice.connections)
+    print(f"✓ 10 次上游请求使用 {len(FakeDictvoice.connections)} 个连接")
+
+
+def test_http_caching():
+    """测试 5: 强 ETag、304、Range 和 immutable 缓存头"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        first = get_tts('cacheable')
+        cached = get_tts('cacheable')
+        etag = cached.headers['ETag']
+        not_modified = client.get('/api/tts', query_string={'word': 'cacheable', 'lang': 'en'},
+                                  headers={'If-None-Match': etag})
+        partial = client.get('/api/tts', query_string={'word': 'cacheable', 'lang': 'en'},
+                             headers={'Range': 'bytes=0-3'})
+
+    assert first.headers['ETag'] == etag and not etag.startswith('W/')
+    assert 'immutable' in cached.headers['Cache-Control']
+    assert not_modified.status_code == 304 and not not_modified.data
+    assert partial.status_code == 206 and partial.data == cached.data[:4]
+    assert partial.headers['Content-Range'].startswith('bytes 0-3/')
+    print(f"✓ ETag {etag}，If-None-Match -> 304，Range -> 206，{cached.headers['Cache-Control']}")
+
+
+def test_warm():
+    """测试 6: 批量预热需要登录，已缓存的跳过，无效条目单独报错"""
+    FakeDictvoice.reset()
+    items = [{'text': f'warm{i}', 'lang': 'en', 'accent': 'uk'} for i in range(8)]
+    items += [{'text': 'cacheable', 'lang': 'en'}, {'text': 'x', 'lang': 'xx'}]
+    with contextlib.redirect_stdout(io.StringIO()):
+        anonymous = client.post('/api/tts/warm', json={'items': items})
+        anonymous_requests = FakeDictvoice.requests
+        response = client.post('/api/tts/warm', json={'items': items}, headers=auth_headers('warm@test'))
+        replay = client.get(response.get_json()['results'][0]['url'])
+
+    assert anonymous.status_code == 401 and anonymous_requests == 0
+    data = response.get_json()
+    assert data['summary'] == {'cached': 1, 'fetched': 8, 'error': 1}, data['summary']
+    assert FakeDictvoice.requests == 8
+    assert replay.status_code == 200 and replay.headers['ETag'] == f'"{data["results"][0]["key"]}"'
+    print(f"✓ 预热 {len(items)} 项: {data['summary']}，上游 {FakeDictvoice.requests} 次")
+
+
+def test_sprite():
+    """测试 7: 单词卡雪碧图，生成需要登录（获取音频无需登录），偏移连续、去掉 ID3/Xing、每段可单独切出"""
+    from audio_sprite import extract_frames
+
+    FakeDictvoice.reset()
+    words = ['apple', 'banana', 'cherry', 'apple']
+    with contextlib.redirect_stdout(io.StringIO()):
+        anonymous = client.post('/api/tts/sprite', json={'words': words, 'lang': 'en'})
+        anonymous_requests = FakeDictvoice.requests
+        headers = auth_headers('sprite@test')
+        response = client.post('/api/tts/sprite', json={'words': words, 'lang': 'en'}, headers=headers)
+        data = response.get_json()
+        sprite = client.get(data['url'])
+        again = client.post('/api/tts/sprite', json={'words': words, 'lang': 'en'}, headers=headers).get_json()
+        changed = client.post('/api/tts/sprite', json={'words': words + ['date'], 'lang': 'en'},
+                              headers=headers).get_json()
+        single = get_tts('banana')
+
+    assert anonymous.status_code == 401 and anonymous_requests == 0
+    assert response.status_code == 200 and not data['missing']
+    assert [item['text'] for item in data['items']] == ['apple', 'banana', 'cherry']
+    assert sprite.status_code == 200 and len(sprite.data) == data['size']
+    assert not sprite.data.startswith(b'ID3') and b'Xing' not in sprite.data
+    assert again['key'] == data['key'] and changed['key'] != data['key']
+
+    item = data['items'][1]
+    segment = sprite.data[item['byteOffset']:item['byteOffset'] + item['byteLength']]
+    assert segment == extract_frames(single.data)[0]
+    assert abs(data['items'][2]['offset'] - item['offset'] - item['duration']) < 1e-3
+    print(f"✓ 雪碧图 {len(data['items'])} 个单词，{data['size']} 字节，{data['duration']}s；内容变化后键改变")
+
+
+def main():
+    print("=" * 60)
+    print("TTS 上游请求测试（本地假 dictvoice）")
+    print("=" * 60)
+
+    test_coalescing()
+    test_retry()
+    test_retry_exhausted()
+    test_keep_alive()
+    test_http_caching()
+    test_warm()
+    test_sprite()
+
+    print(f"\n统计: {tts.get_tts_cache_stats()['upstream']}, {tts.get_tts_cache_stats()['singleflight']}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -123,6 +123,10 @@ check_dependencies() {
     else
         print_warning "未找到 requirements.txt，跳过依赖检查"
     fi
+
+    print_info "构建前端静态资源..."
+    python3 scripts/build_static.py > /dev/null
+    print_success "静态资源构建完成"
 }
 
 # 重启服务
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+TTS 缓存预热
+预先请求高频英文单词和所有公开文件夹中单词的发音并写入服务端音频缓存，
+使复读时首次播放也只需读取本地磁盘
+- 高频词：en_dict.db 中按词频排名取前 N 个
+- 公开文件夹：按文件夹所有者设置的学习语言
+已缓存的条目直接跳过，可重复运行
+
+用法: python scripts/warm_tts_cache.py [前 N 个高频词，默认 5000] [--uk] [--no-public]
+  --uk         英文同时预热英式发音
+  --no-public  不预热公开文件夹中的单词
+"""
+
+import io
+import sys
+import time
+import sqlite3
+import contextlib
+from pathlib import Path
+
+# 添加 server 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / 'server'))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from tts import warm_tts, get_tts_cache_stats
+    from repositories import FolderRepository
+
+EN_DICT_DB = Path(__file__).parent.parent / 'data' / 'databases' / 'en_dict.db'
+DEFAULT_TOP_N = 5000
+CHUNK_SIZE = 200
+
+
+def get_top_words(limit):
+    """en_dict.db 中词频排名最高的 limit 个单词"""
+    if not EN_DICT_DB.exists():
+        print(f"⚠ 英文词典数据库不存在，跳过高频词: {EN_DICT_DB}")
+        return []
+
+    conn = sqlite3.connect(f"{EN_DICT_DB.as_uri()}?mode=ro", uri=True)
+    try:
+        cursor = conn.execute('''
+            SELECT word FROM words
+            WHERE frequency > 0
+            ORDER BY frequency
+            LIMIT ?
+        ''', (limit,))
+        return [row[0] for row in cursor]
+    finally:
+        conn.close()
+
+
+def main():
+    args = sys.argv[1:]
+    top_n = int(next((a for a in args if a.isdigit()), DEFAULT_TOP_N))
+    accents = ['us', 'uk'] if '--uk' in args else ['us']
+
+    print("=" * 60)
+    print("TTS 缓存预热")
+    print("=" * 60)
+
+    items = {}
+    for word in get_top_words(top_n):
+        for accent in accents:
+            items.setdefault((word, 'en', accent), None)
+    print(f"✓ 高频词: {len(items)} 项")
+
+    if '--no-public' not in args:
+        before = len(items)
+        for word, lang in FolderRepository.get_public_words():
+            for accent in (accents if lang == 'en' else ['us']):
+                items.setdefault((word, lang, accent), None)
+        print(f"✓ 公开文件夹单词: 新增 {len(items) - before} 项")
+
+    items = [{'text': text, 'lang': lang, 'accent': accent} for text, lang, accent in items]
+    summary = {'cached': 0, 'fetched': 0, 'error': 0}
+    start = time.time()
+
+    for i in range(0, len(items), CHUNK_SIZE):
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = warm_tts(items[i:i + CHUNK_SIZE])
+        for entry in results:
+            summary[entry['status']] += 1
+            if entry['status'] == 'error':
+                print(f"  ✗ {entry['text']} ({entry['lang']}, {entry['accent']}): {entry.get('error')}")
+        print(f"  已处理 {min(i + CHUNK_SIZE, len(items))}/{len(items)}...", end='\r')
+
+    stats = get_tts_cache_stats()
+    print(f"\n✓ 预热完成，耗时 {time.time() - start:.1f}s")
+    print(f"  已缓存 {summary['cached']}，新获取 {summary['fetched']}，失败 {summary['error']}")
+    print(f"  缓存占用 {stats['bytes'] / 1024 / 1024:.1f} MB（{stats['entries']} 个文件）")
+    return 1 if summary['error'] and not summary['fetched'] and not summary['cached'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
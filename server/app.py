@@ -7,7 +7,7 @@
 import os
 import socket
 import subprocess
-from flask import Flask, send_file, request
+from flask import Flask, send_file, request, jsonify, g
 from flask_cors import CORS
 
 # 尝试导入 flask-socketio（可选依赖）
@@ -19,13 +19,16 @@ except ImportError:
     print("[Warning] flask-socketio 未安装，WebSocket 功能不可用")
     print("         安装方法: pip install flask-socketio")
 
-from tts import tts_bp
+from tts import tts_bp, get_tts_cache_stats
 from auth import auth_bp
 from sync import sync_bp
 from settings import settings_bp
-from db import init_db, get_db
+from db import init_db, get_db, get_pool_stats
 from dict_api import dict_api_bp
 from public_api import public_api_bp
+from middleware import verify_token, get_auth_stats, require_auth
+from static_assets import StaticAssets
+from config import Config
 
 
 def _get_lan_ip():
@@ -56,6 +59,11 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 ALLOWED_DIRS = {'js', 'css', 'assets'}
 ALLOWED_EXTENSIONS = {'.js', '.css', '.html', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.woff', '.woff2', '.ttf', '.ico'}
 
+# 预构建静态资源（scripts/build_static.py 生成的 dist/，预压缩 + 内容哈希）
+static_assets = StaticAssets(BASE_DIR, os.path.join(BASE_DIR, 'dist'))
+if Config.STATIC_USE_DIST:
+    static_assets.load()
+
 app = Flask(__name__)
 
 # 初始化 SocketIO（如果可用）- 必须在 CORS 之前初始化
@@ -86,22 +94,6 @@ if HAS_SOCKETIO:
     # 存储已连接的用户 { sid: user_id }
     connected_users = {}
 
-    def verify_token(token):
-        """验证 token 并返回用户信息"""
-        if not token:
-            return None
-        with get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT u.id, u.email FROM sessions s
-                JOIN users u ON s.user_id = u.id
-                WHERE s.token = ? AND s.expires_at > datetime('now')
-            """, (token,))
-            row = cursor.fetchone()
-            if row:
-                return {'id': row['id'], 'email': row['email']}
-        return None
-
     @socketio.on('connect')
     def handle_connect(auth):
         """处理 WebSocket 连接"""
@@ -171,9 +163,31 @@ def favicon():
     return send_file(os.path.join(BASE_DIR, "favicon.ico"), mimetype='image/x-icon')
 
 
+@app.route("/api/server/stats")
+@require_auth
+def server_stats():
+    """
+    服务运行统计（用于容量规划），仅限 ADMIN_EMAILS 中的管理员
+    GET /api/server/stats
+    请求头: Authorization: Bearer <token>
+    """
+    if g.user['email'].lower() not in Config.ADMIN_EMAILS:
+        print(f"[Stats] 拒绝非管理员访问: 用户 {g.user['id']}")
+        return jsonify({'error': '无权访问'}), 403
+
+    return jsonify({
+        'dbPool': get_pool_stats(),
+        'auth': get_auth_stats(),
+        'ttsCache': get_tts_cache_stats()
+    })
+
+
 @app.route("/")
 def index():
-    """提供主页"""
+    """提供主页（有预构建版本时使用引用带哈希资源的 index.html）"""
+    response = static_assets.send_index()
+    if response is not None:
+        return response
     return send_file(os.path.join(BASE_DIR, "index.html"))
 
 
@@ -196,6 +210,11 @@ def static_files(filename):
     if ext.lower() not in ALLOWED_EXTENSIONS:
         return "Forbidden", 403
 
+    # 带内容哈希的预构建文件（预压缩，长期缓存）
+    response = static_assets.send_asset(filename)
+    if response is not None:
+        return response
+
     file_path = os.path.join(BASE_DIR, filename)
     if os.path.isfile(file_path):
         return send_file(file_path)
@@ -0,0 +1,316 @@
+"""
+TTS 音频磁盘缓存模块
+- 文件按哈希前两位分片存放：cache/audio/ab/ab12....mp3，避免单目录文件过多
+- SQLite 元数据索引（键、大小、创建时间、最近访问、命中次数、淘汰分数），多进程共享
+- 按字节预算淘汰：超出 TTS_CACHE_MAX_MB 时按淘汰分数「最近访问 + 命中加权」（有索引）从低到高删除
+- 命中只读索引：访问时间和命中次数先记在内存，定期（或写入、淘汰时）一次批量写回
+- 单词发音内容不变，默认永不过期（TTS_CACHE_TTL_DAYS = 0）
+"""
+
+import os
+import time
+import atexit
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+# 每次命中相当于把最近访问时间往后推这么多秒（上限 HIT_BONUS_MAX 次），热词比冷词多保留一段时间
+HIT_BONUS_SECONDS = 24 * 3600
+HIT_BONUS_MAX = 10
+
+# 淘汰时降到预算的比例，避免每次写入都触发淘汰
+EVICT_LOW_WATERMARK = 0.9
+
+# 命中记录批量写回：累计条数或距上次写回的秒数达到其一即写回
+ACCESS_FLUSH_SIZE = 256
+ACCESS_FLUSH_INTERVAL = 5.0
+
+# 淘汰分数（在 UPDATE/INSERT 语句内使用，引用行的 last_access 和 hits）
+_SCORE_SQL = f"last_access + MIN(hits, {HIT_BONUS_MAX}) * {HIT_BONUS_SECONDS}"
+
+
+def make_cache_key(text: str, accent: str, lang: str) -> str:
+    """生成缓存键（MD5，避免文件名过长或包含特殊字符）"""
+    return hashlib.md5(f"{text}:{accent}:{lang}".encode()).hexdigest()
+
+
+class AudioCache:
+    """
+    有界音频缓存
+    - root: 缓存根目录
+    - max_bytes: 字节预算，<= 0 表示不限制
+    - ttl: 过期时间（秒），<= 0 表示永不过期
+    """
+
+    def __init__(self, root: Path, max_bytes: int, ttl: float = 0):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = None
+        self._total_bytes = 0       # 缓存总字节数（打开索引时统计一次，之后随写入/删除增减）
+        self._pending = {}          # 待写回的命中记录 {key: [最近访问时间, 命中次数]}
+        self._last_flush = time.time()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'bytes_saved': 0,   # 命中时直接从磁盘返回、未向上游请求的字节数
+            'writes': 0,
+            'evictions': 0,
+            'evicted_bytes': 0,
+            'expirations': 0
+        }
+
+    # ===================== 索引 =====================
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """打开（必要时创建）元数据索引，调用方需持有 self._lock"""
+        if self._conn is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.root / 'index.db'), timeout=5, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA busy_timeout = 5000")
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    score REAL NOT NULL DEFAULT 0
+                );
+            ''')
+            # 旧索引补充淘汰分数字段（按分数淘汰后 last_access 索引不再使用）
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(entries)')]
+            if 'score' not in columns:
+                with conn:
+                    conn.execute('ALTER TABLE entries ADD COLUMN score REAL NOT NULL DEFAULT 0')
+                    conn.execute(f'UPDATE entries SET score = {_SCORE_SQL}')
+            conn.execute('DROP INDEX IF EXISTS idx_entries_last_access')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_score ON entries(score)')
+            self._conn = conn
+            self._migrate_flat_files()
+            self._total_bytes = self._sum_bytes()
+            atexit.register(self.flush)
+        return self._conn
+
+    def _sum_bytes(self) -> int:
+        """统计索引中的总字节数（全表扫描，只在打开索引和淘汰前校准时使用）"""
+        return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def _migrate_flat_files(self):
+        """将旧版平铺在根目录下的 <md5>.mp3 移入分片目录并建立索引"""
+        legacy = list(self.root.glob('*.mp3'))
+        if not legacy:
+            return
+
+        rows = []
+        for path in legacy:
+            key = path.stem
+            target = self.path_for(key)
+            try:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                stat = path.stat()
+                os.replace(path, target)
+                rows.append((key, stat.st_size, stat.st_mtime, stat.st_mtime))
+            except OSError:
+                continue
+
+        with self._conn:
+            self._conn.executemany('''
+                INSERT OR IGNORE INTO entries (key, size, created_at, last_access, score)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [row + (row[3],) for row in rows])
+        print(f"[TTS Cache] 迁移旧缓存文件 {len(rows)} 个到分片目录")
+
+    def path_for(self, key: str) -> Path:
+        """缓存键 -> 分片文件路径"""
+        return self.root / key[:2] / f"{key}.mp3"
+
+    # ===================== 读写 =====================
+
+    def get_path(self, key: str, record_miss: bool = True) -> Optional[Path]:
+        """
+        查找缓存音频文件路径（不读取内容，便于直接以文件发送），未命中、已过期或文件丢失返回 None
+        record_miss=False 用于同一请求内的二次检查，避免重复计入未命中
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._get_conn()
+            row = conn.execute('SELECT size, created_at FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                if record_miss:
+                    self._stats['misses'] += 1
+                return None
+
+            if self.ttl > 0 and now - row['created_at'] > self.ttl:
+                self._remove(key)
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+
+            path = self.path_for(key)
+            if not path.is_file():
+                # 文件被外部删除，清理索引
+                self._remove(key)
+                self._stats['misses'] += 1
+                return None
+
+            # 只记在内存，批量写回（命中路径不写数据库）
+            access = self._pending.get(key)
+            if access is None:
+                self._pending[key] = [now, 1]
+            else:
+                access[0] = now
+                access[1] += 1
+            if len(self._pending) >= ACCESS_FLUSH_SIZE or now - self._last_flush >= ACCESS_FLUSH_INTERVAL:
+                self._flush_access()
+
+            self._stats['hits'] += 1
+            self._stats['bytes_saved'] += row['size']
+            return path
+
+    def _flush_access(self) -> None:
+        """将内存中的命中记录一次写回索引，调用方需持有 self._lock"""
+        self._last_flush = time.time()
+        if not self._pending:
+            return
+        rows = [(last_access, hits, key) for key, (last_access, hits) in self._pending.items()]
+        self._pending = {}
+        # SET 中引用的是更新前的 last_access/hits，分数按更新后的值计算
+        with self._conn:
+            self._conn.executemany(f'''
+                UPDATE entries SET
+                    score = MAX(last_access, ?1) + MIN(hits + ?2, {HIT_BONUS_MAX}) * {HIT_BONUS_SECONDS},
+                    last_access = MAX(last_access, ?1),
+                    hits = hits + ?2
+                WHERE key = ?3
+            ''', rows)
+
+    def flush(self) -> None:
+        """写回尚未保存的命中记录（进程退出时自动调用）"""
+        with self._lock:
+            if self._conn is not None:
+                self._flush_access()
+
+    def contains(self, key: str) -> bool:
+        """是否已缓存（不计入统计、不更新访问时间，用于预热时跳过已有条目）"""
+        with self._lock:
+            row = self._get_conn().execute('SELECT created_at FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None or (self.ttl > 0 and time.time() - row['created_at'] > self.ttl):
+            return False
+        return self.path_for(key).is_file()
+
+    def get(self, key: str, record_miss: bool = True) -> Optional[bytes]:
+        """读取缓存音频内容，未命中返回 None"""
+        path = self.get_path(key, record_miss)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except OSError:
+            # 读取前恰好被淘汰
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        """写入缓存（先写临时文件再原子替换），超出预算时淘汰"""
+        if not data:
+            return
+
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        with self._lock:
+            conn = self._get_conn()
+            self._flush_access()
+            with conn:
+                old = conn.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+                conn.execute(f'''
+                    INSERT INTO entries (key, size, created_at, last_access, score)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET
+                        size = excluded.size,
+                        created_at = excluded.created_at,
+                        last_access = excluded.last_access,
+                        score = excluded.last_access + MIN(hits, {HIT_BONUS_MAX}) * {HIT_BONUS_SECONDS}
+                ''', (key, len(data), now, now, now))
+            self._total_bytes += len(data) - (old['size'] if old else 0)
+            self._stats['writes'] += 1
+            self._evict_if_needed()
+
+    def _remove(self, key: str) -> None:
+        """删除条目和文件，调用方需持有 self._lock"""
+        self._pending.pop(key, None)
+        with self._conn:
+            row = self._conn.execute('DELETE FROM entries WHERE key = ? RETURNING size', (key,)).fetchone()
+        if row is not None:
+            self._total_bytes -= row['size']
+        try:
+            self.path_for(key).unlink()
+        except OSError:
+            pass
+
+    def _evict_if_needed(self) -> None:
+        """
+        总大小超出预算时淘汰到低水位，调用方需持有 self._lock
+        平时只比较内存中的总字节数；超出时重新统计一次（其他进程也会写入同一索引），再按分数索引顺序淘汰
+        """
+        if self.max_bytes <= 0 or self._total_bytes <= self.max_bytes:
+            return
+
+        self._total_bytes = total = self._sum_bytes()
+        if total <= self.max_bytes:
+            return
+
+        self._flush_access()
+        target = int(self.max_bytes * EVICT_LOW_WATERMARK)
+        cursor = self._conn.execute('SELECT key, size FROM entries ORDER BY score')
+
+        victims = []
+        for row in cursor:
+            if total <= target:
+                break
+            victims.append(row['key'])
+            total -= row['size']
+            self._stats['evicted_bytes'] += row['size']
+        cursor.close()
+
+        with self._conn:
+            self._conn.executemany('DELETE FROM entries WHERE key = ?', [(k,) for k in victims])
+        self._total_bytes = total
+        for key in victims:
+            try:
+                self.path_for(key).unlink()
+            except OSError:
+                pass
+
+        self._stats['evictions'] += len(victims)
+        print(f"[TTS Cache] 淘汰 {len(victims)} 个文件，当前 {total / 1024 / 1024:.1f} MB")
+
+    # ===================== 统计 =====================
+
+    def stats(self) -> Dict[str, Any]:
+        """命中率、节省流量、占用空间等统计"""
+        with self._lock:
+            conn = self._get_conn()
+            self._flush_access()
+            entries, total = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries'
+            ).fetchone()
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'hit_ratio': round(self._stats['hits'] / lookups, 4) if lookups else 0.0,
+                'entries': entries,
+                'bytes': total,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl
+            }
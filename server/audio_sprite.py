@@ -0,0 +1,147 @@
+"""
+音频雪碧图模块
+将一张单词卡中每个单词的 MP3 首尾相接拼成一个文件（MP3 帧可直接拼接，无需重新编码），
+并生成每个单词的时间偏移和字节偏移清单，客户端一次请求即可拿到整张卡的音频
+- 去掉每段的 ID3 标签和 Xing/Info/VBRI 头帧（否则播放器会按第一段的头信息计算总时长）
+- 每段只保留完整的音频帧，字节区间可直接 Blob.slice 成独立可播放的 MP3
+"""
+
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+# 雪碧图格式版本：修改拼接方式时加 1，使旧的雪碧图缓存键失效
+SPRITE_FORMAT_VERSION = 1
+
+# MPEG Layer III 比特率表（kbps），按 MPEG1 / MPEG2 & 2.5 区分
+_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+# 采样率表，按版本位（0: MPEG2.5, 2: MPEG2, 3: MPEG1）
+_SAMPLE_RATES = {
+    0: [11025, 12000, 8000],
+    2: [22050, 24000, 16000],
+    3: [44100, 48000, 32000],
+}
+
+
+def make_sprite_key(cache_keys: List[str]) -> str:
+    """雪碧图缓存键：由各单词音频的缓存键按顺序生成，单词卡内容变化即得到新键"""
+    content = f"sprite:{SPRITE_FORMAT_VERSION}:" + ','.join(cache_keys)
+    return hashlib.md5(content.encode()).hexdigest()
+
+
+def _parse_header(data: bytes, pos: int) -> Optional[Tuple[int, int, int, int]]:
+    """
+    解析 MPEG Layer III 帧头
+    返回 (帧长度, 每帧采样数, 采样率, Xing 头偏移)，不是有效帧头返回 None
+    """
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+
+    version = (data[pos + 1] >> 3) & 0x03
+    layer = (data[pos + 1] >> 1) & 0x03
+    bitrate_index = data[pos + 2] >> 4
+    sample_rate_index = (data[pos + 2] >> 2) & 0x03
+    padding = (data[pos + 2] >> 1) & 0x01
+    mono = (data[pos + 3] >> 6) == 0x03
+
+    # 只支持 Layer III（layer 位为 01）；排除保留值和自由比特率
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = _BITRATES[1 if mpeg1 else 2][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    samples = 1152 if mpeg1 else 576
+    length = (144 if mpeg1 else 72) * bitrate // sample_rate + padding
+    if mpeg1:
+        xing_offset = 4 + (17 if mono else 32)
+    else:
+        xing_offset = 4 + (9 if mono else 17)
+    return length, samples, sample_rate, xing_offset
+
+
+def _skip_id3v2(data: bytes) -> int:
+    """跳过文件开头的 ID3v2 标签，返回音频数据起始位置"""
+    if len(data) < 10 or data[:3] != b'ID3':
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def extract_frames(data: bytes) -> Optional[Tuple[bytes, float]]:
+    """
+    提取 MP3 中的音频帧
+    返回 (只含音频帧的数据, 时长秒数)，无法识别为 MP3 返回 None
+    """
+    pos = _skip_id3v2(data)
+    end = len(data)
+    if end >= 128 and data[end - 128:end - 125] == b'TAG':
+        end -= 128  # ID3v1 标签
+
+    frames = []
+    duration = 0.0
+    first = True
+    while pos < end:
+        header = _parse_header(data, pos)
+        if header is None:
+            # 帧间的垃圾数据，逐字节重新同步
+            pos += 1
+            continue
+
+        length, samples, sample_rate, xing_offset = header
+        if pos + length > end:
+            break  # 不完整的尾帧
+
+        frame = data[pos:pos + length]
+        # 第一帧可能是 Xing/Info/VBRI 信息帧（不含音频），丢弃
+        if first and (frame[xing_offset:xing_offset + 4] in (b'Xing', b'Info') or frame[36:40] == b'VBRI'):
+            first = False
+            pos += length
+            continue
+
+        first = False
+        frames.append(frame)
+        duration += samples / sample_rate
+        pos += length
+
+    if not frames:
+        return None
+    return b''.join(frames), duration
+
+
+def build_sprite(parts: List[Tuple[str, bytes]]) -> Tuple[bytes, List[Dict], List[str]]:
+    """
+    拼接雪碧图
+    parts: [(单词, MP3 数据)]
+    返回 (雪碧图数据, 清单, 无法解析的单词)
+    清单项: {'text', 'offset', 'duration'（秒）, 'byteOffset', 'byteLength'}
+    """
+    chunks = []
+    manifest = []
+    invalid = []
+    offset = 0.0
+    byte_offset = 0
+
+    for text, data in parts:
+        extracted = extract_frames(data)
+        if extracted is None:
+            invalid.append(text)
+            continue
+
+        frames, duration = extracted
+        manifest.append({
+            'text': text,
+            'offset': round(offset, 4),
+            'duration': round(duration, 4),
+            'byteOffset': byte_offset,
+            'byteLength': len(frames)
+        })
+        chunks.append(frames)
+        offset += duration
+        byte_offset += len(frames)
+
+    return b''.join(chunks), manifest, invalid
@@ -0,0 +1,118 @@
+"""
+布隆过滤器模块（词典未命中快速判断）
+由词典构建脚本（scripts/build_bloom.py）生成，服务端启动时以 mmap 只读映射，多个 worker 进程共享同一份页缓存
+- 判断为"不存在"的键一定不在词典中，可直接返回默认释义，不查询 SQLite
+- 判断为"可能存在"的键有一定误判率（假阳性），仍需查询数据库确认
+
+文件格式（小端）：文件头 + 位数组
+  magic(4) 格式版本(2) 查询键版本(2) 位数(8) 键数(8) 哈希函数个数(4) 源词条数(8)
+"""
+
+import math
+import mmap
+import os
+import struct
+import hashlib
+from typing import Iterable, Optional
+
+MAGIC = b'WPBF'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<4sHHQQIQ')
+_MASK64 = (1 << 64) - 1
+
+
+def _hashes(key: str):
+    """双重哈希的两个 64 位基值（第 i 个位置为 h1 + i * h2）"""
+    digest = int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest(), 'little')
+    return digest & _MASK64, (digest >> 64) | 1
+
+
+class BloomFilter:
+    """
+    布隆过滤器
+    - 构建：BloomFilter.create(键数, 目标误判率) -> add() -> save()
+    - 查询：BloomFilter.load(path) 以 mmap 映射，`key in bloom` 判断
+    """
+
+    def __init__(self, bits, num_bits: int, num_hashes: int, num_keys: int = 0,
+                 key_version: int = 0, source_rows: int = 0):
+        self._bits = bits
+        self._offset = 0
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.num_keys = num_keys
+        self.key_version = key_version
+        self.source_rows = source_rows
+
+    @classmethod
+    def create(cls, capacity: int, fp_rate: float, key_version: int = 0, source_rows: int = 0) -> 'BloomFilter':
+        """按预计键数和目标误判率创建空过滤器（m = -n·ln p / ln²2，k = m/n·ln 2）"""
+        capacity = max(capacity, 1)
+        num_bits = max(64, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        num_bits = (num_bits + 7) // 8 * 8
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(bytearray(num_bits // 8), num_bits, num_hashes,
+                   key_version=key_version, source_rows=source_rows)
+
+    @classmethod
+    def load(cls, path) -> Optional['BloomFilter']:
+        """以只读 mmap 映射过滤器文件，文件不存在或格式不符返回 None"""
+        try:
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        if len(mapped) < _HEADER.size:
+            mapped.close()
+            return None
+        magic, version, key_version, num_bits, num_keys, num_hashes, source_rows = \
+            _HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or version != FORMAT_VERSION or len(mapped) < _HEADER.size + num_bits // 8:
+            mapped.close()
+            return None
+
+        bloom = cls(mapped, num_bits, num_hashes, num_keys, key_version, source_rows)
+        bloom._offset = _HEADER.size
+        return bloom
+
+    def add(self, key: str) -> None:
+        """加入一个键"""
+        h1, h2 = _hashes(key)
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % self.num_bits
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.num_keys += 1
+
+    def update(self, keys: Iterable[str]) -> None:
+        """批量加入键"""
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        h1, h2 = _hashes(key)
+        bits, offset = self._bits, self._offset
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % self.num_bits
+            if not bits[offset + (pos >> 3)] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def expected_fp_rate(self) -> float:
+        """按当前键数估算的理论误判率 (1 - e^(-kn/m))^k"""
+        if not self.num_keys:
+            return 0.0
+        return (1 - math.exp(-self.num_hashes * self.num_keys / self.num_bits)) ** self.num_hashes
+
+    def size_bytes(self) -> int:
+        """位数组大小（字节）"""
+        return self.num_bits // 8
+
+    def save(self, path) -> None:
+        """写入文件（先写临时文件再替换，服务端不会读到写了一半的文件）"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, self.key_version, self.num_bits,
+                                 self.num_keys, self.num_hashes, self.source_rows))
+            f.write(self._bits)
+        os.replace(tmp_path, path)
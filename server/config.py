@@ -14,6 +14,34 @@ class Config:
     DATABASE_PATH = os.environ.get('DATABASE_PATH',
         os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'databases', 'user_data.db'))
 
+    # 数据库连接池配置
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 16))            # 最大连接数
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))    # 等待空闲连接的超时（秒）
+    DB_BUSY_TIMEOUT_MS = int(os.environ.get('DB_BUSY_TIMEOUT_MS', 5000))
+    DB_CACHE_SIZE_KB = int(os.environ.get('DB_CACHE_SIZE_KB', 8192))  # 每个连接的页缓存
+    DB_MMAP_SIZE = int(os.environ.get('DB_MMAP_SIZE', 64 * 1024 * 1024))
+
+    # 词典数据库（只读）配置
+    DICT_READONLY = os.environ.get('DICT_READONLY', 'true').lower() == 'true'  # immutable + 只读连接池
+    DICT_POOL_SIZE = int(os.environ.get('DICT_POOL_SIZE', 8))  # 每个词典库保留的空闲只读连接数
+    DICT_MMAP_SIZE = int(os.environ.get('DICT_MMAP_SIZE', 512 * 1024 * 1024))
+    DICT_BLOOM = os.environ.get('DICT_BLOOM', 'true').lower() == 'true'  # 布隆过滤器跳过确定未命中的查询
+
+    # TTS 音频缓存：字节预算（MB，<= 0 不限制）；过期天数（0 表示永不过期，单词发音内容不变）
+    TTS_CACHE_MAX_MB = int(os.environ.get('TTS_CACHE_MAX_MB', 1024))
+    TTS_CACHE_TTL_DAYS = float(os.environ.get('TTS_CACHE_TTL_DAYS', 0))
+
+    # TTS 上游（有道 dictvoice）：地址可指向本地假服务做测试；连接池大小、并发上限、重试次数、退避基数（秒）
+    TTS_UPSTREAM_URL = os.environ.get('TTS_UPSTREAM_URL', 'https://dict.youdao.com/dictvoice')
+    TTS_UPSTREAM_POOL_SIZE = int(os.environ.get('TTS_UPSTREAM_POOL_SIZE', 16))
+    TTS_UPSTREAM_CONCURRENCY = int(os.environ.get('TTS_UPSTREAM_CONCURRENCY', 8))
+    TTS_UPSTREAM_RETRIES = int(os.environ.get('TTS_UPSTREAM_RETRIES', 2))
+    TTS_UPSTREAM_BACKOFF = float(os.environ.get('TTS_UPSTREAM_BACKOFF', 0.2))
+    TTS_WARM_WORKERS = int(os.environ.get('TTS_WARM_WORKERS', 4))  # 缓存预热的并发线程数
+
+    # 静态资源：存在最新的 dist/ 构建时使用预压缩、带内容哈希的文件
+    STATIC_USE_DIST = os.environ.get('STATIC_USE_DIST', 'true').lower() == 'true'
+
     # SMTP 配置（忘记密码功能需要）
     SMTP_HOST = os.environ.get('SMTP_HOST', 'smtp.qq.com')
     SMTP_PORT = int(os.environ.get('SMTP_PORT', 465))
@@ -25,9 +53,19 @@ class Config:
     # 安全配置
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
 
+    # 管理员邮箱（逗号分隔），可访问 /api/server/stats 等运维接口；为空时运维接口对所有人关闭
+    ADMIN_EMAILS = {email.strip().lower() for email in os.environ.get('ADMIN_EMAILS', '').split(',') if email.strip()}
+
     # Token 配置
     TOKEN_EXPIRE_DAYS = int(os.environ.get('TOKEN_EXPIRE_DAYS', 30))
 
+    # 会话缓存（token -> 用户），TTL 上限保证其他进程/脚本删除的会话最终失效
+    SESSION_CACHE_SIZE = int(os.environ.get('SESSION_CACHE_SIZE', 10000))
+    SESSION_CACHE_TTL = int(os.environ.get('SESSION_CACHE_TTL', 60))  # 秒
+
+    # 增量同步：每个用户保留最近 N 个版本内的删除记录（墓碑），since 早于保留范围的增量拉取需全量重新同步
+    SYNC_TOMBSTONE_RETENTION = int(os.environ.get('SYNC_TOMBSTONE_RETENTION', 10000))
+
     # 验证码配置
     CODE_EXPIRE_MINUTES = int(os.environ.get('CODE_EXPIRE_MINUTES', 5))
     CODE_RESEND_SECONDS = int(os.environ.get('CODE_RESEND_SECONDS', 60))
@@ -107,8 +107,38 @@ ALLOWED_SETTING_KEYS = set(DEFAULT_SETTINGS.keys())
 # 单词验证限制
 MAX_WORD_LENGTH = 100
 
-# 批量请求限制
-MAX_BATCH_SIZE = 5
+# 批量请求限制（词典批量查询为一次集合查询，可支持整张单词卡）
+MAX_BATCH_SIZE = 500
+
+# 词典查询缓存（格式化后的 wordinfo 条目数）
+DICT_CACHE_SIZE = 20000
+
+# 自动补全单次最多返回条数
+SEARCH_MAX_LIMIT = 50
+
+# 英文词典未找到时返回的拼写建议条数
+SUGGEST_LIMIT = 5
+
+# 公开文件夹搜索单页最多返回条数
+PUBLIC_SEARCH_MAX_LIMIT = 50
+
+# 例句检索：结果缓存条数；排序时偏好的句子长度（字符数）及长度惩罚权重
+EXAMPLES_CACHE_SIZE = 2000
+EXAMPLE_IDEAL_LENGTH = {'en': 50, 'zh': 15}
+EXAMPLE_LENGTH_WEIGHT = 1.0
+
+# TTS 缓存预热单次最多条目数
+MAX_TTS_WARM_ITEMS = 200
+
+# 单词卡音频雪碧图：单次最多单词数；清单缓存条数
+MAX_TTS_SPRITE_WORDS = 500
+SPRITE_MANIFEST_CACHE_SIZE = 500
+
+# TTS 音频浏览器/CDN 缓存时间（秒）：同一缓存键的音频内容不变，配合 immutable 使用
+TTS_AUDIO_MAX_AGE = 365 * 24 * 3600
+
+# 带内容哈希的静态资源缓存时间（秒）：内容变化即文件名变化，配合 immutable 使用
+STATIC_ASSET_MAX_AGE = 365 * 24 * 3600
 
 # API 超时配置（秒）
 API_TIMEOUT_DEFAULT = 10
@@ -1,38 +1,524 @@
 """
 数据库模块
-SQLite 连接和表初始化
+SQLite 连接池和表初始化
 """
 
 import sqlite3
 import os
+import time
+import atexit
+import threading
 from contextlib import contextmanager
 
 from config import Config
+from utils import count_words
 
 # 确保数据目录存在
 os.makedirs(os.path.dirname(Config.DATABASE_PATH), exist_ok=True)
 
 
-def get_connection():
-    """获取数据库连接"""
-    conn = sqlite3.connect(Config.DATABASE_PATH)
+def _configure_connection(conn):
+    """为新连接设置 PRAGMA（WAL、同步级别、缓存、mmap、外键）"""
     conn.row_factory = sqlite3.Row  # 返回字典形式的结果
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{Config.DB_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {Config.DB_MMAP_SIZE}")
+    conn.execute(f"PRAGMA busy_timeout = {Config.DB_BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA temp_store = MEMORY")
     conn.execute("PRAGMA foreign_keys = ON")  # 启用外键约束
     return conn
 
 
+def get_connection():
+    """获取一个独立的数据库连接（不经过连接池，调用方负责关闭）"""
+    conn = sqlite3.connect(Config.DATABASE_PATH, timeout=Config.DB_BUSY_TIMEOUT_MS / 1000)
+    return _configure_connection(conn)
+
+
+class ConnectionPool:
+    """
+    有界 SQLite 连接池
+    - 最多同时打开 max_size 个连接，超出时等待空闲连接（超时抛出异常）
+    - 线程亲和：优先复用当前线程上次归还的连接
+    - 同一线程内嵌套的 get_db() 复用同一连接和事务，由最外层负责提交
+    """
+
+    def __init__(self, database, max_size=16, timeout=10.0):
+        self.database = database
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = []  # 空闲连接（LIFO，最近使用的连接缓存最热）
+        self._open = 0
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._stats = {
+            'checkouts': 0,       # 最外层借出次数
+            'nested': 0,          # 嵌套复用次数
+            'thread_reuses': 0,   # 命中本线程上次使用的连接
+            'created': 0,         # 新建连接数
+            'discarded': 0,       # 因异常丢弃的连接数
+            'waits': 0,           # 需要等待空闲连接的次数
+            'wait_time_ms': 0.0,  # 累计等待时间
+            'timeouts': 0         # 等待超时次数
+        }
+
+    def _create(self):
+        conn = sqlite3.connect(
+            self.database,
+            timeout=Config.DB_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False  # 连接会在不同线程间复用，由连接池保证同一时刻只被一个线程持有
+        )
+        return _configure_connection(conn)
+
+    def acquire(self):
+        """借出连接，返回 (conn, is_outermost)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.depth += 1
+            with self._cond:
+                self._stats['nested'] += 1
+            return conn, False
+
+        with self._cond:
+            self._stats['checkouts'] += 1
+            conn = self._take_idle()
+            if conn is None and self._open >= self.max_size:
+                self._stats['waits'] += 1
+                start = time.monotonic()
+                deadline = start + self.timeout
+                while conn is None and self._open >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        self._stats['wait_time_ms'] += (time.monotonic() - start) * 1000
+                        raise sqlite3.OperationalError(
+                            f"数据库连接池已耗尽（{self.max_size} 个连接，等待 {self.timeout}s 超时）")
+                    self._cond.wait(remaining)
+                    conn = self._take_idle()
+                self._stats['wait_time_ms'] += (time.monotonic() - start) * 1000
+            if conn is None:
+                self._open += 1
+                self._stats['created'] += 1
+
+        if conn is None:
+            try:
+                conn = self._create()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+
+        self._local.conn = conn
+        self._local.depth = 1
+        return conn, True
+
+    def _take_idle(self):
+        """取出空闲连接（调用方需持有锁），优先本线程上次使用的连接"""
+        if not self._idle:
+            return None
+        last = getattr(self._local, 'last', None)
+        if last is not None and last in self._idle:
+            self._idle.remove(last)
+            self._stats['thread_reuses'] += 1
+            return last
+        return self._idle.pop()
+
+    def release(self, conn, discard=False):
+        """归还连接；嵌套借出时只减少深度"""
+        self._local.depth -= 1
+        if self._local.depth > 0:
+            return
+        self._local.conn = None
+
+        if not discard and conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                discard = True
+
+        with self._cond:
+            if discard:
+                self._open -= 1
+                self._stats['discarded'] += 1
+            else:
+                self._idle.append(conn)
+                self._local.last = conn
+            self._cond.notify()
+
+        if discard:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def close_all(self):
+        """关闭所有空闲连接（进程退出或测试时调用）"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for conn in idle:
+            conn.close()
+
+    def stats(self):
+        """连接池统计信息"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats['wait_time_ms'] = round(stats['wait_time_ms'], 2)
+            stats.update({
+                'max_size': self.max_size,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._open - len(self._idle)
+            })
+            return stats
+
+
+# 全局连接池实例
+_pool = ConnectionPool(Config.DATABASE_PATH, max_size=Config.DB_POOL_SIZE, timeout=Config.DB_POOL_TIMEOUT)
+atexit.register(_pool.close_all)
+
+
+def get_pool_stats():
+    """获取连接池统计信息"""
+    return _pool.stats()
+
+
 @contextmanager
 def get_db():
-    """上下文管理器：自动管理连接"""
-    conn = get_connection()
+    """
+    上下文管理器：从连接池借出连接，自动提交/回滚
+    嵌套调用时复用外层连接，外层退出时统一提交
+    """
+    conn, outermost = _pool.acquire()
+    if not outermost:
+        try:
+            yield conn
+        finally:
+            _pool.release(conn)
+        return
+
+    discard = False
     try:
         yield conn
         conn.commit()
     except Exception:
-        conn.rollback()
+        try:
+            conn.rollback()
+        except sqlite3.Error:
+            discard = True
         raise
     finally:
-        conn.close()
+        _pool.release(conn, discard)
+
+
+# 参与增量同步的表：变更时自增用户的同步版本号，并写入行的 version 字段
+# key: 行主键；entity: 删除时写入墓碑的实体类型（None 表示无需墓碑）；watch: 监听的业务字段
+VERSIONED_TABLES = {
+    'wordcards': {
+        'key': 'id', 'entity': 'wordcard', 'name': 'name',
+        'watch': ['name', 'words', 'color']
+    },
+    'folders': {
+        'key': 'id', 'entity': 'folder', 'name': 'name',
+        'watch': ['name', 'cards', 'is_public', 'description']
+    },
+    'public_folders': {
+        'key': 'id', 'entity': 'public_folder', 'name': 'display_name',
+        'watch': ['folder_id', 'owner_name', 'display_name']
+    },
+    'layout': {
+        'key': 'user_id', 'entity': None,
+        'watch': ['layout']
+    },
+    'user_settings': {
+        'key': 'user_id', 'entity': None,
+        'watch': ['target_lang', 'translation_lang', 'ui_lang', 'theme', 'accent', 'repeat_count',
+                  'retry_count', 'interval_ms', 'slow_mode', 'shuffle_mode', 'dictate_mode']
+    }
+}
+
+
+def _ensure_column(cursor, table, column, definition):
+    """为已存在的表补充新字段（在线迁移）"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    columns = [row[1] for row in cursor.fetchall()]
+    if column not in columns:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        print(f"[DB] 已添加字段: {table}.{column}")
+        return True
+    return False
+
+
+def _bump_version_sql(user_expr):
+    """触发器内自增用户同步版本号的语句"""
+    # 不使用 INSERT OR IGNORE：外层 UPSERT 语句的冲突策略会覆盖触发器内的 OR IGNORE
+    return f"""
+        INSERT INTO sync_versions (user_id, version)
+        SELECT {user_expr}, 0 WHERE NOT EXISTS (SELECT 1 FROM sync_versions WHERE user_id = {user_expr});
+        UPDATE sync_versions SET version = version + 1 WHERE user_id = {user_expr};
+    """
+
+
+def _create_version_triggers(cursor):
+    """为参与同步的表创建版本号触发器"""
+    for table, spec in VERSIONED_TABLES.items():
+        key = spec['key']
+        current = "(SELECT version FROM sync_versions WHERE user_id = NEW.user_id)"
+        changed = " OR ".join(f"OLD.{col} IS NOT NEW.{col}" for col in spec['watch'])
+
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_version_ai AFTER INSERT ON {table} BEGIN
+                {_bump_version_sql('NEW.user_id')}
+                UPDATE {table} SET version = {current} WHERE {key} = NEW.{key};
+            END
+        """)
+
+        # 只在业务字段真正变化时更新版本（重复推送相同数据不会产生变更）
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_version_au
+            AFTER UPDATE OF {', '.join(spec['watch'])} ON {table}
+            WHEN {changed} BEGIN
+                {_bump_version_sql('NEW.user_id')}
+                UPDATE {table} SET version = {current} WHERE {key} = NEW.{key};
+            END
+        """)
+
+        if spec['entity']:
+            # 写入墓碑并清理保留范围之外的旧墓碑，tombstone_floor 记录已清理的最大版本号
+            # 保留范围来自配置，触发器每次启动重建
+            horizon = f"(SELECT version - {Config.SYNC_TOMBSTONE_RETENTION} FROM sync_versions WHERE user_id = OLD.user_id)"
+            cursor.execute(f"DROP TRIGGER IF EXISTS {table}_version_ad")
+            cursor.execute(f"""
+                CREATE TRIGGER {table}_version_ad AFTER DELETE ON {table} BEGIN
+                    {_bump_version_sql('OLD.user_id')}
+                    INSERT INTO sync_tombstones (user_id, entity, entity_id, name, version)
+                    VALUES (OLD.user_id, '{spec['entity']}', OLD.{key}, OLD.{spec['name']},
+                            (SELECT version FROM sync_versions WHERE user_id = OLD.user_id));
+                    UPDATE sync_versions SET tombstone_floor = COALESCE(
+                        (SELECT MAX(version) FROM sync_tombstones
+                         WHERE user_id = OLD.user_id AND version <= {horizon}), tombstone_floor)
+                    WHERE user_id = OLD.user_id;
+                    DELETE FROM sync_tombstones WHERE user_id = OLD.user_id AND version <= {horizon};
+                END
+            """)
+
+
+def _bump_public_refs_sql(ref_filter):
+    """触发器内为引用了某些文件夹的订阅者自增同步版本号，并写入引用行的 version 字段"""
+    return f"""
+        INSERT INTO sync_versions (user_id, version)
+        SELECT DISTINCT user_id, 0 FROM public_folders
+        WHERE {ref_filter} AND user_id NOT IN (SELECT user_id FROM sync_versions);
+        UPDATE sync_versions SET version = version + 1
+        WHERE user_id IN (SELECT user_id FROM public_folders WHERE {ref_filter});
+        UPDATE public_folders
+        SET version = (SELECT version FROM sync_versions s WHERE s.user_id = public_folders.user_id)
+        WHERE {ref_filter};
+    """
+
+
+def _init_public_ref_versions(cursor):
+    """
+    公开文件夹引用的派生字段（isInvalid、preview_cards）来自发布者的文件夹和单词卡，
+    发布者修改这些数据时，同时更新所有订阅者的引用版本，增量拉取才能看到引用失效或预览变化
+    - 文件夹取消公开、卡片列表或名称变化、删除
+    - 预览卡片（文件夹前 4 张）的名称、颜色变化或删除
+    删除文件夹时引用行由外键级联删除并写入墓碑，删除触发器只处理未级联的情况
+    """
+    folder_ref = "folder_id = {row}.id"
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS folders_public_refs_au
+        AFTER UPDATE OF is_public, cards, name ON folders
+        WHEN OLD.is_public IS NOT NEW.is_public OR OLD.cards IS NOT NEW.cards
+             OR OLD.name IS NOT NEW.name BEGIN
+            {_bump_public_refs_sql(folder_ref.format(row='NEW'))}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS folders_public_refs_ad AFTER DELETE ON folders BEGIN
+            {_bump_public_refs_sql(folder_ref.format(row='OLD'))}
+        END
+    """)
+
+    preview_ref = "folder_id IN (SELECT folder_id FROM folder_cards WHERE card_id = {row}.id AND position < 4)"
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS wordcards_public_refs_au
+        AFTER UPDATE OF name, color ON wordcards
+        WHEN OLD.name IS NOT NEW.name OR OLD.color IS NOT NEW.color BEGIN
+            {_bump_public_refs_sql(preview_ref.format(row='NEW'))}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS wordcards_public_refs_ad AFTER DELETE ON wordcards BEGIN
+            {_bump_public_refs_sql(preview_ref.format(row='OLD'))}
+        END
+    """)
+
+
+def _prune_tombstones(cursor):
+    """清理所有用户保留范围之外的墓碑（删除触发器只在该用户再次删除时清理，启动时统一补一次）"""
+    horizon = f"(SELECT s.version - {Config.SYNC_TOMBSTONE_RETENTION} FROM sync_versions s WHERE s.user_id = sync_tombstones.user_id)"
+    cursor.execute(f"""
+        UPDATE sync_versions SET tombstone_floor = COALESCE(
+            (SELECT MAX(t.version) FROM sync_tombstones t
+             WHERE t.user_id = sync_versions.user_id
+               AND t.version <= sync_versions.version - {Config.SYNC_TOMBSTONE_RETENTION}), tombstone_floor)
+    """)
+    cursor.execute(f"DELETE FROM sync_tombstones WHERE version <= {horizon}")
+    if cursor.rowcount:
+        print(f"[DB] 已清理过期同步墓碑: {cursor.rowcount} 条")
+
+
+# 文件夹单词数：按 cards 中的卡片 ID 累加同一用户单词卡的 word_count（在 UPDATE folders 语句内使用）
+_FOLDER_WORD_COUNT_SQL = """
+    (SELECT COALESCE(SUM(w.word_count), 0)
+     FROM json_each(folders.cards) c
+     JOIN wordcards w ON w.id = c.value AND w.user_id = folders.user_id)
+"""
+
+
+def _init_folder_cards(cursor):
+    """
+    文件夹卡片关系表 folder_cards(folder_id, card_id, position)
+    folders.cards（JSON 数组）仍是同步格式和写入入口，关系表由触发器随之维护，
+    用于按卡片反查文件夹、按顺序 JOIN 取卡片等查询（card_id 上有索引，无需逐行解析 JSON）
+    cards 中非整数的元素（null、字符串、嵌套值）不进入关系表，避免客户端脏数据使文件夹写入失败
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'folder_cards'")
+    exists = cursor.fetchone() is not None
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS folder_cards (
+            folder_id INTEGER NOT NULL REFERENCES folders(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            card_id INTEGER NOT NULL,
+            PRIMARY KEY (folder_id, position)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_folder_cards_card ON folder_cards(card_id)")
+
+    # 在线迁移：由现有 JSON 字段生成关系表
+    if not exists:
+        cursor.execute("""
+            INSERT INTO folder_cards (folder_id, position, card_id)
+            SELECT f.id, c.key, c.value FROM folders f, json_each(f.cards) c
+            WHERE c.type = 'integer'
+        """)
+        print(f"[DB] 已迁移文件夹卡片关系: {cursor.rowcount} 条")
+
+    # 触发器定义随版本变化，每次启动重建
+    cursor.execute("DROP TRIGGER IF EXISTS folder_cards_ai")
+    cursor.execute("""
+        CREATE TRIGGER folder_cards_ai AFTER INSERT ON folders BEGIN
+            INSERT INTO folder_cards (folder_id, position, card_id)
+            SELECT NEW.id, key, value FROM json_each(NEW.cards) WHERE type = 'integer';
+        END
+    """)
+    cursor.execute("DROP TRIGGER IF EXISTS folder_cards_au")
+    cursor.execute("""
+        CREATE TRIGGER folder_cards_au
+        AFTER UPDATE OF cards ON folders WHEN OLD.cards IS NOT NEW.cards BEGIN
+            DELETE FROM folder_cards WHERE folder_id = NEW.id;
+            INSERT INTO folder_cards (folder_id, position, card_id)
+            SELECT NEW.id, key, value FROM json_each(NEW.cards) WHERE type = 'integer';
+        END
+    """)
+    # 删除文件夹时由外键 ON DELETE CASCADE 清理
+
+
+def _init_word_counts(cursor):
+    """
+    单词数预计算字段
+    - wordcards.word_count：由 WordcardRepository 写入时计算
+    - folders.word_count：由触发器在卡片单词数或文件夹卡片列表变化时重算
+    word_count 不在 VERSIONED_TABLES 的监听字段中，更新它不会产生同步版本
+    """
+    added_cards = _ensure_column(cursor, 'wordcards', 'word_count', 'INTEGER NOT NULL DEFAULT 0')
+    added_folders = _ensure_column(cursor, 'folders', 'word_count', 'INTEGER NOT NULL DEFAULT 0')
+
+    # 旧数据库回填（在创建触发器之前，避免逐行重算文件夹）
+    if added_cards:
+        cursor.execute("SELECT id, words FROM wordcards")
+        rows = [(count_words(row[1]), row[0]) for row in cursor.fetchall()]
+        cursor.executemany("UPDATE wordcards SET word_count = ? WHERE id = ?", rows)
+        print(f"[DB] 已回填单词卡单词数: {len(rows)} 张")
+    if added_cards or added_folders:
+        cursor.execute(f"UPDATE folders SET word_count = {_FOLDER_WORD_COUNT_SQL}")
+        print(f"[DB] 已回填文件夹单词数: {cursor.rowcount} 个")
+
+    # 卡片单词数变化或卡片删除：重算包含该卡片的文件夹（通过 folder_cards 索引反查）
+    # 触发器定义随版本变化，每次启动重建
+    for suffix, event, row, when in (
+            ('ai', 'INSERT', 'NEW', 'NEW.word_count > 0'),
+            ('au', 'UPDATE OF word_count', 'NEW', 'OLD.word_count IS NOT NEW.word_count'),
+            ('ad', 'DELETE', 'OLD', 'OLD.word_count > 0')):
+        cursor.execute(f"DROP TRIGGER IF EXISTS wordcards_word_count_{suffix}")
+        cursor.execute(f"""
+            CREATE TRIGGER wordcards_word_count_{suffix}
+            AFTER {event} ON wordcards WHEN {when} BEGIN
+                UPDATE folders SET word_count = {_FOLDER_WORD_COUNT_SQL}
+                WHERE user_id = {row}.user_id
+                  AND id IN (SELECT folder_id FROM folder_cards WHERE card_id = {row}.id);
+            END
+        """)
+
+    # 文件夹新建或卡片列表变化：重算该文件夹
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS folders_word_count_ai AFTER INSERT ON folders BEGIN
+            UPDATE folders SET word_count = {_FOLDER_WORD_COUNT_SQL} WHERE id = NEW.id;
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS folders_word_count_au
+        AFTER UPDATE OF cards ON folders WHEN OLD.cards IS NOT NEW.cards BEGIN
+            UPDATE folders SET word_count = {_FOLDER_WORD_COUNT_SQL} WHERE id = NEW.id;
+        END
+    """)
+
+
+def _init_public_folder_search(cursor):
+    """
+    公开文件夹全文索引（FTS5）
+    只收录公开文件夹的名称和描述，rowid 即文件夹 ID，由触发器随 folders 表同步
+    使用 trigram 分词器：中文无空格分词，trigram 可做任意子串匹配（不少于 3 个字符）
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'folders_fts'")
+    exists = cursor.fetchone() is not None
+
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS folders_fts
+        USING fts5(name, description, tokenize = 'trigram')
+    """)
+    if not exists:
+        cursor.execute("""
+            INSERT INTO folders_fts (rowid, name, description)
+            SELECT id, name, COALESCE(description, '') FROM folders WHERE is_public = TRUE
+        """)
+        print(f"[DB] 已建立公开文件夹全文索引: {cursor.rowcount} 个")
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS folders_fts_ai AFTER INSERT ON folders WHEN NEW.is_public BEGIN
+            INSERT INTO folders_fts (rowid, name, description)
+            VALUES (NEW.id, NEW.name, COALESCE(NEW.description, ''));
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS folders_fts_au
+        AFTER UPDATE OF name, description, is_public ON folders
+        WHEN OLD.name IS NOT NEW.name OR OLD.description IS NOT NEW.description
+             OR OLD.is_public IS NOT NEW.is_public BEGIN
+            DELETE FROM folders_fts WHERE rowid = OLD.id;
+            INSERT INTO folders_fts (rowid, name, description)
+            SELECT NEW.id, NEW.name, COALESCE(NEW.description, '') WHERE NEW.is_public;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS folders_fts_ad AFTER DELETE ON folders BEGIN
+            DELETE FROM folders_fts WHERE rowid = OLD.id;
+        END
+    """)
 
 
 def init_db():
@@ -86,6 +572,7 @@ def init_db():
                 name TEXT NOT NULL,
                 words TEXT NOT NULL,
                 color TEXT,
+                version INTEGER NOT NULL DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
@@ -103,6 +590,7 @@ def init_db():
                 cards TEXT NOT NULL,
                 is_public BOOLEAN DEFAULT FALSE,
                 description TEXT,
+                version INTEGER NOT NULL DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
@@ -117,6 +605,7 @@ def init_db():
             CREATE TABLE IF NOT EXISTS layout (
                 user_id INTEGER PRIMARY KEY,
                 layout TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
             )
@@ -137,6 +626,7 @@ def init_db():
                 slow_mode BOOLEAN DEFAULT FALSE,
                 shuffle_mode BOOLEAN DEFAULT FALSE,
                 dictate_mode BOOLEAN DEFAULT FALSE,
+                version INTEGER NOT NULL DEFAULT 0,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
             )
@@ -151,6 +641,7 @@ def init_db():
                 owner_id INTEGER NOT NULL,
                 owner_name TEXT NOT NULL,
                 display_name TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
                 FOREIGN KEY (folder_id) REFERENCES folders(id) ON DELETE CASCADE,
@@ -161,5 +652,44 @@ def init_db():
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_public_folders_user ON public_folders(user_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_public_folders_folder ON public_folders(folder_id)")
 
+        # 增量同步：每个用户一个单调递增的版本号
+        # tombstone_floor：已清理墓碑的最大版本号，since 小于它的增量拉取可能缺少删除记录
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sync_versions (
+                user_id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0,
+                tombstone_floor INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        _ensure_column(cursor, 'sync_versions', 'tombstone_floor', 'INTEGER NOT NULL DEFAULT 0')
+
+        # 增量同步：已删除实体的墓碑记录
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sync_tombstones (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                entity TEXT NOT NULL,
+                entity_id INTEGER NOT NULL,
+                name TEXT,
+                version INTEGER NOT NULL
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sync_tombstones_user_version ON sync_tombstones(user_id, version)")
+
+        # 各同步表的行版本号（旧数据库在线补充字段）
+        for table in VERSIONED_TABLES:
+            _ensure_column(cursor, table, 'version', 'INTEGER NOT NULL DEFAULT 0')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_wordcards_user_version ON wordcards(user_id, version)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_folders_user_version ON folders(user_id, version)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_public_folders_user_version ON public_folders(user_id, version)")
+        _create_version_triggers(cursor)
+        _prune_tombstones(cursor)
+
+        # 文件夹卡片关系表、公开文件夹引用版本、单词数预计算和公开文件夹全文索引
+        _init_folder_cards(cursor)
+        _init_public_ref_versions(cursor)
+        _init_word_counts(cursor)
+        _init_public_folder_search(cursor)
+
         conn.commit()
         print("数据库初始化完成")
@@ -19,6 +19,43 @@ def _is_chinese(text):
     return any('\u4e00' <= char <= '\u9fff' for char in text)
 
 
+def _not_found_wordinfo(word, target_lang, chinese=False, suggestions=None):
+    """词典未找到时返回的默认 wordinfo（英文附带拼写建议 suggestions）"""
+    if chinese:
+        return {
+            'word': word,
+            'translation': '未找到释义，请自定义',
+            'targetDefinitions': [{'pos': '', 'meanings': ['非中英，请自定义']}],
+            'nativeDefinitions': {},
+            'examples': {},
+            'wordForms': {},
+            'meta': {'source': 'default', 'language': target_lang}
+        }
+    return {
+        'word': word,
+        'translation': '未找到释义，请自定义',
+        'targetDefinitions': [{'pos': '', 'meanings': ['未找到释义，请自定义']}],
+        'nativeDefinitions': {},
+        'examples': {'common': [], 'fun': []},
+        'wordForms': {},
+        'suggestions': suggestions or [],
+        'meta': {'source': 'default', 'language': target_lang}
+    }
+
+
+def _unsupported_wordinfo(word, target_lang):
+    """非中英语言返回的默认 wordinfo"""
+    return {
+        'word': word,
+        'translation': '非中英，请自定义',
+        'targetDefinitions': [{'pos': '', 'meanings': ['非中英，请自定义']}],
+        'nativeDefinitions': {},
+        'examples': {'common': [], 'fun': []},
+        'wordForms': {},
+        'meta': {'source': 'default', 'language': target_lang}
+    }
+
+
 def _query_word_info(word, target_lang='en', native_lang='zh'):
     """
     查询单词信息（数据库架构）
@@ -30,41 +67,28 @@ def _query_word_info(word, target_lang='en', native_lang='zh'):
 
     Returns:
         dict: 单词信息，如果未找到返回默认翻译
+
+    每次查询只输出一行日志；未找到的词（含布隆过滤器拦截）由 /api/dict/stats 的 bloom 计数统计
     """
     # 1. 如果是中文词，使用本地数据库
     if _is_chinese(word):
-        print(f"[Dict] 查询中文词典: {word}")
-        db_result = dict_db.query_chinese_word(word)
-        if db_result:
-            wordinfo = dict_db.format_chinese_to_wordinfo(db_result)
+        wordinfo = dict_db.lookup_wordinfo(word, 'zh')
+        if wordinfo:
             print(f"[Dict] ✓ 中文数据库找到: {word}")
             return wordinfo
         else:
-            print(f"[Dict] ✗ 中文数据库未找到: {word}")
             # 返回默认翻译
-            return {
-                'word': word,
-                'translation': '未找到释义，请自定义',
-                'targetDefinitions': [{'pos': '', 'meanings': ['非中英，请自定义']}],
-                'nativeDefinitions': {},
-                'examples': {},
-                'wordForms': {},
-                'meta': {'source': 'default', 'language': target_lang}
-            }
+            return _not_found_wordinfo(word, target_lang, chinese=True)
 
     # 2. 如果是英文词，使用混合模式（本地优先，API 兜底）
     elif target_lang == 'en':
-        print(f"[Dict] 查询英文词典: {word}")
-
         # 2.1 先查本地数据库
-        db_result = dict_db.query_english_word(word)
-        if db_result:
-            wordinfo = dict_db.format_english_to_wordinfo(db_result)
+        wordinfo = dict_db.lookup_wordinfo(word, 'en')
+        if wordinfo:
             print(f"[Dict] ✓ 英文数据库找到: {word}")
             return wordinfo
 
         # 2.2 本地未找到，尝试 API 兜底（待实现）
-        print(f"[Dict] ✗ 英文数据库未找到: {word}")
         # TODO: 实现有道词典 API 查询作为兜底
         # 可以参考 tts.py 中的有道 API 调用方式
         # 示例：
@@ -77,30 +101,47 @@ def _query_word_info(word, target_lang='en', native_lang='zh'):
         # except Exception as e:
         #     print(f"[Dict] ✗ 有道 API 查询失败: {e}")
 
-        # 2.3 都失败，返回默认
-        print(f"[Dict] ✗ 所有数据源都未找到: {word}")
-        return {
-            'word': word,
-            'translation': '未找到释义，请自定义',
-            'targetDefinitions': [{'pos': '', 'meanings': ['未找到释义，请自定义']}],
-            'nativeDefinitions': {},
-            'examples': {'common': [], 'fun': []},
-            'wordForms': {},
-            'meta': {'source': 'default', 'language': target_lang}
-        }
+        # 2.3 都失败，返回默认翻译和拼写建议
+        return _not_found_wordinfo(word, target_lang, suggestions=dict_db.suggest(word))
 
     # 3. 日语、韩语等其他语言：返回默认翻译
     else:
         print(f"[Dict] 非中英语言: {word} ({target_lang})")
-        return {
-            'word': word,
-            'translation': '非中英，请自定义',
-            'targetDefinitions': [{'pos': '', 'meanings': ['非中英，请自定义']}],
-            'nativeDefinitions': {},
-            'examples': {'common': [], 'fun': []},
-            'wordForms': {},
-            'meta': {'source': 'default', 'language': target_lang}
-        }
+        return _unsupported_wordinfo(word, target_lang)
+
+
+def _query_word_info_batch(words, target_lang='en', native_lang='zh'):
+    """
+    批量查询单词信息：中文、英文各一次集合查询（未命中缓存的部分）
+
+    Returns:
+        dict: {word: wordinfo}，未找到的词返回默认翻译
+    """
+    zh_words = [w for w in words if _is_chinese(w)]
+    en_words = [w for w in words if not _is_chinese(w)] if target_lang == 'en' else []
+
+    found = {}
+    if zh_words:
+        found.update(dict_db.lookup_wordinfo_batch(zh_words, 'zh'))
+    if en_words:
+        found.update(dict_db.lookup_wordinfo_batch(en_words, 'en'))
+
+    # 英文未找到的词：一次查询拼写建议
+    suggestions = dict_db.suggest_batch([w for w in en_words if w not in found])
+
+    results = {}
+    for word in words:
+        if word in found:
+            results[word] = found[word]
+        elif _is_chinese(word):
+            results[word] = _not_found_wordinfo(word, target_lang, chinese=True)
+        elif target_lang == 'en':
+            results[word] = _not_found_wordinfo(word, target_lang, suggestions=suggestions.get(word))
+        else:
+            results[word] = _unsupported_wordinfo(word, target_lang)
+
+    print(f"[Dict] 批量查询 {len(words)} 个词: 中文 {len(zh_words)}，英文 {len(en_words)}，找到 {len(found)}")
+    return results
 
 
 @dict_api_bp.route("/api/dict/batch", methods=["POST"])
@@ -119,24 +160,73 @@ def dict_batch():
     if not words:
         return jsonify({"error": "缺少 words 参数"}), 400
 
-    # 过滤无效输入，限制单次最多 MAX_BATCH_SIZE 个
-    words = [w for w in words if w and w.strip()][:MAX_BATCH_SIZE]
+    # 过滤无效输入并去重，限制单次最多 MAX_BATCH_SIZE 个
+    words = list(dict.fromkeys(w for w in words if isinstance(w, str) and w.strip()))[:MAX_BATCH_SIZE]
 
     if not words:
         return jsonify({"error": "无有效词语"}), 400
 
-    print(f"[Dict] 批量查询: {words}")
-
-    # 直接查询所有词语
-    results = {}
-    for word in words:
-        wordinfo = _query_word_info(word, target_lang, native_lang)
-        if wordinfo:
-            results[word] = wordinfo
+    results = _query_word_info_batch(words, target_lang, native_lang)
 
     return jsonify({"results": results})
 
 
+@dict_api_bp.route("/api/dict/preload", methods=["POST"])
+def dict_preload():
+    """
+    单词卡预加载数据包：一次请求返回所有词的释义、例句和同词根词汇
+    POST /api/dict/preload
+    Body: { "words": ["apple", "run"], "targetLang": "en", "nativeLang": "zh",
+            "exampleLimit": 2, "lemmaLimit": 30 }
+    返回: {
+        "results": { "apple": {...}, "run": {...} },
+        "examples": { "apple": [{"en": "...", "zh": "..."}], "run": [] },
+        "lemmaWords": { "run": [{"word": "running", ...}] }    // 仅英文
+    }
+    """
+    data = request.get_json(silent=True) or {}
+    words = data.get("words", [])
+    target_lang = data.get("targetLang", "en")
+    native_lang = data.get("nativeLang", "zh")
+    try:
+        example_limit = min(max(int(data.get("exampleLimit", 2)), 0), 10)
+        lemma_limit = min(max(int(data.get("lemmaLimit", 30)), 0), 100)
+    except (TypeError, ValueError):
+        return jsonify({"error": "exampleLimit / lemmaLimit 必须是整数"}), 400
+
+    if not isinstance(words, list):
+        return jsonify({"error": "words 必须是数组"}), 400
+
+    # 过滤无效输入并去重，限制单次最多 MAX_BATCH_SIZE 个
+    words = list(dict.fromkeys(w for w in words if isinstance(w, str) and w.strip()))[:MAX_BATCH_SIZE]
+    if not words:
+        return jsonify({"error": "无有效词语"}), 400
+
+    # 1. 释义：中文、英文各一次集合查询
+    results = _query_word_info_batch(words, target_lang, native_lang)
+
+    # 2. 例句：一次 FTS5 查询，每个词取排名前 exampleLimit 条
+    examples = dict_db.search_examples_batch(words, lang=target_lang, limit=example_limit) if example_limit else {}
+
+    # 3. 同词根词汇（仅英文）：一次查询所有词根
+    lemma_words = {}
+    if target_lang == 'en' and lemma_limit:
+        lemmas = list(dict.fromkeys(
+            info['lemma'] for info in results.values()
+            if info.get('lemma') and info['lemma'] != '-'
+        ))
+        lemma_words = dict_db.search_by_lemma_batch(lemmas, lemma_limit)
+
+    print(f"[Dict] 预加载数据包: {len(words)} 个词，例句 {sum(1 for e in examples.values() if e)} 个词有例句，"
+          f"词根 {len(lemma_words)} 个")
+
+    return jsonify({
+        "results": results,
+        "examples": examples,
+        "lemmaWords": lemma_words
+    })
+
+
 @dict_api_bp.route("/api/dict/details", methods=["POST"])
 def dict_details():
     """
@@ -164,22 +254,21 @@ def dict_details():
 @dict_api_bp.route("/api/dict/search", methods=["GET"])
 def dict_search():
     """
-    模糊搜索（用于自动补全）
+    前缀搜索（用于自动补全）
     GET /api/dict/search?q=学&limit=10
+    GET /api/dict/search?q=xuex&lang=zh   拼音前缀（声调可省略）
+    GET /api/dict/search?q=app&lang=en
+    lang 缺省时：中文输入按汉字搜索，其余按英文搜索
     """
     query = request.args.get("q", "")
-    limit = int(request.args.get("limit", 20))
+    limit = request.args.get("limit", 20, type=int)
+    lang = request.args.get("lang") or ("zh" if _is_chinese(query) else "en")
 
-    if not query:
+    if not query.strip():
         return jsonify({"results": []})
 
-    # 如果是中文，使用本地数据库搜索
-    if _is_chinese(query):
-        results = dict_db.search_chinese_fuzzy(query, limit)
-        return jsonify({"results": results})
-
-    # 英文暂不支持模糊搜索
-    return jsonify({"results": []})
+    results = dict_db.search_prefix(query, lang, limit)
+    return jsonify({"results": results})
 
 
 @dict_api_bp.route("/api/dict/lemma/<lemma>", methods=["GET"])
@@ -216,6 +305,39 @@ def get_lemma_words(lemma):
     })
 
 
+@dict_api_bp.route("/api/dict/lemma/batch", methods=["POST"])
+def get_lemma_words_batch():
+    """
+    批量查询多个词根的同词根词汇（一次索引查询）
+    POST /api/dict/lemma/batch
+    Body: { "lemmas": ["run", "be"], "exclude": ["running"], "limit": 30 }
+    返回: { "results": { "run": [{"word": "runs", ...}], "be": [...] } }
+    每个词根最多 limit 个，按词频排序，exclude 中的词（如单词卡上的查询词）不返回
+    """
+    data = request.get_json(silent=True) or {}
+    lemmas = data.get("lemmas", [])
+    exclude = data.get("exclude", [])
+    try:
+        limit = min(max(int(data.get("limit", 50)), 1), 100)
+    except (TypeError, ValueError):
+        return jsonify({"error": "limit 必须是整数"}), 400
+
+    if not isinstance(lemmas, list) or not isinstance(exclude, list):
+        return jsonify({"error": "lemmas / exclude 必须是数组"}), 400
+
+    # 过滤无效输入并去重，限制单次最多 MAX_BATCH_SIZE 个
+    lemmas = list(dict.fromkeys(w.strip() for w in lemmas if isinstance(w, str) and w.strip()))[:MAX_BATCH_SIZE]
+    exclude = [w for w in exclude if isinstance(w, str)][:MAX_BATCH_SIZE]
+    if not lemmas:
+        return jsonify({"error": "无有效词根"}), 400
+
+    results = dict_db.search_by_lemma_batch(lemmas, limit, exclude)
+    print(f"[Dict] 批量查询同词根词汇: {len(lemmas)} 个词根，"
+          f"找到 {sum(len(words) for words in results.values())} 个词")
+
+    return jsonify({"results": results})
+
+
 @dict_api_bp.route("/api/dict/stats", methods=["GET"])
 def dict_stats():
     """
@@ -228,17 +350,15 @@ def dict_stats():
 
     if dict_db.zh_conn:
         try:
-            cursor = dict_db.zh_conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM words")
-            zh_count = cursor.fetchone()[0]
+            with dict_db.connection('zh') as conn:
+                zh_count = conn.execute("SELECT COUNT(*) FROM words").fetchone()[0]
         except:
             pass
 
     if dict_db.en_conn:
         try:
-            cursor = dict_db.en_conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM words")
-            en_count = cursor.fetchone()[0]
+            with dict_db.connection('en') as conn:
+                en_count = conn.execute("SELECT COUNT(*) FROM words").fetchone()[0]
         except:
             pass
 
@@ -254,7 +374,11 @@ def dict_stats():
             "source": "ECDICT" if dict_db.en_conn else "未安装",
             "count": en_count,
             "status": "✓ 本地数据库" if dict_db.en_conn else "⚠ 未安装"
-        }
+        },
+        "cache": dict_db.cache_stats(),
+        "examplesCache": dict_db.examples_cache.stats(),
+        "bloom": dict_db.bloom_stats(),
+        "connections": dict_db.connection_stats()
     }
     return jsonify(stats)
 
@@ -286,19 +410,9 @@ def get_examples(word):
 
     print(f"[Dict] 查询例句: word={word}, lang={lang}, limit={limit}")
 
-    # 调用数据库查询例句
+    # 调用数据库查询例句（已按相关度排序，重复句子对在构建时已删除）
     examples = dict_db.search_examples(word, lang=lang, limit=limit)
 
-    # 去重：过滤掉中英文都相同的重复例句
-    seen = set()
-    unique_examples = []
-    for ex in examples:
-        key = (ex.get('en'), ex.get('zh'))
-        if key not in seen:
-            seen.add(key)
-            unique_examples.append(ex)
-    examples = unique_examples
-
     print(f"[Dict] 找到 {len(examples)} 条例句")
 
     return jsonify({
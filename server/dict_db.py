@@ -5,8 +5,24 @@
 
 import sqlite3
 import json
+import re
+import threading
+import queue
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
+
+from cache import LRUCache
+from config import Config
+from constants import (DICT_CACHE_SIZE, SEARCH_MAX_LIMIT, SUGGEST_LIMIT, EXAMPLES_CACHE_SIZE,
+                       EXAMPLE_IDEAL_LENGTH, EXAMPLE_LENGTH_WEIGHT)
+from dict_format import (WORDINFO_FORMAT_VERSION, wordinfo_source_columns,
+                         chinese_row_to_result, english_row_to_result,
+                         format_chinese_to_wordinfo, format_english_to_wordinfo)
+from prefix_index import PrefixIndex, normalize_pinyin
+from lookup_key import LOOKUP_KEY_VERSION, normalize_en_key, normalize_zh_key
+from bloom import BloomFilter
+from spelling import SpellingIndex
 
 # 数据库路径
 DB_DIR = Path(__file__).parent.parent / 'data' / 'databases'
@@ -16,382 +32,775 @@ SENTENCE_PAIRS_DB = DB_DIR / 'sentence_pairs.db'
 
 
 class DictDatabase:
-    """词典数据库查询类"""
-
-    def __init__(self):
-        self.zh_conn = None
-        self.en_conn = None
-        self.sentence_conn = None
+    """
+    词典数据库查询类
+
+    只读模式（Config.DICT_READONLY，默认开启）：
+    - 以 mode=ro&immutable=1 URI 打开，跳过文件锁和变更检测，并开启大 mmap_size，
+      多个 worker 进程通过 OS 页缓存共享同一份词典数据
+    - 查询时从每个库的小连接池借出连接、用完归还，并发查询不争用同一个连接对象，
+      也不会为每个请求线程重新打开数据库
+    词典只在离线构建时写入；重新构建词典后需要重启服务
+    """
+
+    def __init__(self, readonly: bool = Config.DICT_READONLY):
+        self.readonly = readonly
+        self._paths = {}            # 已成功连接的数据库: name -> path
+        self._main_conns = {}       # 连接时打开的连接（非只读模式下为所有线程共享的连接）
+        self._pools = {}            # 只读模式：name -> 空闲连接池（LifoQueue，最近归还的连接先被复用）
+        self._immutable = {}        # name -> 是否以 immutable 打开
+        # 表结构特性（连接时检测一次）
+        self.zh_has_extensions = False  # synonyms / cilin_code 字段
+        self.zh_has_lookup_key = False  # 简繁体统一查询键表 lookup_keys（版本与当前一致）
+        self.en_has_lemma = False       # lemma / lemma_frequency 字段
+        self.en_has_lookup_key = False  # 归一化查询键 lookup_key 及其索引（版本与当前一致）
+        self.en_has_lemma_forms = False # 词典外词形 -> 词根索引 lemma_forms（版本与当前一致）
+        # 预编译 wordinfo 是否可用（构建版本与当前格式一致）
+        self.zh_precompiled = False
+        self.en_precompiled = False
+        # 词条布隆过滤器（scripts/build_bloom.py 生成）：lang -> BloomFilter
+        self.blooms = {}
+        self._bloom_counts = {}  # lang -> {'rejected': 拦截数, 'falsePositives': 假阳性数}
+        self._bloom_lock = threading.Lock()
+        # 英文拼写建议索引（scripts/build_spelling.py 生成）
+        self.spelling = None
+        # 例句全文索引是否存在
+        self.sentence_has_en_fts = False
+        self.sentence_has_zh_fts = False
+        # 格式化后的 wordinfo 缓存，键为 (word, lang)
+        self.wordinfo_cache = LRUCache(DICT_CACHE_SIZE)
+        # 例句查询结果缓存，键为 (word, lang, limit)
+        self.examples_cache = LRUCache(EXAMPLES_CACHE_SIZE)
+        # 自动补全前缀索引（'en' / 'zh' / 'pinyin'），首次搜索时加载
+        self._prefix_indexes = {}
+        self._prefix_lock = threading.Lock()
         self._connect_zh()
         self._connect_en()
         self._connect_sentences()
 
+    @property
+    def zh_conn(self):
+        return self._main_conns.get('zh')
+
+    @property
+    def en_conn(self):
+        return self._main_conns.get('en')
+
+    @property
+    def sentence_conn(self):
+        return self._main_conns.get('sentences')
+
+    def _open(self, name: str, path: Path) -> sqlite3.Connection:
+        """按当前模式打开数据库连接"""
+        if not self.readonly:
+            conn = sqlite3.connect(str(path), check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            return conn
+
+        immutable = self._immutable.get(name)
+        if immutable is None:
+            # 残留 WAL 文件说明构建未正常结束（未 checkpoint），immutable 会忽略其中的数据
+            wal = Path(str(path) + '-wal')
+            immutable = not (wal.exists() and wal.stat().st_size > 0)
+            if not immutable:
+                print(f"⚠ {path.name} 存在未合并的 WAL 文件，以普通只读模式打开")
+            self._immutable[name] = immutable
+
+        uri = path.as_uri() + ('?mode=ro&immutable=1' if immutable else '?mode=ro')
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA mmap_size = {Config.DICT_MMAP_SIZE}")
+        return conn
+
+    @contextmanager
+    def connection(self, name: str) -> Iterator[Optional[sqlite3.Connection]]:
+        """
+        借出一个连接，用完归还（数据库未连接时为 None）
+        非只读模式返回共享连接；只读模式从该库的连接池取出空闲连接，池空时新开一个，
+        归还时池已满则关闭
+        """
+        pool = self._pools.get(name)
+        if pool is None:
+            yield self._main_conns.get(name)
+            return
+
+        try:
+            conn = pool.get_nowait()
+        except queue.Empty:
+            conn = self._open(name, self._paths[name])
+        try:
+            yield conn
+        finally:
+            try:
+                pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def _register(self, name: str, path: Path, conn: sqlite3.Connection):
+        """登记连接成功的数据库（连接时使用的连接作为主连接，供脚本和统计使用）"""
+        self._paths[name] = path
+        self._main_conns[name] = conn
+        if self.readonly:
+            self._pools[name] = queue.LifoQueue(maxsize=Config.DICT_POOL_SIZE)
+
+    def connection_stats(self) -> Dict:
+        """连接统计"""
+        return {
+            'mode': 'readonly' if self.readonly else 'shared',
+            'immutable': dict(self._immutable),
+            'mmap_size': Config.DICT_MMAP_SIZE if self.readonly else 0,
+            'poolSize': Config.DICT_POOL_SIZE if self.readonly else 0,
+            'idle': {name: pool.qsize() for name, pool in self._pools.items()},
+            'connections': len(self._main_conns) + sum(pool.qsize() for pool in self._pools.values())
+        }
+
     def _connect_zh(self):
         """连接中文数据库"""
         if ZH_DB.exists():
             try:
-                self.zh_conn = sqlite3.connect(str(ZH_DB), check_same_thread=False)
-                self.zh_conn.row_factory = sqlite3.Row
+                conn = self._open('zh', ZH_DB)
+
+                columns = self._get_columns(conn, 'words')
+                self.zh_has_extensions = 'synonyms' in columns and 'cilin_code' in columns
                 print(f"✓ 中文词典数据库已连接: {ZH_DB}")
+                self.zh_has_lookup_key = self._check_lookup_key(conn, 'zh')
+                self._load_bloom(conn, 'zh', ZH_DB)
+                self.zh_precompiled = self._check_precompiled(conn, 'zh')
+                self._register('zh', ZH_DB, conn)
             except Exception as e:
                 print(f"✗ 连接中文数据库失败: {e}")
-                self.zh_conn = None
         else:
             print(f"⚠ 中文词典数据库不存在: {ZH_DB}")
-            self.zh_conn = None
 
     def _connect_en(self):
         """连接英文数据库（ECDICT）"""
         if EN_DB.exists():
             try:
-                self.en_conn = sqlite3.connect(str(EN_DB), check_same_thread=False)
-                self.en_conn.row_factory = sqlite3.Row
+                conn = self._open('en', EN_DB)
 
                 # 检查 ECDICT 表结构
-                cursor = self.en_conn.cursor()
+                cursor = conn.cursor()
                 cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='words'")
                 if cursor.fetchone():
                     # 获取词条数量
                     cursor.execute("SELECT COUNT(*) FROM words")
                     count = cursor.fetchone()[0]
+                    self.en_has_lemma = 'lemma' in self._get_columns(conn, 'words')
                     print(f"✓ 英文词典数据库已连接: {EN_DB} ({count:,} 词条)")
+                    self.en_has_lookup_key = self._check_lookup_key(conn, 'en')
+                    self.en_has_lemma_forms = self.en_has_lookup_key and self._check_lemma_forms(conn)
+                    self._load_spelling(count)
+                    self._load_bloom(conn, 'en', EN_DB, count)
+                    self.en_precompiled = self._check_precompiled(conn, 'en')
+                    self._register('en', EN_DB, conn)
                 else:
                     print(f"⚠ 英文词典表结构不正确（缺少 words 表）")
-                    self.en_conn = None
+                    conn.close()
             except Exception as e:
                 print(f"✗ 连接英文数据库失败: {e}")
-                self.en_conn = None
         else:
             print(f"⚠ 英文词典数据库不存在: {EN_DB}")
-            self.en_conn = None
 
     def _connect_sentences(self):
         """连接例句数据库"""
         if SENTENCE_PAIRS_DB.exists():
             try:
-                self.sentence_conn = sqlite3.connect(str(SENTENCE_PAIRS_DB), check_same_thread=False)
-                self.sentence_conn.row_factory = sqlite3.Row
+                conn = self._open('sentences', SENTENCE_PAIRS_DB)
 
                 # 获取例句数量
-                cursor = self.sentence_conn.cursor()
+                cursor = conn.cursor()
                 cursor.execute("SELECT COUNT(*) FROM sentence_pairs")
                 count = cursor.fetchone()[0]
                 print(f"✓ 例句数据库已连接: {SENTENCE_PAIRS_DB} ({count:,} 句子对)")
+
+                # 检测全文索引（由 scripts/integrate_tatoeba.py 构建）
+                cursor.execute("SELECT name FROM sqlite_master WHERE name IN ('sentence_pairs_fts', 'sentence_pairs_zh_fts')")
+                tables = {row[0] for row in cursor.fetchall()}
+                self.sentence_has_en_fts = 'sentence_pairs_fts' in tables
+                self.sentence_has_zh_fts = 'sentence_pairs_zh_fts' in tables
+                if not self.sentence_has_zh_fts:
+                    print("⚠ 缺少中文例句索引，中文例句使用 LIKE 搜索（运行 integrate_tatoeba.py --reindex 生成）")
+                self._register('sentences', SENTENCE_PAIRS_DB, conn)
             except Exception as e:
                 print(f"✗ 连接例句数据库失败: {e}")
-                self.sentence_conn = None
         else:
             print(f"⚠ 例句数据库不存在: {SENTENCE_PAIRS_DB}")
-            self.sentence_conn = None
 
 
-    def query_chinese_word(self, word: str) -> Optional[Dict]:
-        """查询中文词语"""
-        if not self.zh_conn:
-            return None
+    @staticmethod
+    def _get_columns(conn, table: str) -> set:
+        """获取表的字段名集合"""
+        cursor = conn.cursor()
+        cursor.execute(f"PRAGMA table_info({table})")
+        return {row[1] for row in cursor.fetchall()}
 
+    def _check_precompiled(self, conn, lang: str) -> bool:
+        """
+        检查预编译 wordinfo（scripts/build_wordinfo.py）是否可用
+        格式版本或源字段与当前代码不一致时视为过期，回退到实时格式化
+        """
+        columns = self._get_columns(conn, 'words')
+        if 'wordinfo' not in columns:
+            return False
+
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT key, value FROM build_info WHERE key LIKE 'wordinfo_%'")
+            info = {row[0]: row[1] for row in cursor.fetchall()}
+        except sqlite3.Error:
+            info = {}
+
+        expected_columns = ','.join(wordinfo_source_columns(lang, columns))
+        if info.get('wordinfo_format') != str(WORDINFO_FORMAT_VERSION):
+            print(f"⚠ [{lang}] 预编译 wordinfo 已过期（格式版本 {info.get('wordinfo_format')}，"
+                  f"当前 {WORDINFO_FORMAT_VERSION}），使用实时格式化")
+            return False
+        if info.get('wordinfo_columns') != expected_columns:
+            print(f"⚠ [{lang}] 预编译 wordinfo 的源字段与词典表不一致，使用实时格式化")
+            return False
+
+        print(f"✓ [{lang}] 预编译 wordinfo 可用（{info.get('wordinfo_rows', '?')} 条，"
+              f"校验和 {info.get('wordinfo_checksum', '')[:12]}）")
+        return True
+
+    def _check_lookup_key(self, conn, lang: str) -> bool:
+        """
+        检查归一化查询键（scripts/build_lookup_key.py）是否可用
+        英文为 words.lookup_key 字段的索引，中文为 lookup_keys 表
+        """
+        name = 'idx_words_lookup_key' if lang == 'en' else 'lookup_keys'
         try:
-            cursor = self.zh_conn.cursor()
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM build_info WHERE key = 'lookup_key_version'")
+            row = cursor.fetchone()
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,))
+            exists = cursor.fetchone() is not None
+        except sqlite3.Error:
+            row, exists = None, False
+
+        version = row[0] if row else None
+        if version != str(LOOKUP_KEY_VERSION) or not exists:
+            fallback = '按小写词条查询' if lang == 'en' else '按简体/繁体字段查询'
+            print(f"⚠ [{lang}] 查询键不可用或已过期（版本 {version}，当前 {LOOKUP_KEY_VERSION}），"
+                  f"{fallback}；运行 python scripts/build_lookup_key.py {lang} 生成")
+            return False
+        return True
+
+    def _check_lemma_forms(self, conn) -> bool:
+        """
+        检查词形 -> 词根索引（scripts/integrate_lemma.py 生成）是否可用
+        键与 lookup_key 同一归一化规则，查询键版本变化后视为过期
+        """
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM build_info WHERE key = 'lemma_forms_version'")
+            row = cursor.fetchone()
+            cursor.execute("SELECT COUNT(*) FROM lemma_forms")
+            count = cursor.fetchone()[0]
+        except sqlite3.Error:
+            print("⚠ [en] 词形索引不存在，词典外的词形变化不回退到词根；运行 python scripts/integrate_lemma.py 生成")
+            return False
+
+        version = row[0] if row else None
+        if version != str(LOOKUP_KEY_VERSION):
+            print(f"⚠ [en] 词形索引已过期（版本 {version}，当前 {LOOKUP_KEY_VERSION}），不回退到词根")
+            return False
+        print(f"✓ [en] 词形索引可用（{count:,} 个词典外词形）")
+        return True
+
+    def _load_spelling(self, rows: int):
+        """
+        映射英文拼写建议索引（与词典数据库同目录的 .spell 文件）
+        查询键版本或词条数与词典不一致时不使用，未找到的词不返回建议
+        """
+        path = EN_DB.with_suffix('.spell')
+        index = SpellingIndex.load(path)
+        if index is None:
+            print(f"⚠ [en] 拼写建议索引不存在，未找到的词不返回建议；运行 python scripts/build_spelling.py 生成")
+            return
+        if index.key_version != LOOKUP_KEY_VERSION or index.source_rows != rows:
+            print(f"⚠ [en] 拼写建议索引已过期（词条数 {index.source_rows:,}，词典 {rows:,}），不使用")
+            return
+
+        self.spelling = index
+        print(f"✓ [en] 拼写建议索引已加载: {index.num_terms:,} 个候选词，"
+              f"{index.size_bytes() / 1024 / 1024:.1f} MB")
+
+    def _load_bloom(self, conn, lang: str, db_path: Path, rows: Optional[int] = None):
+        """
+        映射词条布隆过滤器（与词典数据库同目录的 .bloom 文件）
+        查询键版本或词条数与词典不一致时不使用（过期的过滤器会把新词条误判为不存在）
+        """
+        if not Config.DICT_BLOOM:
+            return
+        path = db_path.with_suffix('.bloom')
+        bloom = BloomFilter.load(path)
+        if bloom is None:
+            print(f"⚠ [{lang}] 布隆过滤器不存在，未命中的词将查询数据库；运行 python scripts/build_bloom.py {lang} 生成")
+            return
+
+        if rows is None:
+            rows = conn.execute("SELECT COUNT(*) FROM words").fetchone()[0]
+        if lang == 'en' and conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'lemma_forms'").fetchone():
+            # 英文过滤器同时收录词形索引中的词形
+            rows += conn.execute("SELECT COUNT(*) FROM lemma_forms").fetchone()[0]
+        if bloom.key_version != LOOKUP_KEY_VERSION or bloom.source_rows != rows:
+            print(f"⚠ [{lang}] 布隆过滤器已过期（词条数 {bloom.source_rows:,}，词典 {rows:,}），不使用")
+            return
+
+        self.blooms[lang] = bloom
+        self._bloom_counts[lang] = {'rejected': 0, 'falsePositives': 0}
+        print(f"✓ [{lang}] 布隆过滤器已加载: {bloom.num_keys:,} 个键，{bloom.size_bytes() / 1024:,.0f} KB，"
+              f"理论误判率 {bloom.expected_fp_rate():.2%}")
+
+    def might_contain(self, word: str, lang: str, key: Optional[tuple] = None) -> bool:
+        """
+        词典中是否可能有该词；False 表示确定没有（无需查询数据库），没有过滤器时总是 True
+        key 为已算好的 _cache_key(word, lang)，传入时不再重复归一化
+        """
+        bloom = self.blooms.get(lang)
+        if bloom is None:
+            return True
+        if (key or self._cache_key(word, lang))[0] in bloom:
+            return True
+        with self._bloom_lock:
+            self._bloom_counts[lang]['rejected'] += 1
+        return False
+
+    def _record_false_positives(self, lang: str, count: int):
+        """记录通过过滤器但数据库中没有的词（假阳性）"""
+        if count and lang in self.blooms:
+            with self._bloom_lock:
+                self._bloom_counts[lang]['falsePositives'] += count
+
+    def bloom_stats(self) -> Dict:
+        """
+        布隆过滤器统计
+        observedFpRate: 实际未命中的词中被误判为"可能存在"的比例 = 假阳性 / (假阳性 + 拦截)
+        """
+        stats = {}
+        with self._bloom_lock:
+            for lang, bloom in self.blooms.items():
+                counts = dict(self._bloom_counts[lang])
+                misses = counts['falsePositives'] + counts['rejected']
+                stats[lang] = {
+                    'keys': bloom.num_keys,
+                    'bytes': bloom.size_bytes(),
+                    'hashes': bloom.num_hashes,
+                    'expectedFpRate': round(bloom.expected_fp_rate(), 6),
+                    **counts,
+                    'observedFpRate': round(counts['falsePositives'] / misses, 6) if misses else None
+                }
+        return stats
 
-            # 检查是否有扩展字段
-            cursor.execute("PRAGMA table_info(words)")
-            columns = [row[1] for row in cursor.fetchall()]
-            has_extensions = 'synonyms' in columns and 'cilin_code' in columns
+    @staticmethod
+    def _cache_key(word: str, lang: str) -> tuple:
+        """wordinfo 缓存键（按归一化查询键，大小写、弯引号、全角等写法不同的输入共用缓存）"""
+        return (normalize_en_key(word) if lang == 'en' else normalize_zh_key(word), lang)
 
-            # 查询简体或繁体
-            if has_extensions:
-                cursor.execute('''
-                    SELECT simplified, traditional, pinyin, translation, pos, frequency,
-                           synonyms, cilin_code
-                    FROM words
-                    WHERE simplified = ? OR traditional = ?
-                    LIMIT 1
-                ''', (word, word))
-            else:
-                cursor.execute('''
-                    SELECT simplified, traditional, pinyin, translation, pos, frequency
-                    FROM words
-                    WHERE simplified = ? OR traditional = ?
-                    LIMIT 1
-                ''', (word, word))
+    def lookup_wordinfo(self, word: str, lang: str) -> Optional[Dict]:
+        """
+        查询并格式化为前端 wordinfo（带 LRU 缓存；布隆过滤器判定不存在的词不查询数据库；
+        英文词典外的词形变化回退到词根词条）
 
-            row = cursor.fetchone()
-            if not row:
-                return None
+        Args:
+            word: 要查询的词
+            lang: 'en' 或 'zh'
 
-            result = {
-                'word': row['simplified'],
-                'traditional': row['traditional'],
-                'pinyin': row['pinyin'],
-                'translation': row['translation'],
-                'pos': row['pos'],
-                'source': 'local_db'
-            }
+        Returns:
+            wordinfo 字典（缓存共享，调用方不要修改），未找到返回 None
+        """
+        key = self._cache_key(word, lang)
+        wordinfo = self.wordinfo_cache.get(key)
+        if wordinfo is not None:
+            return wordinfo
 
-            # 添加扩展数据
-            if has_extensions:
-                result['cilin_code'] = row['cilin_code']
-
-                # 解析 synonyms JSON
-                if row['synonyms']:
-                    try:
-                        import json
-                        result['synonyms'] = json.loads(row['synonyms'])
-                    except:
-                        result['synonyms'] = []
-                else:
-                    result['synonyms'] = []
+        if not self.might_contain(word, lang, key):
+            return None
 
-            return result
+        if lang == 'en':
+            row = self._query_english_rows([word]).get(word)
+            wordinfo = self._english_row_to_wordinfo(row) if row else None
+            if wordinfo is None:
+                wordinfo = self._lemma_fallback_wordinfo([word]).get(word)
+        else:
+            row = self._query_chinese_rows([word]).get(word)
+            wordinfo = self._chinese_row_to_wordinfo(row) if row else None
 
-        except Exception as e:
-            print(f"✗ 查询中文词语失败: {e}")
-            return None
+        if wordinfo is not None:
+            self.wordinfo_cache.put(key, wordinfo)
+        else:
+            self._record_false_positives(lang, 1)
+        return wordinfo
 
-    def query_chinese_batch(self, words: List[str]) -> Dict[str, Dict]:
-        """批量查询中文词语"""
+    def lookup_wordinfo_batch(self, words: List[str], lang: str) -> Dict[str, Dict]:
+        """
+        批量查询并格式化为 wordinfo（先查缓存，布隆过滤器排除确定不存在的词，其余一次性查询数据库，
+        英文未找到的词再一次性按词形索引回退到词根词条）
+
+        Returns:
+            {word: wordinfo}，未找到的词不在结果中
+        """
         results = {}
+        missing = []
+        keys = {}
         for word in words:
-            info = self.query_chinese_word(word)
-            if info:
-                results[word] = info
-        return results
+            key = keys[word] = self._cache_key(word, lang)
+            wordinfo = self.wordinfo_cache.get(key)
+            if wordinfo is not None:
+                results[word] = wordinfo
+            elif self.might_contain(word, lang, key):
+                missing.append(word)
+
+        if not missing:
+            return results
 
-    def query_english_word(self, word: str) -> Optional[Dict]:
-        """查询英文单词（ECDICT 本地数据库）
+        if lang == 'en':
+            rows = self._query_english_rows(missing)
+            to_wordinfo = self._english_row_to_wordinfo
+        else:
+            rows = self._query_chinese_rows(missing)
+            to_wordinfo = self._chinese_row_to_wordinfo
 
-        Args:
-            word: 要查询的英文单词
+        found = {word: to_wordinfo(row) for word, row in rows.items()}
+        if lang == 'en' and len(found) < len(missing):
+            found.update(self._lemma_fallback_wordinfo([w for w in missing if w not in found]))
 
-        Returns:
-            包含单词信息的字典，如果未找到则返回 None
+        for word, wordinfo in found.items():
+            self.wordinfo_cache.put(keys[word], wordinfo)
+            results[word] = wordinfo
+        self._record_false_positives(lang, len(missing) - len(found))
+        return results
+
+    def _lemma_fallback_wordinfo(self, words: List[str]) -> Dict[str, Dict]:
         """
-        if not self.en_conn:
-            return None
+        词典外的词形变化回退到词根词条（如 'computes' -> 'compute'），返回 {word: wordinfo}
+        wordinfo 为词根词条的释义，word 为查询词，meta.source 为 'lemma'，meta.lemma 为词根词条
+        """
+        results = {}
+        for word, row in self._query_english_lemma_rows(words).items():
+            wordinfo = self._english_row_to_wordinfo(row)
+            lemma = wordinfo['word']
+            results[word] = {
+                **wordinfo,
+                'word': word,
+                'lemma': wordinfo.get('lemma') or lemma,
+                'meta': {**wordinfo['meta'], 'source': 'lemma', 'lemma': lemma}
+            }
+        return results
+
+    def cache_stats(self) -> Dict:
+        """wordinfo 缓存统计"""
+        return self.wordinfo_cache.stats()
+
+    def _zh_select(self, include_synonyms: bool = False) -> str:
+        """中文词条查询字段（根据扩展字段是否存在；synonyms 只在需要时读取）"""
+        columns = 'simplified, traditional, pinyin, translation, pos, frequency'
+        if self.zh_has_extensions:
+            columns += ', cilin_code'
+            if include_synonyms:
+                columns += ', synonyms'
+        if self.zh_precompiled:
+            columns += ', wordinfo'
+        return columns
+
+    def _en_select(self) -> str:
+        """英文词条查询字段（根据 lemma 字段是否存在）"""
+        columns = 'word, phonetic, translation, pos, extra_data, frequency'
+        if self.en_has_lemma:
+            columns += ', lemma, lemma_frequency'
+        if self.en_precompiled:
+            columns += ', wordinfo'
+        return columns
+
+    def _chinese_row_to_result(self, row, include_synonyms: bool = False) -> Dict:
+        """将中文词条行转换为查询结果"""
+        return chinese_row_to_result(row, self.zh_has_extensions, include_synonyms)
+
+    def _english_row_to_result(self, row) -> Dict:
+        """将英文词条行转换为查询结果"""
+        return english_row_to_result(row, self.en_has_lemma)
+
+    def _chinese_row_to_wordinfo(self, row) -> Dict:
+        """中文词条行 -> wordinfo（优先使用预编译数据）"""
+        if self.zh_precompiled and row['wordinfo']:
+            return json.loads(row['wordinfo'])
+        return format_chinese_to_wordinfo(self._chinese_row_to_result(row))
+
+    def _english_row_to_wordinfo(self, row) -> Dict:
+        """英文词条行 -> wordinfo（优先使用预编译数据）"""
+        if self.en_precompiled and row['wordinfo']:
+            return json.loads(row['wordinfo'])
+        return format_english_to_wordinfo(self._english_row_to_result(row))
+
+    def _zh_lookup_sql(self, include_synonyms: bool = False) -> str:
+        """
+        中文批量精确查询语句（参数为查询键的 JSON 数组）
+        有查询键表时一次主键查找得到词条 rowid（简体 priority 0 优先于繁体 priority 1）；
+        否则分别按简体、繁体索引查询后合并
+        """
+        columns = self._zh_select(include_synonyms)
+        if not self.zh_has_lookup_key:
+            return f'''
+                SELECT simplified AS lookup_key, 0 AS priority, {columns}
+                FROM words WHERE simplified IN (SELECT value FROM json_each(?1))
+                UNION ALL
+                SELECT traditional AS lookup_key, 1 AS priority, {columns}
+                FROM words WHERE traditional IN (SELECT value FROM json_each(?1))
+                ORDER BY lookup_key, priority
+            '''
+        return f'''
+            SELECT k.lookup_key, k.priority, {columns}
+            FROM lookup_keys k
+            JOIN words w ON w.rowid = k.word_rowid
+            WHERE k.lookup_key IN (SELECT value FROM json_each(?1))
+            ORDER BY k.lookup_key, k.priority
+        '''
+
+    def _query_chinese_rows(self, words: List[str], include_synonyms: bool = False) -> Dict:
+        """批量查询中文词条行（一次查询，简体优先于繁体匹配），返回 {word: row}"""
+        if not self.zh_conn or not words:
+            return {}
 
         try:
-            cursor = self.en_conn.cursor()
+            if self.zh_has_lookup_key:
+                keys = {word: normalize_zh_key(word) for word in words}
+            else:
+                keys = {word: word for word in words}
 
-            # 检查是否有 lemma 扩展字段
-            cursor.execute("PRAGMA table_info(words)")
-            columns = [row[1] for row in cursor.fetchall()]
-            has_lemma = 'lemma' in columns
+            with self.connection('zh') as conn:
+                fetched = conn.execute(self._zh_lookup_sql(include_synonyms),
+                                       (json.dumps(list(set(keys.values())), ensure_ascii=False),)).fetchall()
 
-            if has_lemma:
-                cursor.execute('''
-                    SELECT word, phonetic, translation, pos, extra_data, frequency,
-                           lemma, lemma_frequency
-                    FROM words
-                    WHERE word = ? COLLATE NOCASE
-                    LIMIT 1
-                ''', (word.lower(),))
+            by_key = {}
+            for row in fetched:
+                by_key.setdefault(row['lookup_key'], row)
+
+            rows = {}
+            for word, key in keys.items():
+                row = by_key.get(key)
+                if row:
+                    rows[word] = row
+            return rows
+
+        except Exception as e:
+            print(f"✗ 批量查询中文词语失败: {e}")
+            return {}
+
+    def _en_lookup_sql(self) -> str:
+        """
+        英文批量精确查询语句（参数为查询键的 JSON 数组）
+        有查询键时按 lookup_key 索引等值查找；同一键对应多个词条时原词与键一致者优先，其次词频高者优先
+        """
+        if not self.en_has_lookup_key:
+            return f'''
+                SELECT {self._en_select()}, lower(word) AS lookup_key
+                FROM words
+                WHERE word IN (SELECT value FROM json_each(?))
+            '''
+        return f'''
+            SELECT {self._en_select()}, lookup_key
+            FROM words
+            WHERE lookup_key IN (SELECT value FROM json_each(?))
+            ORDER BY word <> lookup_key, frequency IS NULL OR frequency <= 0, frequency
+        '''
+
+    def _query_english_rows(self, words: List[str]) -> Dict:
+        """批量查询英文词条行（一次 IN 查询，按归一化查询键匹配），返回 {word: row}"""
+        if not self.en_conn or not words:
+            return {}
+
+        try:
+            if self.en_has_lookup_key:
+                keys = {word: normalize_en_key(word) for word in words}
             else:
-                cursor.execute('''
-                    SELECT word, phonetic, translation, pos, extra_data, frequency
-                    FROM words
-                    WHERE word = ? COLLATE NOCASE
-                    LIMIT 1
-                ''', (word.lower(),))
+                keys = {word: word.lower() for word in words}
 
-            row = cursor.fetchone()
-            if not row:
-                return None
+            with self.connection('en') as conn:
+                fetched = conn.execute(self._en_lookup_sql(),
+                                       (json.dumps(list(set(keys.values())), ensure_ascii=False),)).fetchall()
 
-            # 解析 phonetic JSON
-            phonetic_data = {}
-            if row['phonetic']:
-                try:
-                    import json
-                    phonetic_data = json.loads(row['phonetic'])
-                except:
-                    phonetic_data = {'us': row['phonetic']}
-
-            # 解析 extra_data JSON
-            extra_data = {}
-            if row['extra_data']:
-                try:
-                    import json
-                    extra_data = json.loads(row['extra_data'])
-                except:
-                    pass
-
-            result = {
-                'word': row['word'],
-                'phonetic': phonetic_data,
-                'translation': row['translation'] or '',
-                'pos': row['pos'] or '',
-                'extra_data': extra_data,
-                'frequency': row['frequency'] or 0,
-                'source': 'local_db'
-            }
+            by_key = {}
+            for row in fetched:
+                by_key.setdefault(row['lookup_key'], row)
+
+            rows = {}
+            for word, key in keys.items():
+                row = by_key.get(key)
+                if row:
+                    rows[word] = row
+            return rows
+
+        except Exception as e:
+            print(f"✗ 批量查询英文单词失败: {e}")
+            return {}
 
-            # 添加词根信息（如果有）
-            if has_lemma:
-                result['lemma'] = row['lemma'] or ''
-                result['lemma_frequency'] = row['lemma_frequency'] or 0
+    def _query_english_lemma_rows(self, words: List[str]) -> Dict:
+        """
+        按词形索引批量查询词典外词形对应的词根词条行（一次查询：lemma_forms 主键 + lookup_key 索引），
+        返回 {word: row}
+        """
+        if not self.en_conn or not self.en_has_lemma_forms or not words:
+            return {}
 
-            return result
+        try:
+            keys = {word: normalize_en_key(word) for word in words}
+            with self.connection('en') as conn:
+                fetched = conn.execute(f'''
+                    SELECT {self._en_select()}, f.form_key
+                    FROM lemma_forms f
+                    JOIN words ON words.lookup_key = f.lemma_key
+                    WHERE f.form_key IN (SELECT value FROM json_each(?))
+                    ORDER BY word <> words.lookup_key, frequency IS NULL OR frequency <= 0, frequency
+                ''', (json.dumps(list(set(keys.values())), ensure_ascii=False),)).fetchall()
+
+            by_key = {}
+            for row in fetched:
+                by_key.setdefault(row['form_key'], row)
+
+            rows = {}
+            for word, key in keys.items():
+                row = by_key.get(key)
+                if row:
+                    rows[word] = row
+            return rows
 
         except Exception as e:
-            print(f"✗ 查询英文单词失败 [{word}]: {e}")
-            return None
+            print(f"✗ 词形回退查询失败: {e}")
+            return {}
 
-    def query_english_batch(self, words: List[str]) -> Dict[str, Dict]:
-        """批量查询英文单词"""
-        results = {}
+    def suggest_batch(self, words: List[str], limit: int = SUGGEST_LIMIT) -> Dict[str, List[str]]:
+        """
+        英文拼写建议（SymSpell 对称删除索引）：编辑距离 1 ~ MAX_EDIT_DISTANCE，按编辑距离、词频排序
+
+        Returns:
+            {word: [建议词...]}，没有建议的词返回空列表
+        """
+        results = {word: [] for word in words}
+        if self.spelling is None:
+            return results
+
+        suggestions = {}
         for word in words:
-            info = self.query_english_word(word)
-            if info:
-                results[word] = info
+            key = normalize_en_key(word)
+            if key not in suggestions:
+                try:
+                    suggestions[key] = self.spelling.suggest(key, limit)
+                except Exception as e:
+                    print(f"✗ 拼写建议查询失败 [{word}]: {e}")
+                    suggestions[key] = []
+            results[word] = suggestions[key]
         return results
 
-    def format_english_to_wordinfo(self, db_result: Dict) -> Dict:
-        """将 ECDICT 格式转换为前端 wordinfo 格式"""
-        if not db_result:
-            return None
+    def suggest(self, word: str, limit: int = SUGGEST_LIMIT) -> List[str]:
+        """英文拼写建议（编辑距离 2 以内，按编辑距离、词频排序）"""
+        return self.suggest_batch([word], limit)[word]
 
-        # 1. 解析音标（已经是 JSON 格式）
-        phonetic_data = db_result.get('phonetic', {})
-        if not isinstance(phonetic_data, dict):
-            phonetic_data = {}
-
-        # 2. 解析词形变化（从 extra_data.wordForms）
-        word_forms = {}
-        extra_data = db_result.get('extra_data', {})
-        if isinstance(extra_data, dict) and 'wordForms' in extra_data:
-            # extra_data.wordForms 格式: {"过去式": "appled", "复数": "apples"}
-            # 需要转换为英文键名
-            form_map = {
-                '过去式': 'past',
-                '过去分词': 'pastParticiple',
-                '现在分词': 'doing',
-                '第三人称单数': 'third',
-                '比较级': 'comparative',
-                '最高级': 'superlative',
-                '复数': 'plural',
-                '原型': 'lemma',
-                '词根': 'root'
-            }
-            for cn_key, value in extra_data['wordForms'].items():
-                en_key = form_map.get(cn_key, cn_key)
-                word_forms[en_key] = value
-
-        # 3. 解析定义（从 extra_data.definitions 或 translation）
-        target_definitions = []
-        native_definitions = []
-
-        if isinstance(extra_data, dict) and 'definitions' in extra_data:
-            # extra_data.definitions 格式: [{"pos": "n.", "meanings": ["苹果", "苹果树"]}]
-            definitions = extra_data['definitions']
-            if isinstance(definitions, list):
-                target_definitions = definitions
-
-        # 如果没有 definitions，使用 translation
-        if not target_definitions and db_result.get('translation'):
-            translations = db_result['translation'].split(';')
-            target_definitions = [{
-                'pos': db_result.get('pos', 'n.'),
-                'meanings': [t.strip() for t in translations if t.strip()]
-            }]
-
-        # 中文释义（与 target 相同）
-        native_definitions = target_definitions
-
-        # 4. 提取元数据
-        collins = 0
-        oxford = False
-        if isinstance(extra_data, dict):
-            collins = extra_data.get('collins', 0)
-            oxford = extra_data.get('oxford', False)
-
-        # 5. 构建最终的 wordinfo 格式
-        wordinfo = {
-            'word': db_result['word'],
-            'phonetic': phonetic_data,
-            'translation': db_result.get('translation', ''),
-            'targetDefinitions': target_definitions,
-            'nativeDefinitions': native_definitions,
-            'examples': {
-                'common': [],  # ECDICT 不包含例句，后续可扩展
-                'fun': []
-            },
-            'wordForms': word_forms,
-            'meta': {
-                'source': 'local_db',
-                'db': 'ECDICT',
-                'frequency': db_result.get('frequency', 0),
-                'collins': collins,
-                'oxford': oxford
-            }
-        }
+    def query_chinese_word(self, word: str, include_synonyms: bool = False) -> Optional[Dict]:
+        """查询中文词语（include_synonyms 时读取并解析同义词）"""
+        row = self._query_chinese_rows([word], include_synonyms).get(word)
+        return self._chinese_row_to_result(row, include_synonyms) if row else None
 
-        # 添加词根信息（如果有）
-        if db_result.get('lemma'):
-            wordinfo['lemma'] = db_result['lemma']
-            wordinfo['lemma_frequency'] = db_result.get('lemma_frequency', 0)
+    def query_chinese_batch(self, words: List[str], include_synonyms: bool = False) -> Dict[str, Dict]:
+        """批量查询中文词语（一次查询，简体优先于繁体匹配）"""
+        return {word: self._chinese_row_to_result(row, include_synonyms)
+                for word, row in self._query_chinese_rows(words, include_synonyms).items()}
 
-        return wordinfo
+    def query_english_word(self, word: str) -> Optional[Dict]:
+        """查询英文单词（ECDICT 本地数据库）
+
+        Args:
+            word: 要查询的英文单词
+
+        Returns:
+            包含单词信息的字典，如果未找到则返回 None
+        """
+        row = self._query_english_rows([word]).get(word)
+        return self._english_row_to_result(row) if row else None
+
+    def query_english_batch(self, words: List[str]) -> Dict[str, Dict]:
+        """批量查询英文单词（一次 IN 查询，按归一化查询键匹配）"""
+        return {word: self._english_row_to_result(row)
+                for word, row in self._query_english_rows(words).items()}
+
+    def format_english_to_wordinfo(self, db_result: Dict) -> Dict:
+        """将 ECDICT 格式转换为前端 wordinfo 格式"""
+        return format_english_to_wordinfo(db_result)
 
     def format_chinese_to_wordinfo(self, db_result: Dict) -> Dict:
         """将中文数据库格式转换为前端 wordinfo 格式"""
-        if not db_result:
-            return None
+        return format_chinese_to_wordinfo(db_result)
+
+    def _get_prefix_index(self, name: str) -> Optional[PrefixIndex]:
+        """获取前缀索引（首次使用时从词典数据库加载）"""
+        index = self._prefix_indexes.get(name)
+        if index is not None:
+            return index
+
+        with self._prefix_lock:
+            index = self._prefix_indexes.get(name)
+            if index is not None:
+                return index
+
+            # 排名：有词频的在前（ECDICT 的 frq 越小越常用），其次词越短越靠前
+            order_by = "ORDER BY frequency IS NULL OR frequency <= 0, frequency, length({0}), {0}"
+            keys, values = [], []
+            if name == 'en' and self.en_conn:
+                with self.connection('en') as conn:
+                    cursor = conn.execute(
+                        f"SELECT word FROM words WHERE word <> '' {order_by.format('word')}")
+                    for (word,) in cursor:
+                        keys.append(normalize_en_key(word))
+                        values.append(word)
+            elif name in ('zh', 'pinyin') and self.zh_conn:
+                with self.connection('zh') as conn:
+                    cursor = conn.execute(
+                        f"SELECT simplified, pinyin FROM words WHERE simplified <> '' {order_by.format('simplified')}")
+                    for word, pinyin in cursor:
+                        key = word if name == 'zh' else normalize_pinyin(pinyin or '')
+                        if key:
+                            keys.append(key)
+                            values.append(word)
+            else:
+                return None
 
-        # 解析释义（英文翻译）
-        translations = db_result.get('translation', '').split('; ')
-
-        wordinfo = {
-            'word': db_result['word'],
-            'traditional': db_result.get('traditional', ''),
-            'pinyin': db_result.get('pinyin', ''),
-            'translation': db_result.get('translation', ''),
-            'targetDefinitions': [
-                {
-                    'pos': db_result.get('pos', 'n.'),
-                    'meanings': translations[:3]  # 只取前3个释义
-                }
-            ],
-            'nativeDefinitions': {
-                'en': [
-                    {
-                        'pos': db_result.get('pos', 'n.'),
-                        'meanings': translations[:3]
-                    }
-                ]
-            },
-            'examples': {
-                'common': [],
-                'fun': []
-            },
-            'wordForms': {},
-            'meta': {
-                'source': 'local_db',
-                'db': 'CC-CEDICT'
-            }
-        }
+            index = PrefixIndex(keys, values, max_limit=SEARCH_MAX_LIMIT)
+            self._prefix_indexes[name] = index
+            print(f"✓ 前缀索引已加载 [{name}]: {len(index):,} 条，预计算前缀 {len(index.top):,} 个")
+            return index
 
+    def search_prefix(self, prefix: str, lang: str, limit: int = 20) -> List[str]:
+        """
+        前缀搜索（用于自动补全）
 
-        return wordinfo
+        Args:
+            prefix: 输入前缀；lang='zh' 时可以是汉字或拼音（声调可省略）
+            lang: 'en' 或 'zh'
+            limit: 返回数量（最多 SEARCH_MAX_LIMIT）
 
-    def search_chinese_fuzzy(self, prefix: str, limit: int = 20) -> List[str]:
-        """模糊搜索中文词语（用于自动补全）"""
-        if not self.zh_conn:
+        Returns:
+            按词频排序的词语列表
+        """
+        if lang not in ('en', 'zh'):
             return []
 
+        limit = max(1, min(limit, SEARCH_MAX_LIMIT))
         try:
-            cursor = self.zh_conn.cursor()
-            cursor.execute('''
-                SELECT simplified FROM words
-                WHERE simplified LIKE ? OR pinyin LIKE ?
-                LIMIT ?
-            ''', (f'{prefix}%', f'{prefix}%', limit))
-
-            return [r['simplified'] for r in cursor.fetchall()]
-
+            if lang == 'en':
+                index, key = self._get_prefix_index('en'), normalize_en_key(prefix)
+            elif any('\u4e00' <= c <= '\u9fff' for c in prefix):
+                index, key = self._get_prefix_index('zh'), prefix.strip()
+            else:
+                index, key = self._get_prefix_index('pinyin'), normalize_pinyin(prefix)
+            return index.search(key, limit) if index else []
         except Exception as e:
-            print(f"✗ 模糊搜索失败: {e}")
+            print(f"✗ 前缀搜索失败 [{prefix}]: {e}")
             return []
 
+    def search_chinese_fuzzy(self, prefix: str, limit: int = 20) -> List[str]:
+        """模糊搜索中文词语（用于自动补全，汉字或拼音前缀）"""
+        return self.search_prefix(prefix, 'zh', limit)
+
     def search_by_lemma(self, lemma: str, limit: int = 50) -> List[Dict]:
         """根据词根查找所有变体形式
 
@@ -406,43 +815,94 @@ class DictDatabase:
             return []
 
         try:
-            cursor = self.en_conn.cursor()
-
-            # 检查是否有 lemma 字段
-            cursor.execute("PRAGMA table_info(words)")
-            columns = [row[1] for row in cursor.fetchall()]
-            if 'lemma' not in columns:
+            if not self.en_has_lemma:
                 return []
 
-            # 查询所有具有相同词根的单词
-            cursor.execute('''
-                SELECT word, pos, translation, frequency, lemma_frequency
-                FROM words
-                WHERE lemma = ?
-                ORDER BY frequency ASC
-                LIMIT ?
-            ''', (lemma.lower(), limit))
-
-            results = []
-            for row in cursor.fetchall():
-                results.append({
-                    'word': row['word'],
-                    'pos': row['pos'] or '',
-                    'translation': row['translation'] or '',
-                    'frequency': row['frequency'] or 0,
-                    'lemma': lemma,
-                    'lemma_frequency': row['lemma_frequency'] or 0
-                })
+            with self.connection('en') as conn:
+                cursor = conn.cursor()
 
-            return results
+                # 查询所有具有相同词根的单词
+                cursor.execute('''
+                    SELECT word, pos, translation, frequency, lemma_frequency
+                    FROM words
+                    WHERE lemma = ?
+                    ORDER BY frequency IS NULL OR frequency <= 0, frequency
+                    LIMIT ?
+                ''', (lemma.lower(), limit))
+
+                results = []
+                for row in cursor.fetchall():
+                    results.append({
+                        'word': row['word'],
+                        'pos': row['pos'] or '',
+                        'translation': row['translation'] or '',
+                        'frequency': row['frequency'] or 0,
+                        'lemma': lemma,
+                        'lemma_frequency': row['lemma_frequency'] or 0
+                    })
+
+                return results
 
         except Exception as e:
             print(f"✗ 词根查询失败 [{lemma}]: {e}")
             return []
 
 
+    def search_by_lemma_batch(self, lemmas: List[str], limit: int = 50,
+                              exclude: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+        """批量查询多个词根的变体形式（一次 idx_words_lemma 索引查询，每个词根最多 limit 个，按词频排序）
+
+        Args:
+            lemmas: 词根列表
+            limit: 每个词根的返回数量限制
+            exclude: 不返回的词（如查询词本身，不区分大小写），在截取 limit 之前排除
+
+        Returns:
+            {lemma: [变体...]}，没有变体的词根返回空列表
+        """
+        results = {lemma: [] for lemma in lemmas}
+        if not self.en_conn or not self.en_has_lemma or not lemmas:
+            return results
+
+        try:
+            with self.connection('en') as conn:
+                cursor = conn.cursor()
+                keys = {lemma.lower(): lemma for lemma in lemmas}
+                excluded = sorted({word.lower() for word in exclude or []})
+                cursor.execute('''
+                    SELECT word, pos, translation, frequency, lemma, lemma_frequency FROM (
+                        SELECT word, pos, translation, frequency, lemma, lemma_frequency,
+                               ROW_NUMBER() OVER (
+                                   PARTITION BY lemma
+                                   ORDER BY frequency IS NULL OR frequency <= 0, frequency
+                               ) AS rn
+                        FROM words
+                        WHERE lemma IN (SELECT value FROM json_each(?))
+                          AND lower(word) NOT IN (SELECT value FROM json_each(?))
+                    )
+                    WHERE rn <= ?
+                    ORDER BY lemma, rn
+                ''', (json.dumps(list(keys), ensure_ascii=False),
+                      json.dumps(excluded, ensure_ascii=False), limit))
+
+                for row in cursor.fetchall():
+                    lemma = keys[row['lemma']]
+                    results[lemma].append({
+                        'word': row['word'],
+                        'pos': row['pos'] or '',
+                        'translation': row['translation'] or '',
+                        'frequency': row['frequency'] or 0,
+                        'lemma': lemma,
+                        'lemma_frequency': row['lemma_frequency'] or 0
+                    })
+                return results
+
+        except Exception as e:
+            print(f"✗ 批量词根查询失败: {e}")
+            return results
+
     def search_examples(self, word: str, lang: str = 'en', limit: int = 5) -> List[Dict]:
-        """搜索包含指定单词的例句
+        """搜索包含指定单词的例句（按相关度和句子长度排序）
 
         Args:
             word: 要搜索的单词或词语
@@ -452,59 +912,105 @@ class DictDatabase:
         Returns:
             例句列表，每个例句包含 en_sentence 和 zh_sentence
         """
-        if not self.sentence_conn:
-            return []
+        return self.search_examples_batch([word], lang, limit).get(word, [])
 
-        try:
-            cursor = self.sentence_conn.cursor()
+    def search_examples_batch(self, words: List[str], lang: str = 'en', limit: int = 5) -> Dict[str, List[Dict]]:
+        """批量搜索例句：未命中缓存的词一次 FTS5 查询，每个词取排名前 limit 条
 
-            if lang == 'en':
-                # 英文使用 FTS5 全文搜索
-                try:
-                    cursor.execute("""
-                        SELECT en_sentence, zh_sentence
-                        FROM sentence_pairs_fts
-                        WHERE en_sentence MATCH ?
-                        LIMIT ?
-                    """, (word, limit))
-                except:
-                    # 如果 FTS5 不可用，降级到 LIKE 搜索
-                    cursor.execute("""
-                        SELECT en_sentence, zh_sentence
-                        FROM sentence_pairs
-                        WHERE en_sentence LIKE ?
-                        LIMIT ?
-                    """, (f'%{word}%', limit))
-            else:
-                # 中文直接使用 LIKE 搜索（FTS5 对中文分词支持不好）
-                cursor.execute("""
-                    SELECT en_sentence, zh_sentence
-                    FROM sentence_pairs
-                    WHERE zh_sentence LIKE ?
-                    LIMIT ?
-                """, (f'%{word}%', limit))
+        排序分数 = bm25 + 长度偏离理想长度的惩罚，越小越靠前：
+        相关度相近时优先返回长度适中的句子，避免过短的片段或过长的段落
 
-            results = []
-            for row in cursor.fetchall():
-                results.append({
-                    'en': row['en_sentence'],
-                    'zh': row['zh_sentence']
-                })
+        Returns:
+            {word: [{'en': ..., 'zh': ...}]}
+        """
+        results = {}
+        missing = []
+        for word in dict.fromkeys(words):
+            cached = self.examples_cache.get((word, lang, limit))
+            if cached is not None:
+                results[word] = cached
+            elif word.strip():
+                missing.append(word)
+            else:
+                results[word] = []
 
+        if not missing:
+            return results
+        if not self.sentence_conn:
+            results.update({word: [] for word in missing})
             return results
 
+        column = 'en_sentence' if lang == 'en' else 'zh_sentence'
+        ideal = EXAMPLE_IDEAL_LENGTH['en' if lang == 'en' else 'zh']
+        length_penalty = f"{EXAMPLE_LENGTH_WEIGHT} * abs(length(p.{column}) - {ideal}) / {ideal}.0"
+        found = {word: [] for word in missing}
+
+        try:
+            with self.connection('sentences') as conn:
+                cursor = conn.cursor()
+
+                if (lang == 'en' and self.sentence_has_en_fts) or (lang != 'en' and self.sentence_has_zh_fts):
+                    if lang == 'en':
+                        fts, match, score = 'sentence_pairs_fts', 'f.en_sentence', 'bm25(sentence_pairs_fts, 1.0, 0.0)'
+                        terms = {word: word.strip() for word in missing}
+                    else:
+                        # 中文索引按单字分词，短语查询匹配相邻汉字
+                        fts, match, score = 'sentence_pairs_zh_fts', 'sentence_pairs_zh_fts', 'bm25(sentence_pairs_zh_fts)'
+                        terms = {word: ' '.join(re.sub(r'([\u4e00-\u9fff])', r' \1 ', word).split()) for word in missing}
+                    # FTS5 短语查询（引号转义），避免单词被当作查询语法（如 AND、don't）
+                    phrases = {word: '"' + term.replace('"', '""') + '"' for word, term in terms.items()}
+
+                    cursor.execute(f"""
+                        SELECT word, en_sentence, zh_sentence FROM (
+                            SELECT q.key AS word, p.en_sentence, p.zh_sentence,
+                                   ROW_NUMBER() OVER (
+                                       PARTITION BY q.key ORDER BY {score} + {length_penalty}, p.id
+                                   ) AS rn
+                            FROM json_each(?) q
+                            JOIN {fts} f ON {match} MATCH q.value
+                            JOIN sentence_pairs p ON p.id = f.rowid
+                        )
+                        WHERE rn <= ?
+                        ORDER BY word, rn
+                    """, (json.dumps(phrases, ensure_ascii=False), limit))
+                    for row in cursor.fetchall():
+                        found[row['word']].append({'en': row['en_sentence'], 'zh': row['zh_sentence']})
+                else:
+                    # 没有全文索引时降级到 LIKE 搜索，按长度偏好排序
+                    for word in missing:
+                        cursor.execute(f"""
+                            SELECT p.en_sentence, p.zh_sentence
+                            FROM sentence_pairs p
+                            WHERE p.{column} LIKE ?
+                            ORDER BY {length_penalty}
+                            LIMIT ?
+                        """, (f'%{word}%', limit))
+                        found[word] = [{'en': row['en_sentence'], 'zh': row['zh_sentence']}
+                                       for row in cursor.fetchall()]
+
         except Exception as e:
-            print(f"✗ 例句搜索失败 [{word}]: {e}")
-            return []
+            print(f"✗ 例句搜索失败 [{', '.join(missing[:5])}]: {e}")
+            results.update({word: [] for word in missing})
+            return results
+
+        for word, examples in found.items():
+            self.examples_cache.put((word, lang, limit), examples)
+        results.update(found)
+        return results
 
     def close(self):
-        """关闭数据库连接"""
-        if self.zh_conn:
-            self.zh_conn.close()
-        if self.en_conn:
-            self.en_conn.close()
-        if self.sentence_conn:
-            self.sentence_conn.close()
+        """关闭所有数据库连接"""
+        for pool in self._pools.values():
+            while True:
+                try:
+                    pool.get_nowait().close()
+                except queue.Empty:
+                    break
+        self._pools.clear()
+        for conn in self._main_conns.values():
+            conn.close()
+        self._main_conns.clear()
+        self._paths.clear()
 
 
 # 全局数据库实例
@@ -0,0 +1,227 @@
+"""
+词典 wordinfo 格式化模块
+将词典数据库行转换为前端 wordinfo 格式
+运行时（dict_db）与离线构建（scripts/build_wordinfo.py）共用，保证两者输出一致
+"""
+
+import json
+from typing import Dict, Optional
+
+# wordinfo 格式版本：修改本模块的输出格式时必须加 1，使已构建的预编译数据失效
+WORDINFO_FORMAT_VERSION = 1
+
+# 英文词形变化：中文键名 -> 前端英文键名
+EN_FORM_MAP = {
+    '过去式': 'past',
+    '过去分词': 'pastParticiple',
+    '现在分词': 'doing',
+    '第三人称单数': 'third',
+    '比较级': 'comparative',
+    '最高级': 'superlative',
+    '复数': 'plural',
+    '原型': 'lemma',
+    '词根': 'root'
+}
+
+
+def dump_wordinfo(wordinfo: Dict) -> str:
+    """序列化 wordinfo（紧凑、键有序，相同输入得到相同输出）"""
+    return json.dumps(wordinfo, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+
+
+def chinese_row_to_result(row, has_extensions: bool = False, include_synonyms: bool = False) -> Dict:
+    """
+    将中文词条行转换为查询结果
+    include_synonyms: 解析 synonyms JSON（wordinfo 不使用同义词，只在调用方需要时解析，行中须包含该字段）
+    """
+    result = {
+        'word': row['simplified'],
+        'traditional': row['traditional'],
+        'pinyin': row['pinyin'],
+        'translation': row['translation'],
+        'pos': row['pos'],
+        'source': 'local_db'
+    }
+
+    # 添加扩展数据
+    if has_extensions:
+        result['cilin_code'] = row['cilin_code']
+
+    if has_extensions and include_synonyms:
+        # 解析 synonyms JSON
+        if row['synonyms']:
+            try:
+                result['synonyms'] = json.loads(row['synonyms'])
+            except:
+                result['synonyms'] = []
+        else:
+            result['synonyms'] = []
+
+    return result
+
+
+def english_row_to_result(row, has_lemma: bool = False) -> Dict:
+    """将英文词条行转换为查询结果"""
+    # 解析 phonetic JSON
+    phonetic_data = {}
+    if row['phonetic']:
+        try:
+            phonetic_data = json.loads(row['phonetic'])
+        except:
+            phonetic_data = {'us': row['phonetic']}
+
+    # 解析 extra_data JSON
+    extra_data = {}
+    if row['extra_data']:
+        try:
+            extra_data = json.loads(row['extra_data'])
+        except:
+            pass
+
+    result = {
+        'word': row['word'],
+        'phonetic': phonetic_data,
+        'translation': row['translation'] or '',
+        'pos': row['pos'] or '',
+        'extra_data': extra_data,
+        'frequency': row['frequency'] or 0,
+        'source': 'local_db'
+    }
+
+    # 添加词根信息（如果有）
+    if has_lemma:
+        result['lemma'] = row['lemma'] or ''
+        result['lemma_frequency'] = row['lemma_frequency'] or 0
+
+    return result
+
+
+def format_english_to_wordinfo(db_result: Optional[Dict]) -> Optional[Dict]:
+    """将 ECDICT 格式转换为前端 wordinfo 格式"""
+    if not db_result:
+        return None
+
+    # 1. 解析音标（已经是 JSON 格式）
+    phonetic_data = db_result.get('phonetic', {})
+    if not isinstance(phonetic_data, dict):
+        phonetic_data = {}
+
+    # 2. 解析词形变化（从 extra_data.wordForms）
+    word_forms = {}
+    extra_data = db_result.get('extra_data', {})
+    if isinstance(extra_data, dict) and 'wordForms' in extra_data:
+        # extra_data.wordForms 格式: {"过去式": "appled", "复数": "apples"}
+        # 需要转换为英文键名
+        for cn_key, value in extra_data['wordForms'].items():
+            en_key = EN_FORM_MAP.get(cn_key, cn_key)
+            word_forms[en_key] = value
+
+    # 3. 解析定义（从 extra_data.definitions 或 translation）
+    target_definitions = []
+    native_definitions = []
+
+    if isinstance(extra_data, dict) and 'definitions' in extra_data:
+        # extra_data.definitions 格式: [{"pos": "n.", "meanings": ["苹果", "苹果树"]}]
+        definitions = extra_data['definitions']
+        if isinstance(definitions, list):
+            target_definitions = definitions
+
+    # 如果没有 definitions，使用 translation
+    if not target_definitions and db_result.get('translation'):
+        translations = db_result['translation'].split(';')
+        target_definitions = [{
+            'pos': db_result.get('pos', 'n.'),
+            'meanings': [t.strip() for t in translations if t.strip()]
+        }]
+
+    # 中文释义（与 target 相同）
+    native_definitions = target_definitions
+
+    # 4. 提取元数据
+    collins = 0
+    oxford = False
+    if isinstance(extra_data, dict):
+        collins = extra_data.get('collins', 0)
+        oxford = extra_data.get('oxford', False)
+
+    # 5. 构建最终的 wordinfo 格式
+    wordinfo = {
+        'word': db_result['word'],
+        'phonetic': phonetic_data,
+        'translation': db_result.get('translation', ''),
+        'targetDefinitions': target_definitions,
+        'nativeDefinitions': native_definitions,
+        'examples': {
+            'common': [],  # ECDICT 不包含例句，后续可扩展
+            'fun': []
+        },
+        'wordForms': word_forms,
+        'meta': {
+            'source': 'local_db',
+            'db': 'ECDICT',
+            'frequency': db_result.get('frequency', 0),
+            'collins': collins,
+            'oxford': oxford
+        }
+    }
+
+    # 添加词根信息（如果有）
+    if db_result.get('lemma'):
+        wordinfo['lemma'] = db_result['lemma']
+        wordinfo['lemma_frequency'] = db_result.get('lemma_frequency', 0)
+
+    return wordinfo
+
+
+def format_chinese_to_wordinfo(db_result: Optional[Dict]) -> Optional[Dict]:
+    """将中文数据库格式转换为前端 wordinfo 格式"""
+    if not db_result:
+        return None
+
+    # 解析释义（英文翻译）
+    translations = db_result.get('translation', '').split('; ')
+
+    wordinfo = {
+        'word': db_result['word'],
+        'traditional': db_result.get('traditional', ''),
+        'pinyin': db_result.get('pinyin', ''),
+        'translation': db_result.get('translation', ''),
+        'targetDefinitions': [
+            {
+                'pos': db_result.get('pos', 'n.'),
+                'meanings': translations[:3]  # 只取前3个释义
+            }
+        ],
+        'nativeDefinitions': {
+            'en': [
+                {
+                    'pos': db_result.get('pos', 'n.'),
+                    'meanings': translations[:3]
+                }
+            ]
+        },
+        'examples': {
+            'common': [],
+            'fun': []
+        },
+        'wordForms': {},
+        'meta': {
+            'source': 'local_db',
+            'db': 'CC-CEDICT'
+        }
+    }
+
+    return wordinfo
+
+
+def wordinfo_source_columns(lang: str, columns) -> list:
+    """
+    参与生成 wordinfo 的源字段（按表中实际存在的字段）
+    预编译时写入构建信息，运行时比对以发现过期的构建
+    """
+    if lang == 'en':
+        source = ['word', 'phonetic', 'translation', 'pos', 'extra_data', 'frequency',
+                  'lemma', 'lemma_frequency']
+    else:
+        source = ['simplified', 'traditional', 'pinyin', 'translation', 'pos']
+    return [c for c in source if c in columns]
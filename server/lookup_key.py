@@ -0,0 +1,34 @@
+"""
+词典查询键归一化模块
+词典构建（scripts/build_lookup_key.py）与运行时查询（dict_db）共用，保证两边生成的键一致
+"""
+
+import re
+import unicodedata
+
+# 查询键版本：修改归一化规则时必须加 1，使已构建的 lookup_key 失效
+LOOKUP_KEY_VERSION = 1
+
+# 各种弯引号、撇号统一为 ASCII 单引号（输入法和 iOS 智能标点会自动替换）
+_APOSTROPHES = str.maketrans({c: "'" for c in '‘’‚‛ʼʹ′`´'})
+# 各种连字符、破折号、减号统一为 ASCII 连字符
+_HYPHENS = str.maketrans({c: '-' for c in '‐‑‒–—―−﹣－'})
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_en_key(word: str) -> str:
+    """
+    英文查询键：NFKC 规范化、casefold、统一撇号和连字符、合并空白
+    'Don’t' -> "don't"，'ﬁne' -> 'fine'，'e‐mail' -> 'e-mail'，' New  York ' -> 'new york'
+    """
+    key = unicodedata.normalize('NFKC', word).casefold()
+    key = key.translate(_APOSTROPHES).translate(_HYPHENS)
+    return _WHITESPACE.sub(' ', key).strip()
+
+
+def normalize_zh_key(word: str) -> str:
+    """
+    中文查询键：NFKC 规范化（全角字母数字转半角、兼容汉字转统一汉字）并去除空白
+    简体和繁体分别作为独立的键写入查询键表，不做简繁转换
+    """
+    return _WHITESPACE.sub('', unicodedata.normalize('NFKC', word))
@@ -3,12 +3,64 @@
 提供 @require_auth 装饰器
 """
 
+import time
+import threading
 from functools import wraps
 from datetime import datetime
 
 from flask import request, jsonify, g
 
-from db import get_db
+from repositories import SessionRepository
+
+# 认证统计（进程内）
+_stats_lock = threading.Lock()
+_stats = {
+    'requests': 0,
+    'failures': 0,
+    'total_ms': 0.0,
+    'max_ms': 0.0
+}
+
+
+def _record_auth(elapsed_ms: float, success: bool) -> None:
+    """记录一次认证的耗时和结果"""
+    with _stats_lock:
+        _stats['requests'] += 1
+        if not success:
+            _stats['failures'] += 1
+        _stats['total_ms'] += elapsed_ms
+        _stats['max_ms'] = max(_stats['max_ms'], elapsed_ms)
+
+
+def get_auth_stats() -> dict:
+    """认证统计：请求数、失败数、平均/最大耗时、会话缓存命中率"""
+    with _stats_lock:
+        requests = _stats['requests']
+        return {
+            'requests': requests,
+            'failures': _stats['failures'],
+            'avg_ms': round(_stats['total_ms'] / requests, 3) if requests else 0.0,
+            'max_ms': round(_stats['max_ms'], 3),
+            'sessionCache': SessionRepository.cache_stats()
+        }
+
+
+def verify_token(token: str):
+    """
+    验证 token，返回用户信息 {'id', 'email'}，无效或过期返回 None
+    供 WebSocket 连接等非 HTTP 请求场景使用
+    """
+    if not token:
+        return None
+
+    start = time.perf_counter()
+    session = SessionRepository.get_by_token(token)
+    valid = session is not None and datetime.now() <= session['expires_at']
+    _record_auth((time.perf_counter() - start) * 1000, valid)
+
+    if not valid:
+        return None
+    return {'id': session['user_id'], 'email': session['email']}
 
 
 def require_auth(f):
@@ -26,39 +78,31 @@ def require_auth(f):
             return jsonify({'error': '未登录'}), 401
 
         token = auth_header[7:]  # 去掉 'Bearer ' 前缀
-        print(f"[Auth] 验证 token: {token[:10]}...")
-
-        with get_db() as conn:
-            cursor = conn.cursor()
-
-            # 查询有效的会话
-            cursor.execute("""
-                SELECT s.user_id, s.expires_at, u.email
-                FROM sessions s
-                JOIN users u ON s.user_id = u.id
-                WHERE s.token = ?
-            """, (token,))
-            session = cursor.fetchone()
-
-            if not session:
-                print(f"[Auth] 认证失败: token 在数据库中不存在")
-                return jsonify({'error': '无效的登录状态'}), 401
-
-            # 检查是否过期
-            expires_at = datetime.fromisoformat(session['expires_at'])
-            if datetime.now() > expires_at:
-                print(f"[Auth] 认证失败: token 已过期 (过期时间: {expires_at})")
-                # 删除过期的会话
-                cursor.execute("DELETE FROM sessions WHERE token = ?", (token,))
-                return jsonify({'error': '登录已过期，请重新登录'}), 401
-
-            # 存储用户信息到 g 对象
-            g.user = {
-                'id': session['user_id'],
-                'email': session['email']
-            }
-            g.token = token
-            print(f"[Auth] 认证成功: 用户 {session['email']}")
+
+        start = time.perf_counter()
+        session = SessionRepository.get_by_token(token)
+
+        if not session:
+            _record_auth((time.perf_counter() - start) * 1000, False)
+            print(f"[Auth] 认证失败: token 在数据库中不存在")
+            return jsonify({'error': '无效的登录状态'}), 401
+
+        # 检查是否过期
+        expires_at = session['expires_at']
+        if datetime.now() > expires_at:
+            print(f"[Auth] 认证失败: token 已过期 (过期时间: {expires_at})")
+            # 删除过期的会话
+            SessionRepository.delete_by_token(token)
+            _record_auth((time.perf_counter() - start) * 1000, False)
+            return jsonify({'error': '登录已过期，请重新登录'}), 401
+
+        # 存储用户信息到 g 对象
+        g.user = {
+            'id': session['user_id'],
+            'email': session['email']
+        }
+        g.token = token
+        _record_auth((time.perf_counter() - start) * 1000, True)
 
         return f(*args, **kwargs)
 
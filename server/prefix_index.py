@@ -0,0 +1,102 @@
+"""
+前缀索引模块（用于自动补全）
+有序数组 + 二分查找定位前缀区间；候选过多的短前缀预先计算好排名靠前的结果，
+任意前缀的查询都只需一次字典查找或一次二分 + 小区间排序
+"""
+
+import heapq
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from typing import List
+
+# 前缀区间上界哨兵（大于任何实际字符）
+_MAX_CHAR = '\U0010ffff'
+
+
+def normalize_pinyin(text: str) -> str:
+    """
+    拼音归一化：小写、去声调（数字或声调符号）、去空格，ü / u: 统一写作 v
+    'xue2 xi2' / 'xué xí' / 'XueXi' -> 'xuexi'，'lu:4' / 'lǜ' -> 'lv'
+    """
+    text = text.lower().replace('u:', 'v').replace('ü', 'v')
+    if not text.isascii():
+        text = unicodedata.normalize('NFD', text).replace('u\u0308', 'v')
+        text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r'[\s\d\-\'·]', '', text)
+
+
+class PrefixIndex:
+    """
+    不可变前缀索引
+    - keys / values: 按排名从高到低排列的键和值（调用方负责排序，通常由 SQL ORDER BY 完成）
+    - max_limit: 单次查询最多返回条数
+    - threshold: 前缀区间超过该大小时预计算结果
+    """
+
+    def __init__(self, keys: List[str], values: List[str], max_limit: int = 50,
+                 threshold: int = 256):
+        self.max_limit = max_limit
+        self.threshold = threshold
+
+        # 输入顺序即排名；按键排序后记录每个位置的名次
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys = [keys[i] for i in order]
+        self.values = [values[i] for i in order]
+        self.ranks = array('l', order)
+        self.top = {}  # 前缀 -> 按排名排序的下标列表
+        if self.keys:
+            self._precompute('', 0, len(self.keys))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _top_of_range(self, lo: int, hi: int) -> List[int]:
+        """区间内排名最靠前的 max_limit 个下标"""
+        return heapq.nsmallest(self.max_limit, range(lo, hi), key=self.ranks.__getitem__)
+
+    def _precompute(self, prefix: str, lo: int, hi: int) -> List[int]:
+        """递归预计算区间过大的前缀，返回该前缀的前 max_limit 个下标"""
+        if hi - lo <= self.threshold:
+            return self._top_of_range(lo, hi)
+
+        depth = len(prefix)
+        candidates = []
+        i = lo
+        # 与前缀完全相同的键排在区间最前面
+        while i < hi and len(self.keys[i]) == depth:
+            candidates.append(i)
+            i += 1
+        # 按下一个字符划分子区间，合并各子前缀的结果
+        while i < hi:
+            child = self.keys[i][:depth + 1]
+            j = bisect_left(self.keys, child + _MAX_CHAR, i, hi)
+            candidates.extend(self._precompute(child, i, j))
+            i = j
+
+        top = heapq.nsmallest(self.max_limit, candidates, key=self.ranks.__getitem__)
+        self.top[prefix] = top
+        return top
+
+    def search(self, prefix: str, limit: int = 20) -> List[str]:
+        """前缀查询，按排名返回 value（去重）"""
+        if not prefix or not self.keys:
+            return []
+
+        top = self.top.get(prefix)
+        if top is None:
+            lo = bisect_left(self.keys, prefix)
+            hi = bisect_left(self.keys, prefix + _MAX_CHAR, lo)
+            top = self._top_of_range(lo, hi)
+
+        results = []
+        seen = set()
+        for i in top:
+            value = self.values[i]
+            if value not in seen:
+                seen.add(value)
+                results.append(value)
+                if len(results) >= limit:
+                    break
+        return results
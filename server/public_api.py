@@ -6,10 +6,11 @@
 from flask import Blueprint, request, jsonify, g
 from db import get_db
 from middleware import require_auth
-from repositories import FolderRepository, PublicFolderRepository, WordcardRepository, LayoutRepository, UserRepository
+from repositories import FolderRepository, PublicFolderRepository, LayoutRepository, UserRepository
 import json
 import traceback
 from datetime import datetime
+from constants import PUBLIC_SEARCH_MAX_LIMIT
 
 public_api_bp = Blueprint('public_api', __name__, url_prefix='/api/public')
 
@@ -47,14 +48,8 @@ def set_folder_public():
         layout = LayoutRepository.get_by_user(user_id) or []
 
         if is_public:
-            # 计算单词数
-            word_count = 0
-            for card_id in folder['cards']:
-                card = WordcardRepository.get_by_id(user_id, card_id)
-                if card and card['words']:
-                    words = [w.strip() for w in card['words'].split('\n') if w.strip()]
-                    word_count += len(words)
-
+            # 单词数为预计算字段（卡片列表未变化）
+            word_count = folder['word_count']
             print(f"[公开文件夹] 用户 {user_id} 设置文件夹 '{folder_name}' 为公开 (ID: {folder_id}, 单词数: {word_count})")
             return jsonify({
                 'success': True,
@@ -77,56 +72,39 @@ def set_folder_public():
 
 @public_api_bp.route('/folder/search', methods=['GET'])
 def search_public_folders():
-    """搜索公开文件夹（未登录用户也可访问）"""
+    """
+    搜索公开文件夹（未登录用户也可访问）
+    查询参数: q, limit, cursor（上一页响应中的 nextCursor）
+    响应: { results: [...], nextCursor: string | null }
+    """
     try:
         query = request.args.get('q', '').strip()
-        limit = int(request.args.get('limit', 50))
+        limit = max(1, min(int(request.args.get('limit', PUBLIC_SEARCH_MAX_LIMIT)), PUBLIC_SEARCH_MAX_LIMIT))
+        cursor_token = request.args.get('cursor') or None
 
         if not query:
-            return jsonify({'results': []})
-
-        # 搜索公开文件夹
-        results = FolderRepository.search_public(query, limit)
-
-        # 计算单词数并过滤有效的公开文件夹
-        formatted_results = []
-        for folder in results:
-            # 验证文件夹仍然存在且公开
-            if not folder or not folder.get('is_public'):
-                print(f"[公开文件夹] 过滤已删除或非公开文件夹: {folder.get('name') if folder else 'None'}")
-                print(f"[Server] 过滤已删除或非公开文件夹: {folder.get('name') if folder else 'None'}")
-                continue
-
-            # 计算单词数
-            word_count = 0
-            for card_id in folder['cards']:
-                card = WordcardRepository.get_by_id(folder['user_id'], card_id)
-                if card and card['words']:
-                    words = [w.strip() for w in card['words'].split('\n') if w.strip()]
-                    word_count += len(words)
-
-            # 过滤空文件夹
-            if word_count == 0:
-                print(f"[公开文件夹] 过滤空文件夹: {folder['name']}")
-                print(f"[Server] 过滤空文件夹: {folder['name']}")
-                continue
-
-            formatted_results.append({
-                'id': folder['id'],
-                'folderName': folder['name'],
-                'ownerEmail': folder['owner_email'],
-                'wordCount': word_count,
-                'description': folder['description'] or '',
-                'createdAt': folder['created']
-            })
+            return jsonify({'results': [], 'nextCursor': None})
+
+        # 全文索引只收录公开文件夹，空文件夹在查询中按预计算的单词数过滤
+        try:
+            results, next_cursor = FolderRepository.search_public(query, limit, cursor_token)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        formatted_results = [{
+            'id': folder['id'],
+            'folderName': folder['name'],
+            'ownerEmail': folder['owner_email'],
+            'wordCount': folder['word_count'],
+            'description': folder['description'] or '',
+            'createdAt': folder['created']
+        } for folder in results]
 
         print(f"[公开文件夹] 搜索 '{query}' 返回 {len(formatted_results)} 个结果")
-        print(f"[Server] 搜索 '{query}' 返回 {len(formatted_results)} 个结果")
-        return jsonify({'results': formatted_results})
+        return jsonify({'results': formatted_results, 'nextCursor': next_cursor})
 
     except Exception as e:
         print(f"[公开文件夹] 搜索失败: {e}")
-        print(f"[Server] 搜索失败: {e}")
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
@@ -135,39 +113,23 @@ def search_public_folders():
 def get_public_folder(folder_id):
     """获取公开文件夹详情（未登录用户也可访问）"""
     try:
-        # 获取文件夹
-        folder = FolderRepository.get_by_id(folder_id)
+        # 一次查询获取文件夹、创建者邮箱和所有卡片
+        folder = FolderRepository.get_with_cards(folder_id)
         if not folder or not folder['is_public']:
             return jsonify({'error': '公开文件夹不存在'}), 404
 
-        # 获取创建者邮箱
-        with get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT email FROM users WHERE id = ?", (folder['user_id'],))
-            user_row = cursor.fetchone()
-            owner_email = user_row['email'] if user_row else 'Unknown'
-
-        # 获取文件夹内的所有卡片
-        cards = []
-        word_count = 0
-        for card_id in folder['cards']:
-            card = WordcardRepository.get_by_id(folder['user_id'], card_id)
-            if card:
-                words = card['words'] or ''
-                word_list = [w.strip() for w in words.split('\n') if w.strip()]
-                word_count += len(word_list)
-                cards.append({
-                    'id': card['id'],
-                    'name': card['name'],
-                    'words': words,
-                    'wordCount': len(word_list)
-                })
+        cards = [{
+            'id': card['id'],
+            'name': card['name'],
+            'words': card['words'] or '',
+            'wordCount': card['word_count']
+        } for card in folder['card_list']]
 
         result = {
             'id': folder['id'],
             'folderName': folder['name'],
-            'ownerEmail': owner_email,
-            'wordCount': word_count,
+            'ownerEmail': folder['owner_email'] or 'Unknown',
+            'wordCount': folder['word_count'],
             'description': folder['description'] or '',
             'cards': cards
         }
@@ -187,34 +149,22 @@ def get_public_folder_content(folder_id):
     """获取公开文件夹的实时内容"""
     user_id = g.user['id']
     try:
-        # 获取文件夹
-        folder = FolderRepository.get_by_id(folder_id)
+        # 一次查询获取文件夹、创建者邮箱和所有卡片
+        folder = FolderRepository.get_with_cards(folder_id)
         if not folder or not folder['is_public']:
             return jsonify({'error': '公开文件夹不存在'}), 404
 
-        # 获取创建者邮箱
-        with get_db() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT email FROM users WHERE id = ?", (folder['user_id'],))
-            user_row = cursor.fetchone()
-            owner_email = user_row['email'] if user_row else 'Unknown'
-
-        # 获取文件夹内的所有卡片
-        cards = []
-        for card_id in folder['cards']:
-            card = WordcardRepository.get_by_id(folder['user_id'], card_id)
-            if card:
-                cards.append({
-                    'id': card['id'],
-                    'name': card['name'],
-                    'words': card['words'] or '',
-                    'color': card.get('color')  # 包含发布者的颜色配置
-                })
+        cards = [{
+            'id': card['id'],
+            'name': card['name'],
+            'words': card['words'] or '',
+            'color': card['color']  # 包含发布者的颜色配置
+        } for card in folder['card_list']]
 
         result = {
             'cards': cards,
             'folderName': folder['name'],
-            'ownerEmail': owner_email
+            'ownerEmail': folder['owner_email'] or 'Unknown'
         }
 
         print(f"[公开文件夹] 获取文件夹实时内容 ID: {folder_id}")
@@ -363,18 +313,10 @@ def check_folder_public_status():
 
         folder = FolderRepository.get_by_name(user_id, folder_name)
         if folder and folder['is_public']:
-            # 计算单词数
-            word_count = 0
-            for card_id in folder['cards']:
-                card = WordcardRepository.get_by_id(user_id, card_id)
-                if card and card['words']:
-                    words = [w.strip() for w in card['words'].split('\n') if w.strip()]
-                    word_count += len(words)
-
             return jsonify({
                 'isPublic': True,
                 'folderId': folder['id'],
-                'wordCount': word_count
+                'wordCount': folder['word_count']
             })
         else:
             return jsonify({'isPublic': False})
@@ -4,9 +4,15 @@
 """
 
 import json
+import math
+import time
+import threading
 from datetime import datetime
 from typing import Optional, Dict, List, Any, Tuple
 from db import get_db
+from cache import LRUCache
+from config import Config
+from utils import count_words
 
 
 class UserRepository:
@@ -75,7 +81,15 @@ class UserRepository:
 
 
 class SessionRepository:
-    """会话数据访问"""
+    """
+    会话数据访问
+    token -> 用户信息 带进程内缓存：缓存有效期不超过会话过期时间和 SESSION_CACHE_TTL，
+    删除会话时同步失效
+    """
+
+    _cache = LRUCache(Config.SESSION_CACHE_SIZE)
+    _lock = threading.Lock()
+    _generation = 0  # 每次删除会话加 1，防止并发查询把刚删除的会话写回缓存
 
     @staticmethod
     def create(user_id: int, token: str, expires_at: datetime) -> None:
@@ -87,19 +101,72 @@ class SessionRepository:
                 (user_id, token, expires_at.isoformat())
             )
 
-    @staticmethod
-    def delete_by_token(token: str) -> None:
+    @classmethod
+    def get_by_token(cls, token: str) -> Optional[Dict[str, Any]]:
+        """
+        根据 token 获取会话（带缓存）
+        返回 {'user_id', 'email', 'expires_at': datetime}，不存在返回 None；不检查是否过期
+        """
+        session = cls._cache.get(token)
+        if session is not None:
+            return session
+
+        generation = cls._generation
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT s.user_id, s.expires_at, u.email
+                FROM sessions s
+                JOIN users u ON s.user_id = u.id
+                WHERE s.token = ?
+            """, (token,))
+            row = cursor.fetchone()
+
+        if not row:
+            return None
+
+        session = {
+            'user_id': row['user_id'],
+            'email': row['email'],
+            'expires_at': datetime.fromisoformat(row['expires_at'])
+        }
+
+        # 缓存到会话过期或 TTL 上限（取较早者）；过期的会话不缓存
+        expires_at = min(session['expires_at'].timestamp(), time.time() + Config.SESSION_CACHE_TTL)
+        with cls._lock:
+            if expires_at > time.time() and generation == cls._generation:
+                cls._cache.put(token, session, expires_at=expires_at)
+        return session
+
+    @classmethod
+    def _invalidate(cls, tokens: List[str]) -> None:
+        """使缓存中的会话失效"""
+        with cls._lock:
+            cls._generation += 1
+            for token in tokens:
+                cls._cache.pop(token)
+
+    @classmethod
+    def delete_by_token(cls, token: str) -> None:
         """删除会话"""
         with get_db() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM sessions WHERE token = ?", (token,))
+        cls._invalidate([token])
 
-    @staticmethod
-    def delete_by_user_id(user_id: int) -> None:
+    @classmethod
+    def delete_by_user_id(cls, user_id: int) -> None:
         """删除用户的所有会话"""
         with get_db() as conn:
             cursor = conn.cursor()
-            cursor.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+            cursor.execute("DELETE FROM sessions WHERE user_id = ? RETURNING token", (user_id,))
+            tokens = [row['token'] for row in cursor.fetchall()]
+        cls._invalidate(tokens)
+
+    @classmethod
+    def cache_stats(cls) -> Dict[str, Any]:
+        """会话缓存统计"""
+        return cls._cache.stats()
 
 
 class ResetCodeRepository:
@@ -151,15 +218,15 @@ class WordcardRepository:
     """单词卡数据访问"""
 
     @staticmethod
-    def get_all_by_user(user_id: int) -> Dict[str, Dict[str, Any]]:
-        """获取用户的所有单词卡"""
+    def get_all_by_user(user_id: int, since: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """获取用户的所有单词卡（提供 since 时只返回版本号大于 since 的单词卡）"""
         with get_db() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT id, name, words, color, created_at, updated_at
                 FROM wordcards
-                WHERE user_id = ?
-            """, (user_id,))
+                WHERE user_id = ? AND version > ?
+            """, (user_id, -1 if since is None else since))
 
             wordcards = {}
             for row in cursor.fetchall():
@@ -179,7 +246,7 @@ class WordcardRepository:
         with get_db() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT id, name, words, color, created_at, updated_at
+                SELECT id, name, words, color, word_count, created_at, updated_at
                 FROM wordcards
                 WHERE user_id = ? AND id = ?
             """, (user_id, card_id))
@@ -193,6 +260,7 @@ class WordcardRepository:
                 'name': row['name'],
                 'words': row['words'],
                 'color': row['color'],
+                'word_count': row['word_count'],
                 'created': row['created_at'],
                 'updated': row['updated_at']
             }
@@ -210,6 +278,7 @@ class WordcardRepository:
         if created is None:
             created = datetime.now().isoformat()
         updated = datetime.now().isoformat()
+        word_count = count_words(words)
 
         with get_db() as conn:
             cursor = conn.cursor()
@@ -217,14 +286,15 @@ class WordcardRepository:
             if card_id:
                 # 场景 1：更新现有卡片（按 ID 定位，允许重命名）
                 cursor.execute("""
-                    INSERT INTO wordcards (id, user_id, name, words, color, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    INSERT INTO wordcards (id, user_id, name, words, word_count, color, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                     ON CONFLICT(id) DO UPDATE SET
                         name = excluded.name,
                         words = excluded.words,
+                        word_count = excluded.word_count,
                         color = excluded.color,
                         updated_at = excluded.updated_at
-                """, (card_id, user_id, name, words, color, created, updated))
+                """, (card_id, user_id, name, words, word_count, color, created, updated))
 
                 # 查询返回 ID
                 cursor.execute("SELECT id FROM wordcards WHERE id = ?", (card_id,))
@@ -233,19 +303,91 @@ class WordcardRepository:
             else:
                 # 场景 2：新建卡片（按 user_id+name 定位，ID 自动生成）
                 cursor.execute("""
-                    INSERT INTO wordcards (user_id, name, words, color, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
+                    INSERT INTO wordcards (user_id, name, words, word_count, color, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
                     ON CONFLICT(user_id, name) DO UPDATE SET
                         words = excluded.words,
+                        word_count = excluded.word_count,
                         color = excluded.color,
                         updated_at = excluded.updated_at
-                """, (user_id, name, words, color, created, updated))
+                """, (user_id, name, words, word_count, color, created, updated))
 
                 # 查询返回 ID
                 cursor.execute("SELECT id FROM wordcards WHERE user_id = ? AND name = ?", (user_id, name))
                 result = cursor.fetchone()
                 return result['id'] if result else None
 
+    @staticmethod
+    def save_many(user_id: int, cards: Dict[str, Dict[str, Any]]) -> None:
+        """
+        批量保存单词卡（{name: {id?, words, color, created}}），与 save 语义相同
+        - 带 ID 的按 ID 更新（允许重命名），其余按 (user_id, name) 新建或覆盖
+        - 内容未变化的卡片不会被改写
+        """
+        now = datetime.now().isoformat()
+        by_id = []
+        by_name = []
+        for name, card in cards.items():
+            created = card.get('created') or now
+            words = card.get('words', '')
+            if card.get('id'):
+                by_id.append((card['id'], user_id, name, words, count_words(words), card.get('color'), created, now))
+            else:
+                by_name.append((user_id, name, words, count_words(words), card.get('color'), created, now))
+
+        with get_db() as conn:
+            cursor = conn.cursor()
+            if by_id:
+                cursor.executemany("""
+                    INSERT INTO wordcards (id, user_id, name, words, word_count, color, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        name = excluded.name,
+                        words = excluded.words,
+                        word_count = excluded.word_count,
+                        color = excluded.color,
+                        updated_at = excluded.updated_at
+                    WHERE wordcards.user_id = excluded.user_id
+                      AND (wordcards.name IS NOT excluded.name
+                           OR wordcards.words IS NOT excluded.words
+                           OR wordcards.color IS NOT excluded.color)
+                """, by_id)
+            if by_name:
+                cursor.executemany("""
+                    INSERT INTO wordcards (user_id, name, words, word_count, color, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(user_id, name) DO UPDATE SET
+                        words = excluded.words,
+                        word_count = excluded.word_count,
+                        color = excluded.color,
+                        updated_at = excluded.updated_at
+                    WHERE wordcards.words IS NOT excluded.words
+                       OR wordcards.color IS NOT excluded.color
+                """, by_name)
+
+    @staticmethod
+    def update_colors(user_id: int, colors: Dict[int, str]) -> int:
+        """批量更新单词卡颜色，返回实际存在的卡片数量"""
+        if not colors:
+            return 0
+
+        with get_db() as conn:
+            cursor = conn.cursor()
+            ids = json.dumps(list(colors.keys()))
+            cursor.execute("""
+                SELECT COUNT(*) FROM wordcards
+                WHERE user_id = ? AND id IN (SELECT value FROM json_each(?))
+            """, (user_id, ids))
+            found = cursor.fetchone()[0]
+
+            cursor.executemany("""
+                UPDATE wordcards
+                SET color = ?, updated_at = ?
+                WHERE user_id = ? AND id = ? AND color IS NOT ?
+            """, [(color, datetime.now().isoformat(), user_id, card_id, color)
+                  for card_id, color in colors.items()])
+            return found
+
     @staticmethod
     def delete_by_id(user_id: int, card_id: int) -> None:
         """通过 ID 删除单词卡"""
@@ -261,15 +403,15 @@ class LayoutRepository:
     """布局配置数据访问"""
 
     @staticmethod
-    def get_by_user(user_id: int) -> Optional[List[str]]:
-        """获取用户的布局配置，返回 layout 数组"""
+    def get_by_user(user_id: int, since: Optional[int] = None) -> Optional[List[str]]:
+        """获取用户的布局配置，返回 layout 数组（提供 since 且未变更时返回 None）"""
         with get_db() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT layout, updated_at
                 FROM layout
-                WHERE user_id = ?
-            """, (user_id,))
+                WHERE user_id = ? AND version > ?
+            """, (user_id, -1 if since is None else since))
 
             row = cursor.fetchone()
             if not row:
@@ -298,11 +440,12 @@ class SettingsRepository:
     """用户设置数据访问"""
 
     @staticmethod
-    def get_by_user(user_id: int) -> Optional[Dict[str, Any]]:
-        """获取用户设置"""
+    def get_by_user(user_id: int, since: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """获取用户设置（提供 since 且未变更时返回 None）"""
         with get_db() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM user_settings WHERE user_id = ?", (user_id,))
+            cursor.execute("SELECT * FROM user_settings WHERE user_id = ? AND version > ?",
+                           (user_id, -1 if since is None else since))
             row = cursor.fetchone()
 
             if not row:
@@ -380,15 +523,15 @@ class FolderRepository:
     """文件夹数据访问"""
 
     @staticmethod
-    def get_all_by_user(user_id: int) -> Dict[str, Dict[str, Any]]:
-        """获取用户的所有文件夹"""
+    def get_all_by_user(user_id: int, since: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """获取用户的所有文件夹（提供 since 时只返回版本号大于 since 的文件夹）"""
         with get_db() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT id, name, cards, is_public, description, created_at, updated_at
                 FROM folders
-                WHERE user_id = ?
-            """, (user_id,))
+                WHERE user_id = ? AND version > ?
+            """, (user_id, -1 if since is None else since))
 
             folders = {}
             for row in cursor.fetchall():
@@ -409,7 +552,7 @@ class FolderRepository:
         with get_db() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT id, name, cards, is_public, description, created_at, updated_at
+                SELECT id, name, cards, is_public, description, word_count, created_at, updated_at
                 FROM folders
                 WHERE user_id = ? AND name = ?
             """, (user_id, name))
@@ -424,6 +567,7 @@ class FolderRepository:
                 'cards': json.loads(row['cards']),
                 'is_public': bool(row['is_public']),
                 'description': row['description'],
+                'word_count': row['word_count'],
                 'created': row['created_at'],
                 'updated': row['updated_at']
             }
@@ -434,7 +578,7 @@ class FolderRepository:
         with get_db() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT id, user_id, name, cards, is_public, description, created_at, updated_at
+                SELECT id, user_id, name, cards, is_public, description, word_count, created_at, updated_at
                 FROM folders
                 WHERE id = ?
             """, (folder_id,))
@@ -450,10 +594,57 @@ class FolderRepository:
                 'cards': json.loads(row['cards']),
                 'is_public': bool(row['is_public']),
                 'description': row['description'],
+                'word_count': row['word_count'],
                 'created': row['created_at'],
                 'updated': row['updated_at']
             }
 
+    @staticmethod
+    def get_with_cards(folder_id: int) -> Optional[Dict[str, Any]]:
+        """
+        根据ID获取文件夹及其全部卡片（一次 JOIN 查询，按文件夹内顺序）
+        card_list 只包含仍然存在的卡片：[{id, name, words, color, word_count}]
+        """
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT f.id, f.user_id, f.name, f.cards, f.is_public, f.description, f.word_count,
+                       f.created_at, f.updated_at, u.email AS owner_email,
+                       w.id AS card_id, w.name AS card_name, w.words AS card_words,
+                       w.color AS card_color, w.word_count AS card_word_count
+                FROM folders f
+                LEFT JOIN users u ON u.id = f.user_id
+                LEFT JOIN folder_cards fc ON fc.folder_id = f.id
+                LEFT JOIN wordcards w ON w.id = fc.card_id AND w.user_id = f.user_id
+                WHERE f.id = ?
+                ORDER BY fc.position
+            """, (folder_id,))
+
+            rows = cursor.fetchall()
+            if not rows:
+                return None
+
+            row = rows[0]
+            return {
+                'id': row['id'],
+                'user_id': row['user_id'],
+                'name': row['name'],
+                'cards': json.loads(row['cards']),
+                'is_public': bool(row['is_public']),
+                'description': row['description'],
+                'word_count': row['word_count'],
+                'owner_email': row['owner_email'],
+                'created': row['created_at'],
+                'updated': row['updated_at'],
+                'card_list': [{
+                    'id': r['card_id'],
+                    'name': r['card_name'],
+                    'words': r['card_words'],
+                    'color': r['card_color'],
+                    'word_count': r['card_word_count']
+                } for r in rows if r['card_id'] is not None]
+            }
+
     @staticmethod
     def save(user_id: int, name: str, cards: List[int], is_public: bool = False,
              description: str = None, created: str = None) -> int:
@@ -479,6 +670,87 @@ class FolderRepository:
             result = cursor.fetchone()
             return result['id'] if result else None
 
+    @staticmethod
+    def save_many(user_id: int, folders: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+        """
+        批量保存文件夹（{name: {cards, is_public, description, created}}），返回 {name: id}
+        内容未变化的文件夹不会被改写
+        """
+        now = datetime.now().isoformat()
+        rows = [
+            (user_id, name, json.dumps(folder.get('cards', [])), folder.get('is_public', False),
+             folder.get('description', ''), folder.get('created') or now, now)
+            for name, folder in folders.items()
+        ]
+
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT INTO folders (user_id, name, cards, is_public, description, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(user_id, name) DO UPDATE SET
+                    cards = excluded.cards,
+                    is_public = excluded.is_public,
+                    description = excluded.description,
+                    updated_at = excluded.updated_at
+                WHERE folders.cards IS NOT excluded.cards
+                   OR folders.is_public IS NOT excluded.is_public
+                   OR folders.description IS NOT excluded.description
+            """, rows)
+
+            cursor.execute("SELECT id, name FROM folders WHERE user_id = ?", (user_id,))
+            ids = {row['name']: row['id'] for row in cursor.fetchall()}
+            return {name: ids.get(name) for name in folders}
+
+    @staticmethod
+    def rename_many(user_id: int, renames: List[Tuple[int, str]]) -> None:
+        """按 ID 批量重命名文件夹（[(folder_id, new_name), ...]）"""
+        if not renames:
+            return
+
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                UPDATE folders
+                SET name = ?, updated_at = ?
+                WHERE user_id = ? AND id = ?
+            """, [(new_name, datetime.now().isoformat(), user_id, folder_id) for folder_id, new_name in renames])
+
+    @staticmethod
+    def delete_orphans(user_id: int, keep_names: List[str], keep_ids: List[int]) -> List[Tuple[int, str]]:
+        """删除名称和 ID 都不在保留列表中的文件夹，返回被删除的 [(id, name), ...]"""
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                DELETE FROM folders
+                WHERE user_id = ?
+                  AND name NOT IN (SELECT value FROM json_each(?))
+                  AND id NOT IN (SELECT value FROM json_each(?))
+                RETURNING id, name
+            """, (user_id, json.dumps(keep_names, ensure_ascii=False), json.dumps(keep_ids)))
+            return [(row['id'], row['name']) for row in cursor.fetchall()]
+
+    @staticmethod
+    def rename(user_id: int, folder_id: int, new_name: str) -> None:
+        """按 ID 重命名文件夹（保留 ID）"""
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE folders
+                SET name = ?, updated_at = ?
+                WHERE user_id = ? AND id = ?
+            """, (new_name, datetime.now().isoformat(), user_id, folder_id))
+
+    @staticmethod
+    def delete_by_id(user_id: int, folder_id: int) -> None:
+        """通过 ID 删除文件夹"""
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM folders WHERE user_id = ? AND id = ?",
+                (user_id, folder_id)
+            )
+
     @staticmethod
     def update_cards(user_id: int, name: str, cards: List[int]) -> None:
         """更新文件夹包含的卡片"""
@@ -501,82 +773,154 @@ class FolderRepository:
             )
 
     @staticmethod
-    def search_public(keyword: str, limit: int = 50) -> List[Dict[str, Any]]:
-        """搜索公开文件夹"""
+    def search_public(keyword: str, limit: int = 50,
+                      cursor_token: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        搜索公开文件夹（只返回非空文件夹），返回 (结果, 下一页游标)
+        两种匹配方式使用同一排序 (rank, id DESC) 和同一游标格式：
+        - 关键词不少于 3 个字符：FTS5 全文索引匹配名称和描述，rank 为 bm25 相关度（名称权重更高），
+          相关度相同时 ID 大者在前
+        - 更短的关键词（trigram 无法索引）：在索引表内做子串匹配，rank 恒为 0，即按 ID 从大到小（新建在前）
+        分页为键集分页：游标为上一页最后一条的 "rank:ID"，翻页不受偏移量影响
+        """
+        rank, last_id = None, None
+        if cursor_token:
+            try:
+                rank_text, id_text = cursor_token.rsplit(':', 1)
+                rank, last_id = float(rank_text), int(id_text)
+            except ValueError:
+                raise ValueError('无效的分页游标')
+            if not math.isfinite(rank):
+                raise ValueError('无效的分页游标')
+
+        if len(keyword) >= 3:
+            # 整个关键词作为一个短语匹配，转义其中的双引号
+            match_sql = "SELECT rowid AS id, bm25(folders_fts, 10.0, 1.0) AS rank FROM folders_fts WHERE folders_fts MATCH ?"
+            match_params = ['"' + keyword.replace('"', '""') + '"']
+        else:
+            # rank 恒为 0，排序和游标退化为只按 ID
+            escaped = keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            match_sql = """
+                SELECT rowid AS id, 0.0 AS rank FROM folders_fts
+                WHERE name LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\'
+            """
+            match_params = [f'%{escaped}%', f'%{escaped}%']
+
+        keyset = ""
+        keyset_params = []
+        if last_id is not None:
+            keyset = "AND (m.rank > ? OR (m.rank = ? AND m.id < ?))"
+            keyset_params = [rank, rank, last_id]
+
         with get_db() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT f.id, f.user_id, f.name, f.cards, f.description, f.created_at, f.is_public, u.email as owner_email
-                FROM folders f
+            cursor.execute(f"""
+                SELECT f.id, f.user_id, f.name, f.description, f.word_count, f.created_at,
+                       u.email AS owner_email, m.rank
+                FROM ({match_sql}) m
+                JOIN folders f ON f.id = m.id
                 JOIN users u ON f.user_id = u.id
-                WHERE f.is_public = TRUE AND (f.name LIKE ? OR f.description LIKE ?)
-                ORDER BY f.created_at DESC
+                WHERE f.is_public = TRUE AND f.word_count > 0 {keyset}
+                ORDER BY m.rank, m.id DESC
                 LIMIT ?
-            """, (f'%{keyword}%', f'%{keyword}%', limit))
+            """, match_params + keyset_params + [limit + 1])
+            rows = cursor.fetchall()
+
+        results = [{
+            'id': row['id'],
+            'user_id': row['user_id'],
+            'name': row['name'],
+            'description': row['description'],
+            'word_count': row['word_count'],
+            'created': row['created_at'],
+            'owner_email': row['owner_email']
+        } for row in rows[:limit]]
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = f"{last['rank']!r}:{last['id']}"
+        return results, next_cursor
 
-            results = []
-            for row in cursor.fetchall():
-                results.append({
-                    'id': row['id'],
-                    'user_id': row['user_id'],
-                    'name': row['name'],
-                    'cards': json.loads(row['cards']),
-                    'description': row['description'],
-                    'created': row['created_at'],
-                    'is_public': bool(row['is_public']),
-                    'owner_email': row['owner_email']
-                })
-            return results
+    @staticmethod
+    def get_public_words() -> List[Tuple[str, str]]:
+        """
+        所有公开文件夹中的单词（去重），返回 [(word, 所有者的学习语言)]
+        用于 TTS 缓存预热；卡片中 "单词:释义" 格式只取单词部分
+        """
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT DISTINCT w.words, COALESCE(s.target_lang, 'en') AS lang
+                FROM folders f
+                JOIN folder_cards fc ON fc.folder_id = f.id
+                JOIN wordcards w ON w.id = fc.card_id AND w.user_id = f.user_id
+                LEFT JOIN user_settings s ON s.user_id = f.user_id
+                WHERE f.is_public = TRUE
+            """)
+            rows = cursor.fetchall()
+
+        words = {}
+        for row in rows:
+            for line in (row['words'] or '').splitlines():
+                word = line.split(':', 1)[0].strip()
+                if word:
+                    words.setdefault((word, row['lang']), None)
+        return list(words)
 
 
 class PublicFolderRepository:
     """公开文件夹引用数据访问"""
 
     @staticmethod
-    def get_all_by_user(user_id: int) -> List[Dict[str, Any]]:
-        """获取用户添加的所有公开文件夹引用"""
+    def get_all_by_user(user_id: int, since: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        获取用户添加的所有公开文件夹引用（提供 since 时只返回版本号大于 since 的引用）
+        一次 JOIN 查询同时取出引用、文件夹状态和前 4 张预览卡片（避免 N+1 查询）
+        """
         with get_db() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT id, folder_id, owner_id, owner_name, display_name, created_at
-                FROM public_folders
-                WHERE user_id = ?
-            """, (user_id,))
+                SELECT pf.id, pf.folder_id, pf.owner_id, pf.owner_name, pf.display_name, pf.created_at,
+                       f.is_public, w.id AS card_id, w.name AS card_name, w.color AS card_color
+                FROM public_folders pf
+                LEFT JOIN folders f ON f.id = pf.folder_id
+                LEFT JOIN folder_cards fc ON fc.folder_id = f.id AND f.is_public AND fc.position < 4
+                LEFT JOIN wordcards w ON w.id = fc.card_id AND w.user_id = f.user_id
+                WHERE pf.user_id = ? AND pf.version > ?
+                ORDER BY pf.id, fc.position
+            """, (user_id, -1 if since is None else since))
 
             results = []
+            by_id = {}
             for row in cursor.fetchall():
-                # 获取文件夹的前 4 张卡片用于预览
-                folder = FolderRepository.get_by_id(row['folder_id'])
-
-                # 检测文件夹是否仍然存在且公开
-                is_invalid = not folder or not folder.get('is_public', False)
-
-                if is_invalid:
-                    print(f"[公开文件夹] 检测到失效引用: display_name={row['display_name']}, folder_id={row['folder_id']}")
-                    print(f"[Server] 检测到失效引用: display_name={row['display_name']}, folder_id={row['folder_id']}")
-
-                preview_cards = []
-                if folder and folder.get('cards') and not is_invalid:
-                    # 获取前 4 张卡片
-                    for card_id in folder['cards'][:4]:
-                        card = WordcardRepository.get_by_id(folder['user_id'], card_id)
-                        if card:
-                            preview_cards.append({
-                                'id': card['id'],
-                                'name': card['name'],
-                                'color': card.get('color')  # 包含发布者的颜色配置
-                            })
-
-                results.append({
-                    'id': row['id'],
-                    'folder_id': row['folder_id'],
-                    'owner_id': row['owner_id'],
-                    'owner_name': row['owner_name'],
-                    'display_name': row['display_name'],
-                    'created': row['created_at'],
-                    'preview_cards': preview_cards,  # 新增字段
-                    'isInvalid': is_invalid  # 新增失效标记
-                })
+                ref = by_id.get(row['id'])
+                if ref is None:
+                    # 检测文件夹是否仍然存在且公开
+                    is_invalid = not row['is_public']
+                    if is_invalid:
+                        print(f"[公开文件夹] 检测到失效引用: display_name={row['display_name']}, folder_id={row['folder_id']}")
+                        print(f"[Server] 检测到失效引用: display_name={row['display_name']}, folder_id={row['folder_id']}")
+
+                    ref = {
+                        'id': row['id'],
+                        'folder_id': row['folder_id'],
+                        'owner_id': row['owner_id'],
+                        'owner_name': row['owner_name'],
+                        'display_name': row['display_name'],
+                        'created': row['created_at'],
+                        'preview_cards': [],  # 前 4 张卡片用于预览
+                        'isInvalid': is_invalid  # 失效标记
+                    }
+                    by_id[row['id']] = ref
+                    results.append(ref)
+
+                if row['card_id'] is not None:
+                    ref['preview_cards'].append({
+                        'id': row['card_id'],
+                        'name': row['card_name'],
+                        'color': row['card_color']  # 包含发布者的颜色配置
+                    })
             return results
 
     @staticmethod
@@ -661,3 +1005,76 @@ class PublicFolderRepository:
                 (user_id, display_name)
             )
 
+
+
+class SyncSnapshotRepository:
+    """同步快照数据访问（/api/sync/pull 与 /api/sync/changes）"""
+
+    @staticmethod
+    def get_version(user_id: int) -> int:
+        """获取用户当前的同步版本号"""
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT version FROM sync_versions WHERE user_id = ?", (user_id,))
+            row = cursor.fetchone()
+            return row['version'] if row else 0
+
+    @staticmethod
+    def get_tombstone_floor(user_id: int) -> int:
+        """获取已清理墓碑的最大版本号（since 小于它的增量拉取可能缺少删除记录）"""
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT tombstone_floor FROM sync_versions WHERE user_id = ?", (user_id,))
+            row = cursor.fetchone()
+            return row['tombstone_floor'] if row else 0
+
+    @staticmethod
+    def get_deleted(user_id: int, since: int) -> Dict[str, List[int]]:
+        """获取版本号大于 since 的删除记录，按实体类型分组"""
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT entity, entity_id
+                FROM sync_tombstones
+                WHERE user_id = ? AND version > ?
+                ORDER BY version
+            """, (user_id, since))
+
+            deleted = {'wordcard': [], 'folder': [], 'public_folder': []}
+            for row in cursor.fetchall():
+                deleted.setdefault(row['entity'], []).append(row['entity_id'])
+            return deleted
+
+    @staticmethod
+    def load(user_id: int, since: Optional[int] = None) -> Dict[str, Any]:
+        """
+        在同一个连接、同一个读事务中加载拉取所需的全部数据
+        - since 为 None：全量数据
+        - since 为版本号：只包含之后变更的实体，以及 deleted 删除记录；
+          since 早于墓碑保留范围时只返回 resync 标记，由客户端全量拉取
+        返回的 settings/layout 可能为 None（不存在或未变更），由调用方处理
+        """
+        with get_db() as conn:
+            # 显式开启读事务，保证各表数据与版本号来自同一快照
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+
+            version = SyncSnapshotRepository.get_version(user_id)
+            if since is not None and since >= version:
+                return {'version': version, 'unchanged': True}
+            if since is not None and since < SyncSnapshotRepository.get_tombstone_floor(user_id):
+                return {'version': version, 'unchanged': False, 'resync': True}
+
+            # 以下仓储方法会复用当前连接（get_db 嵌套）
+            snapshot = {
+                'version': version,
+                'unchanged': False,
+                'wordcards': WordcardRepository.get_all_by_user(user_id, since),
+                'layout': LayoutRepository.get_by_user(user_id, since),
+                'folders': FolderRepository.get_all_by_user(user_id, since),
+                'publicFolders': PublicFolderRepository.get_all_by_user(user_id, since),
+                'settings': SettingsRepository.get_by_user(user_id, since)
+            }
+            if since is not None:
+                snapshot['deleted'] = SyncSnapshotRepository.get_deleted(user_id, since)
+            return snapshot
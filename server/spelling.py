@@ -0,0 +1,253 @@
+"""
+拼写建议模块（SymSpell 对称删除算法）
+由词典构建脚本（scripts/build_spelling.py）生成索引文件，服务端启动时以 mmap 只读映射，多个 worker 进程共享同一份页缓存
+
+- 离线：对每个候选词（英文查询键）的前 PREFIX_LENGTH 个字符，生成删除至多 MAX_EDIT_DISTANCE 个字符的
+  全部变体，按变体哈希排序写入数组；候选词按词频排序编号
+- 查询：对输入生成同样的删除变体，按哈希高位分桶直接定位到数组区间取回候选词，
+  再按词频顺序逐个计算真实编辑距离过滤、排序
+  哈希冲突和前缀截断只会多出候选，经编辑距离校验后不影响结果
+
+文件格式（小端）：文件头 + 桶偏移 + 变体哈希 + 候选词编号 + 候选词偏移 + 候选词文本
+  magic(4) 索引版本(2) 查询键版本(2) 分桶位数(2) 候选词数(4) 变体数(4) 源词条数(8)
+  数组均为 uint32；候选词文本为 UTF-8 的"查询键"或"查询键\t原词"（原词与查询键不同时）
+"""
+
+import math
+import mmap
+import os
+import struct
+import zlib
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+MAGIC = b'WPSS'
+# 拼写索引版本：修改文件格式、删除键生成规则或哈希时必须加 1，使已构建的索引失效
+SPELLING_INDEX_VERSION = 1
+_HEADER = struct.Struct('<4sHHHIIQ6x')
+# 最大编辑距离
+MAX_EDIT_DISTANCE = 2
+# 只对前 N 个字符生成删除变体（SymSpell 前缀优化：索引大小与词长无关，长词由编辑距离校验兜底）
+PREFIX_LENGTH = 7
+
+
+def delete_hash(key: str) -> int:
+    """删除变体的 32 位哈希（CRC32 足够分散，冲突由编辑距离校验排除）"""
+    return zlib.crc32(key.encode('utf-8'))
+
+
+def deletes(key: str, max_distance: int = MAX_EDIT_DISTANCE) -> Set[str]:
+    """键的前 PREFIX_LENGTH 个字符删除 0 ~ max_distance 个字符得到的全部变体（含前缀本身）"""
+    prefix = key[:PREFIX_LENGTH]
+    results = {prefix}
+    frontier = {prefix}
+    for _ in range(max_distance):
+        frontier = {s[:i] + s[i + 1:] for s in frontier if len(s) > 1 for i in range(len(s))} - results
+        results |= frontier
+    return results
+
+
+def delete_hashes(key: str, max_distance: int = MAX_EDIT_DISTANCE) -> Set[int]:
+    """删除变体的哈希集合"""
+    return {delete_hash(d) for d in deletes(key, max_distance)}
+
+
+def pattern_masks(key: str) -> Tuple[Dict[str, int], int]:
+    """edit_distance 的位并行预处理：每个字符在 key 中出现位置的位掩码，以及 key 的长度（同一 key 可复用）"""
+    masks = {}
+    for i, c in enumerate(key):
+        masks[c] = masks.get(c, 0) | (1 << i)
+    return masks, len(key)
+
+
+def edit_distance(a: str, b: str, max_distance: int = MAX_EDIT_DISTANCE,
+                  masks: Optional[Tuple[Dict[str, int], int]] = None) -> int:
+    """
+    受限 Damerau-Levenshtein 距离（插入、删除、替换、相邻字符交换各计 1）
+    超过 max_distance 时返回 max_distance + 1
+    masks 为 pattern_masks(a) 的结果，同一个 a 与多个词比较时传入以免重复计算
+
+    上限为 1 时只比较去掉公共前后缀后的不同部分；否则使用 Hyyrö 位并行算法，
+    每个字符只需若干次整数位运算，比逐格动态规划快数倍
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if a == b:
+        return 0
+
+    if max_distance <= 1:
+        # 距离为 1 时去掉公共前后缀后，不同的部分只能是一次替换、插入/删除或相邻交换
+        start = 0
+        while start < len(a) and start < len(b) and a[start] == b[start]:
+            start += 1
+        end_a, end_b = len(a), len(b)
+        while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+            end_a -= 1
+            end_b -= 1
+        diff_a, diff_b = a[start:end_a], b[start:end_b]
+        if len(diff_a) + len(diff_b) == 1 or (len(diff_a) == len(diff_b) and (
+                len(diff_a) == 1 or (len(diff_a) == 2 and diff_a == diff_b[::-1]))):
+            return min(1, max_distance + 1)
+        return max_distance + 1
+
+    if not a or not b:
+        return min(max(len(a), len(b)), max_distance + 1)
+
+    peq, length = masks or pattern_masks(a)
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    vp, vn, d0, pm_old = full, 0, 0, 0
+    distance = length
+    for c in b:
+        pm = peq.get(c, 0)
+        transposed = (((~d0) & pm) << 1) & pm_old
+        d0 = ((((pm & vp) + vp) ^ vp) | pm | vn | transposed) & full
+        hp = vn | (~(d0 | vp) & full)
+        hn = d0 & vp
+        if hp & last:
+            distance += 1
+        elif hn & last:
+            distance -= 1
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = hn | (~(d0 | hp) & full)
+        vn = hp & d0
+        pm_old = pm
+    return min(distance, max_distance + 1)
+
+
+def is_candidate(key: str) -> bool:
+    """是否作为拼写建议的候选词（至少 2 个字符，只含字母、撇号、连字符和空格）"""
+    return len(key) >= 2 and all(c.isalpha() or c in "'- " for c in key)
+
+
+class SpellingIndex:
+    """
+    拼写建议索引
+    - 构建：SpellingIndex.write(path, 按词频排序的 (查询键, 原词))
+    - 查询：SpellingIndex.load(path) 以 mmap 映射，suggest(key) 返回建议
+    """
+
+    def __init__(self, mapped, bucket_bits: int, num_terms: int, num_entries: int,
+                 key_version: int = 0, source_rows: int = 0):
+        self._mapped = mapped
+        self.bucket_bits = bucket_bits
+        self.num_terms = num_terms
+        self.num_entries = num_entries
+        self.key_version = key_version
+        self.source_rows = source_rows
+
+        offset = _HEADER.size
+        sections = []
+        for count in ((1 << bucket_bits) + 1, num_entries, num_entries, num_terms + 1):
+            sections.append(memoryview(mapped)[offset:offset + count * 4].cast('I'))
+            offset += count * 4
+        self._buckets, self._hashes, self._ids, self._offsets = sections
+        self._text_offset = offset
+
+    @staticmethod
+    def write(path, terms: Iterable[Tuple[str, str]], key_version: int = 0, source_rows: int = 0) -> Tuple[int, int]:
+        """
+        生成索引文件（先写临时文件再替换），返回 (候选词数, 变体数)
+        terms: (查询键, 原词)，按词频从高到低排列（编号即排名）
+        """
+        texts = []
+        entries = []
+        for term_id, (key, word) in enumerate(terms):
+            texts.append((key if word == key else f"{key}\t{word}").encode('utf-8'))
+            entries.extend((h << 32) | term_id for h in delete_hashes(key))
+        entries.sort()
+
+        # 平均每桶约 8 个变体
+        bucket_bits = min(24, max(8, math.ceil(math.log2(max(len(entries), 1) / 8))))
+        shift = 32 - bucket_bits
+        buckets = [0] * ((1 << bucket_bits) + 1)
+        for entry in entries:
+            buckets[(entry >> 32 >> shift) + 1] += 1
+        for i in range(1, len(buckets)):
+            buckets[i] += buckets[i - 1]
+
+        offsets = [0]
+        for text in texts:
+            offsets.append(offsets[-1] + len(text))
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, SPELLING_INDEX_VERSION, key_version, bucket_bits,
+                                 len(texts), len(entries), source_rows))
+            for values in (buckets, [e >> 32 for e in entries], [e & 0xFFFFFFFF for e in entries], offsets):
+                f.write(struct.pack(f'<{len(values)}I', *values))
+            f.write(b''.join(texts))
+        os.replace(tmp_path, path)
+        return len(texts), len(entries)
+
+    @classmethod
+    def load(cls, path) -> Optional['SpellingIndex']:
+        """以只读 mmap 映射索引文件，文件不存在或格式不符返回 None"""
+        try:
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        if len(mapped) < _HEADER.size:
+            mapped.close()
+            return None
+        magic, version, key_version, bucket_bits, num_terms, num_entries, source_rows = \
+            _HEADER.unpack_from(mapped, 0)
+        arrays_size = ((1 << bucket_bits) + 1 + num_entries * 2 + num_terms + 1) * 4
+        if magic != MAGIC or version != SPELLING_INDEX_VERSION or len(mapped) < _HEADER.size + arrays_size:
+            mapped.close()
+            return None
+        return cls(mapped, bucket_bits, num_terms, num_entries, key_version, source_rows)
+
+    def size_bytes(self) -> int:
+        """索引文件大小（字节）"""
+        return len(self._mapped)
+
+    def term(self, term_id: int) -> Tuple[str, str]:
+        """候选词的 (查询键, 原词)"""
+        start = self._text_offset + self._offsets[term_id]
+        end = self._text_offset + self._offsets[term_id + 1]
+        key, _, word = self._mapped[start:end].decode('utf-8').partition('\t')
+        return key, word or key
+
+    def candidates(self, key: str) -> List[int]:
+        """与 key 有公共删除变体的候选词编号（按词频从高到低）"""
+        buckets, hashes, ids = self._buckets, self._hashes, self._ids
+        shift = 32 - self.bucket_bits
+        found = set()
+        for h in delete_hashes(key):
+            lo, hi = buckets[h >> shift], buckets[(h >> shift) + 1]
+            if lo == hi:
+                continue
+            segment = hashes[lo:hi].tolist()
+            start = bisect_left(segment, h)
+            end = bisect_right(segment, h, start)
+            if start < end:
+                found.update(ids[lo + start:lo + end].tolist())
+        return sorted(found)
+
+    def suggest(self, key: str, limit: int, max_distance: int = MAX_EDIT_DISTANCE) -> List[str]:
+        """
+        key 的拼写建议（编辑距离 1 ~ max_distance，不含 key 本身），按编辑距离、词频排序
+        候选词按词频从高到低处理：已有 limit 个建议后，后面的词只有编辑距离更小才能入选，
+        以当前第 limit 个建议的距离减一为上限计算编辑距离（上限为 1 时只需线性比较）
+        """
+        if not key:
+            return []
+        masks = pattern_masks(key)
+        ranked = []     # [(编辑距离, 候选词编号, 原词)]
+        for term_id in self.candidates(key):
+            bound = ranked[-1][0] - 1 if len(ranked) >= limit else max_distance
+            if bound < 1:
+                break
+            term_key, word = self.term(term_id)
+            if term_key == key:
+                continue
+            distance = edit_distance(key, term_key, bound, masks)
+            if distance <= bound:
+                ranked.append((distance, term_id, word))
+                ranked.sort()
+                del ranked[limit:]
+        return [word for _, _, word in ranked]
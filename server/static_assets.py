@@ -0,0 +1,103 @@
+"""
+预构建静态资源模块
+读取 scripts/build_static.py 生成的 dist/manifest.json：
+- 带内容哈希的文件：按 Accept-Encoding 发送预压缩版本（br > gzip > 原文件），强 ETag + immutable
+- index.html：no-cache + ETag，每次协商，部署后立即生效
+源文件比构建更新时视为过期，回退到直接发送源文件
+"""
+
+import os
+import json
+import mimetypes
+from pathlib import Path
+from typing import Optional, Dict
+
+from flask import request, send_file
+
+from constants import STATIC_ASSET_MAX_AGE
+
+# 优先使用的编码顺序
+_ENCODING_PREFERENCE = ('br', 'gzip')
+_ENCODING_SUFFIX = {'br': '.br', 'gzip': '.gz'}
+
+
+class StaticAssets:
+    """预构建静态资源"""
+
+    def __init__(self, base_dir: str, dist_dir: str):
+        self.base_dir = Path(base_dir)
+        self.dist_dir = Path(dist_dir)
+        self.index = None
+        self.files = {}  # 带哈希的 URL 路径 -> 清单项
+
+    def load(self) -> bool:
+        """加载构建清单，不存在或已过期返回 False"""
+        manifest_path = self.dist_dir / 'manifest.json'
+        if not manifest_path.exists():
+            return False
+
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            print(f"⚠ 静态资源清单读取失败，使用源文件: {e}")
+            return False
+
+        stale = self._newest_source_mtime() > manifest.get('built_at', 0)
+        if stale:
+            print("⚠ 静态资源构建已过期（源文件有更新），使用源文件；运行 python scripts/build_static.py 重新构建")
+            return False
+
+        self.index = manifest['index']
+        self.files = {entry['path']: entry for entry in manifest['files'].values()}
+        print(f"✓ 预构建静态资源已加载: {len(self.files)} 个文件")
+        return True
+
+    def _newest_source_mtime(self) -> float:
+        """源文件（index.html、js/、css/）的最近修改时间"""
+        newest = os.path.getmtime(self.base_dir / 'index.html')
+        for folder in ('js', 'css'):
+            for root, dirs, files in os.walk(self.base_dir / folder):
+                newest = max(newest, os.path.getmtime(root))
+                for name in files:
+                    newest = max(newest, os.path.getmtime(os.path.join(root, name)))
+        return newest
+
+    def _send(self, entry: Dict, immutable: bool):
+        """按 Accept-Encoding 发送预压缩版本"""
+        encoding = None
+        for candidate in _ENCODING_PREFERENCE:
+            if candidate in entry['encodings'] and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+
+        path = self.dist_dir / (entry['path'] + _ENCODING_SUFFIX.get(encoding, ''))
+        mimetype = mimetypes.guess_type(entry['path'])[0] or 'application/octet-stream'
+        response = send_file(
+            path,
+            mimetype=mimetype,
+            conditional=True,
+            etag=f"{entry['hash']}-{encoding}" if encoding else entry['hash'],
+            max_age=STATIC_ASSET_MAX_AGE if immutable else 0
+        )
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if entry['encodings']:
+            response.vary.add('Accept-Encoding')
+        if immutable:
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response
+
+    def send_asset(self, filename: str):
+        """发送带哈希的静态文件，不是预构建文件返回 None"""
+        entry = self.files.get(filename.replace(os.sep, '/'))
+        if entry is None:
+            return None
+        return self._send(entry, immutable=True)
+
+    def send_index(self) -> Optional[object]:
+        """发送预构建的 index.html，未加载构建时返回 None"""
+        if self.index is None:
+            return None
+        return self._send(self.index, immutable=False)
@@ -9,7 +9,7 @@ from flask import Blueprint, request, jsonify, g
 
 from middleware import require_auth
 from settings import get_user_settings
-from repositories import WordcardRepository, LayoutRepository, FolderRepository, PublicFolderRepository
+from repositories import WordcardRepository, LayoutRepository, FolderRepository, PublicFolderRepository, SyncSnapshotRepository
 from db import get_db
 
 sync_bp = Blueprint('sync', __name__)
@@ -21,38 +21,39 @@ def pull_data():
     """
     拉取云端数据（只返回单词文本，不返回翻译数据）
     请求头: Authorization: Bearer <token>
-    响应: { wordcards: {...}, layout: {...}, cardColors: {id: color, ...} }
+    响应: { version: <int>, wordcards: {...}, layout: {...}, cardColors: {id: color, ...} }
+    version 可作为之后 /api/sync/changes?since= 的起点
     """
     user_id = g.user['id']
 
     try:
-        # 获取所有单词卡
-        wordcards = WordcardRepository.get_all_by_user(user_id)
-
-        # 获取布局配置
-        layout = LayoutRepository.get_by_user(user_id)
+        # 一次读事务加载单词卡、布局、文件夹、公开文件夹引用和设置
+        snapshot = SyncSnapshotRepository.load(user_id)
+        wordcards = snapshot['wordcards']
+        folders = snapshot['folders']
+        publicFolders = snapshot['publicFolders']
+        layout = snapshot['layout']
         if layout is None:
             layout = []
 
-        # 获取文件夹数据
-        folders = FolderRepository.get_all_by_user(user_id)
-
-        # 获取公开文件夹引用
-        publicFolders = PublicFolderRepository.get_all_by_user(user_id)
-
         # 从 wordcards 中提取 cardColors（键是单词卡 ID）
         card_colors = {}
         for name, wl in wordcards.items():
             if 'color' in wl and wl['color'] and 'id' in wl:
                 card_colors[wl['id']] = wl['color']  # 键是 ID
 
-        # 获取用户设置
-        settings = get_user_settings(user_id)
+        # 获取用户设置（不存在时创建默认设置）
+        settings = snapshot['settings']
+        version = snapshot['version']
+        if settings is None:
+            settings = get_user_settings(user_id)
+            version = SyncSnapshotRepository.get_version(user_id)
 
-        print(f"[Sync] 用户 {user_id} 拉取数据成功")
+        print(f"[Sync] 用户 {user_id} 拉取数据成功 (version={version})")
         print(f"[Sync] wordcards: {len(wordcards)}, folders: {len(folders)}, publicFolders: {len(publicFolders)}, layout: {len(layout)}")
 
         return jsonify({
+            'version': version,
             'wordcards': wordcards,
             'folders': folders,
             'publicFolders': publicFolders,
@@ -87,119 +88,64 @@ def push_data():
     print(f"[Sync] 用户 {user_id} 推送数据")
     print(f"[Sync] wordcards: {len(wordcards)}, folders: {len(folders)}")
 
-    try:
-        # 同步单词卡
-        for name, wl in wordcards.items():
-            created = wl.get('created', datetime.now().isoformat())
-            color = wl.get('color')
-            card_id = wl.get('id')  # 读取 ID
-            WordcardRepository.save(user_id, name, wl.get('words', ''), color, created, card_id)
-
-        # 【新增】同步 cardColors 到数据库（按 ID 更新）
-        # 当用户只修改颜色时，前端会推送 cardColors: {id: colorId}
-        if card_colors:
-            print(f"[Sync] 同步 cardColors: {len(card_colors)} 个颜色")
-            print(f"[服务器控制台] 同步 cardColors: {len(card_colors)} 个颜色")
-
-            # 获取已通过 wordcards 更新的卡片 ID（避免重复更新）
-            updated_card_ids = set()
-            for name, wl in wordcards.items():
-                if 'id' in wl:
-                    updated_card_ids.add(wl['id'])
-
-            for card_id_str, color_id in card_colors.items():
-                card_id = int(card_id_str)  # 前端传来的可能是字符串
-
-                # 如果已通过 wordcards 更新，跳过
-                if card_id in updated_card_ids:
-                    print(f"[Sync] 跳过已更新的卡片: ID={card_id}")
-                    continue
-
-                # 查询该卡片
-                card = WordcardRepository.get_by_id(user_id, card_id)
-                if card:
-                    # 更新颜色（保留原有的 words、name、created）
-                    WordcardRepository.save(
-                        user_id=user_id,
-                        name=card['name'],
-                        words=card['words'],
-                        color=color_id,
-                        created=card.get('created'),
-                        card_id=card_id
-                    )
-                    print(f"[Sync] 更新单词卡颜色: ID={card_id} -> {color_id}")
-                    print(f"[服务器控制台] 更新单词卡颜色: ID={card_id} -> {color_id}")
-                else:
-                    print(f"[Sync] 警告: 单词卡 ID={card_id} 不存在，无法更新颜色")
-                    print(f"[服务器控制台] 警告: 单词卡 ID={card_id} 不存在，无法更新颜色")
-
-        # 同步文件夹
-        folder_id_map = {}
+    # 先校验布局格式，避免写入一半后才发现请求无效
+    # 前端应该通过 adapter 转换为数组格式 ['card_1', 'folder_2', ...]
+    if layout is not None and not isinstance(layout, list):
+        if isinstance(layout, dict) and 'items' in layout:
+            # 如果收到对象格式，说明前端 adapter 未正确调用
+            print(f"[Sync] 错误: layout 是对象格式，前端应使用 adapter 转换")
+            print(f"[Sync] 收到的 layout: {layout}")
+            return jsonify({'error': 'Layout 格式错误，请更新客户端'}), 400
+        print(f"[Sync] 错误: layout 格式未知: {type(layout)}")
+        return jsonify({'error': 'Layout 格式错误'}), 400
 
-        # 步骤1: 检测并处理重命名（通过 ID 匹配）
-        db_folders = FolderRepository.get_all_by_user(user_id)
-        client_folder_ids_to_data = {}  # {id: folder_data}
-        for name, folder in folders.items():
-            if 'id' in folder:
-                client_folder_ids_to_data[folder['id']] = folder
-
-        # 检测重命名：ID 相同但名称不同
-        for db_name, db_folder in db_folders.items():
-            db_id = db_folder['id']
-            if db_id in client_folder_ids_to_data:
-                client_folder = client_folder_ids_to_data[db_id]
-                new_name = client_folder['name']
-                if new_name != db_name:
-                    # 重命名：直接 UPDATE 名称字段（保留 ID）
-                    with get_db() as conn:
-                        cursor = conn.cursor()
-                        cursor.execute("""
-                            UPDATE folders
-                            SET name = ?, updated_at = ?
-                            WHERE user_id = ? AND id = ?
-                        """, (new_name, datetime.now().isoformat(), user_id, db_id))
-                    print(f"[Sync] 检测到重命名: '{db_name}' -> '{new_name}' (ID={db_id})")
-                    print(f"[服务器控制台] 检测到重命名: '{db_name}' -> '{new_name}' (ID={db_id})")
-
-        # 步骤2: 保存所有文件夹（更新 cards、is_public 等其他字段）
-        for name, folder in folders.items():
-            cards = folder.get('cards', [])  # 已经是 ID 数组
-            is_public = folder.get('is_public', False)
-            description = folder.get('description', '')
-            created = folder.get('created', datetime.now().isoformat())
-            folder_id = FolderRepository.save(user_id, name, cards, is_public, description, created)
-            folder_id_map[name] = folder_id
-            print(f"[Sync] 保存文件夹: {name}, id: {folder_id}, cards: {cards}, is_public: {is_public}")
-
-        # 步骤3: 清理真正孤立的文件夹（不在前端数据中，且 ID 不匹配）
-        db_folders_after = FolderRepository.get_all_by_user(user_id)
-        client_folder_ids = set(f.get('id') for f in folders.values() if f.get('id'))
-        client_folder_names = set(folders.keys())
-
-        for db_name, db_folder in db_folders_after.items():
-            if db_name not in client_folder_names and db_folder['id'] not in client_folder_ids:
-                FolderRepository.delete(user_id, db_name)
-                print(f"[Sync] 已删除孤立文件夹: {db_name} (ID={db_folder['id']})")
-                print(f"[服务器控制台] 已删除孤立文件夹: {db_name} (ID={db_folder['id']})")
-
-        # 同步布局配置
-        if layout is not None:
-            # 前端应该通过 adapter 转换为数组格式 ['card_1', 'folder_2', ...]
-            if isinstance(layout, list):
-                # 正确的后端格式：['card_1', 'folder_2', ...]
+    try:
+        # 整个推送在一个事务中完成（仓储方法复用同一连接），失败时全部回滚
+        with get_db():
+            # 同步单词卡（批量 upsert）
+            WordcardRepository.save_many(user_id, wordcards)
+
+            # 同步 cardColors 到数据库（按 ID 更新）
+            # 当用户只修改颜色时，前端会推送 cardColors: {id: colorId}
+            if card_colors:
+                # 已通过 wordcards 更新的卡片跳过，避免重复更新
+                updated_card_ids = set(wl['id'] for wl in wordcards.values() if 'id' in wl)
+                colors = {int(card_id): color_id for card_id, color_id in card_colors.items()
+                          if int(card_id) not in updated_card_ids}  # 前端传来的可能是字符串
+                found = WordcardRepository.update_colors(user_id, colors)
+                print(f"[Sync] 同步 cardColors: {len(colors)} 个颜色（跳过 {len(card_colors) - len(colors)} 个已更新卡片）")
+                if found < len(colors):
+                    print(f"[Sync] 警告: {len(colors) - found} 张单词卡不存在，无法更新颜色")
+
+            # 同步文件夹
+            # 步骤1: 检测重命名（ID 相同但名称不同），按 ID 更新名称
+            db_folders = FolderRepository.get_all_by_user(user_id)
+            client_names_by_id = {folder['id']: folder.get('name', name) for name, folder in folders.items() if folder.get('id')}
+            renames = [(db_folder['id'], client_names_by_id[db_folder['id']])
+                       for db_name, db_folder in db_folders.items()
+                       if db_folder['id'] in client_names_by_id and client_names_by_id[db_folder['id']] != db_name]
+            FolderRepository.rename_many(user_id, renames)
+            for folder_id, new_name in renames:
+                print(f"[Sync] 检测到重命名: ID={folder_id} -> '{new_name}'")
+
+            # 步骤2: 保存所有文件夹（更新 cards、is_public 等其他字段）
+            folder_id_map = FolderRepository.save_many(user_id, folders)
+            print(f"[Sync] 保存文件夹: {len(folder_id_map)} 个")
+
+            # 步骤3: 清理真正孤立的文件夹（不在前端数据中，且 ID 不匹配）
+            deleted = FolderRepository.delete_orphans(user_id, list(folders.keys()), list(client_names_by_id.keys()))
+            for folder_id, name in deleted:
+                print(f"[Sync] 已删除孤立文件夹: {name} (ID={folder_id})")
+
+            # 同步布局配置
+            if layout is not None:
                 LayoutRepository.save(user_id, layout)
                 print(f"[Sync] 保存布局: {len(layout)} 项")
-            elif isinstance(layout, dict) and 'items' in layout:
-                # 如果收到对象格式，说明前端 adapter 未正确调用
-                print(f"[Sync] 错误: layout 是对象格式，前端应使用 adapter 转换")
-                print(f"[Sync] 收到的 layout: {layout}")
-                return jsonify({'error': 'Layout 格式错误，请更新客户端'}), 400
-            else:
-                print(f"[Sync] 错误: layout 格式未知: {type(layout)}")
-                return jsonify({'error': 'Layout 格式错误'}), 400
-
-        print(f"[Sync] 用户 {user_id} 推送数据成功")
-        return jsonify({'success': True, 'folderIdMap': folder_id_map})
+
+            version = SyncSnapshotRepository.get_version(user_id)
+
+        print(f"[Sync] 用户 {user_id} 推送数据成功 (version={version})")
+        return jsonify({'success': True, 'folderIdMap': folder_id_map, 'version': version})
     except Exception as e:
         print(f"[Sync] 推送数据失败: {e}")
         import traceback
@@ -207,6 +153,138 @@ def push_data():
         return jsonify({'error': '同步失败，请稍后重试'}), 500
 
 
+@sync_bp.route("/api/sync/changes", methods=["GET"])
+@require_auth
+def pull_changes():
+    """
+    增量拉取：只返回 since 版本之后的变更
+    请求头: Authorization: Bearer <token>
+    参数: since=<version>（来自上一次 pull/changes/push 响应的 version）
+    响应（无变更）: { version: <int>, unchanged: true }
+    响应（since 早于删除记录保留范围）: { version: <int>, unchanged: false, resync: true }，客户端应改用 /api/sync/pull
+    响应（有变更）: {
+        version, unchanged: false,
+        wordcards: {...}, folders: {...}, publicFolders: [...], cardColors: {...},
+        layout: [...]（仅变更时）, settings: {...}（仅变更时）,
+        deleted: { wordcard: [id...], folder: [id...], public_folder: [id...] }
+    }
+    客户端应先应用 deleted 再应用新增/更新（同一 ID 可能先删除后重建）
+    """
+    user_id = g.user['id']
+    since = request.args.get('since', type=int)
+    if since is None or since < 0:
+        return jsonify({'error': '缺少或无效的 since 参数'}), 400
+
+    try:
+        snapshot = SyncSnapshotRepository.load(user_id, since)
+        if snapshot['unchanged']:
+            return jsonify({'version': snapshot['version'], 'unchanged': True})
+        if snapshot.get('resync'):
+            print(f"[Sync] 用户 {user_id} 增量拉取 since={since} 早于删除记录保留范围，需全量同步")
+            return jsonify({'version': snapshot['version'], 'unchanged': False, 'resync': True})
+
+        wordcards = snapshot['wordcards']
+        card_colors = {wl['id']: wl['color'] for wl in wordcards.values() if wl.get('color')}
+
+        result = {
+            'version': snapshot['version'],
+            'unchanged': False,
+            'wordcards': wordcards,
+            'folders': snapshot['folders'],
+            'publicFolders': snapshot['publicFolders'],
+            'cardColors': card_colors,
+            'deleted': snapshot['deleted']
+        }
+        if snapshot['layout'] is not None:
+            result['layout'] = snapshot['layout']
+        if snapshot['settings'] is not None:
+            result['settings'] = snapshot['settings']
+
+        print(f"[Sync] 用户 {user_id} 增量拉取: {since} -> {snapshot['version']}, "
+              f"wordcards: {len(wordcards)}, folders: {len(snapshot['folders'])}")
+        return jsonify(result)
+    except Exception as e:
+        print(f"[Sync] 增量拉取失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': '同步失败，请稍后重试'}), 500
+
+
+@sync_bp.route("/api/sync/push/delta", methods=["POST"])
+@require_auth
+def push_delta():
+    """
+    增量推送：只提交发生变化的实体（在一个事务中应用）
+    请求头: Authorization: Bearer <token>
+    请求体: {
+        wordcards: { name: {id?, words, color, created}, ... },   // 新增或修改的单词卡
+        deletedWordcards: [id, ...],
+        folders: { name: {id?, name, cards, is_public, description, created}, ... },
+        deletedFolders: [id, ...],
+        layout: [...]                                               // 可选，变更时才提交
+    }
+    响应: { success: true, version: <int>, cardIdMap: {name: id}, folderIdMap: {name: id} }
+    """
+    user_id = g.user['id']
+    data = request.get_json() or {}
+
+    wordcards = data.get('wordcards') or {}
+    folders = data.get('folders') or {}
+    deleted_wordcards = data.get('deletedWordcards') or []
+    deleted_folders = data.get('deletedFolders') or []
+    layout = data.get('layout')
+
+    if layout is not None and not isinstance(layout, list):
+        return jsonify({'error': 'Layout 格式错误'}), 400
+
+    print(f"[Sync] 用户 {user_id} 增量推送: wordcards: {len(wordcards)}, folders: {len(folders)}, "
+          f"删除单词卡: {len(deleted_wordcards)}, 删除文件夹: {len(deleted_folders)}")
+
+    try:
+        card_id_map = {}
+        folder_id_map = {}
+
+        # 所有仓储调用复用同一连接，整体提交或回滚
+        with get_db():
+            for card_id in deleted_wordcards:
+                WordcardRepository.delete_by_id(user_id, int(card_id))
+
+            for name, wl in wordcards.items():
+                card_id_map[name] = WordcardRepository.save(
+                    user_id, name, wl.get('words', ''), wl.get('color'),
+                    wl.get('created', datetime.now().isoformat()), wl.get('id'))
+
+            for folder_id in deleted_folders:
+                FolderRepository.delete_by_id(user_id, int(folder_id))
+
+            for name, folder in folders.items():
+                # 带 ID 的文件夹先按 ID 重命名，再按名称保存其他字段（名称以 folder.name 为准，与全量推送一致）
+                folder_name = folder.get('name', name)
+                if folder.get('id'):
+                    FolderRepository.rename(user_id, folder['id'], folder_name)
+                folder_id_map[name] = FolderRepository.save(
+                    user_id, folder_name, folder.get('cards', []), folder.get('is_public', False),
+                    folder.get('description', ''), folder.get('created', datetime.now().isoformat()))
+
+            if layout is not None:
+                LayoutRepository.save(user_id, layout)
+
+            version = SyncSnapshotRepository.get_version(user_id)
+
+        print(f"[Sync] 用户 {user_id} 增量推送成功 (version={version})")
+        return jsonify({
+            'success': True,
+            'version': version,
+            'cardIdMap': card_id_map,
+            'folderIdMap': folder_id_map
+        })
+    except Exception as e:
+        print(f"[Sync] 增量推送失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': '同步失败，请稍后重试'}), 500
+
+
 @sync_bp.route("/api/sync/wordcard/by-id/<int:card_id>", methods=["DELETE"])
 @require_auth
 def delete_wordcard_by_id(card_id):
@@ -5,47 +5,56 @@
 
 import io
 import os
-import time
-import hashlib
 import requests
 from pathlib import Path
-from typing import Optional
-from flask import Blueprint, request, jsonify, send_file
-from constants import DICTVOICE_LANG_CODES, API_TIMEOUT_TTS
+from typing import Dict, List
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, jsonify, send_file, current_app
+from config import Config
+from middleware import require_auth
+from constants import (DICTVOICE_LANG_CODES, API_TIMEOUT_TTS, TTS_AUDIO_MAX_AGE, MAX_TTS_WARM_ITEMS,
+                       MAX_TTS_SPRITE_WORDS, SPRITE_MANIFEST_CACHE_SIZE)
+from audio_cache import AudioCache, make_cache_key
+from audio_sprite import make_sprite_key, build_sprite
+from upstream import UpstreamClient, SingleFlight
+from cache import LRUCache
 
 tts_bp = Blueprint('tts', __name__)
 
-# 缓存目录和过期时间
+# 缓存目录（按哈希分片，元数据索引见 audio_cache.py）
 CACHE_DIR = Path(__file__).parent.parent / 'cache' / 'audio'
-CACHE_EXPIRY = 3600  # 1小时
 
+audio_cache = AudioCache(
+    CACHE_DIR,
+    max_bytes=Config.TTS_CACHE_MAX_MB * 1024 * 1024,
+    ttl=Config.TTS_CACHE_TTL_DAYS * 86400
+)
 
-def _get_cache_path(text: str, accent: str, lang: str) -> Path:
-    """生成缓存文件路径"""
-    # 使用 MD5 避免文件名过长或包含特殊字符
-    cache_key = f"{text}:{accent}:{lang}"
-    hash_key = hashlib.md5(cache_key.encode()).hexdigest()
-    return CACHE_DIR / f"{hash_key}.mp3"
 
+# 上游客户端（共享连接池）和请求合并：同一音频的并发未命中只请求一次上游
+upstream = UpstreamClient(
+    pool_size=Config.TTS_UPSTREAM_POOL_SIZE,
+    max_concurrency=Config.TTS_UPSTREAM_CONCURRENCY,
+    retries=Config.TTS_UPSTREAM_RETRIES,
+    backoff=Config.TTS_UPSTREAM_BACKOFF
+)
+_inflight = SingleFlight()
 
-def _get_cached_audio(cache_path: Path) -> Optional[bytes]:
-    """获取缓存的音频，如果过期则返回 None"""
-    if not cache_path.exists():
-        return None
+# 缓存预热线程池（进程内共享，所有预热请求合计最多 TTS_WARM_WORKERS 个并发）
+_warm_pool = ThreadPoolExecutor(max_workers=Config.TTS_WARM_WORKERS, thread_name_prefix='tts-warm')
 
-    # 检查是否过期
-    file_age = time.time() - cache_path.stat().st_mtime
-    if file_age > CACHE_EXPIRY:
-        cache_path.unlink()  # 删除过期文件
-        return None
+# 雪碧图清单（雪碧图音频本身存放在 audio_cache 中，随字节预算一起淘汰）
+_sprite_manifests = LRUCache(SPRITE_MANIFEST_CACHE_SIZE)
 
-    return cache_path.read_bytes()
 
-
-def _save_cached_audio(cache_path: Path, audio_data: bytes):
-    """保存音频到缓存"""
-    cache_path.parent.mkdir(parents=True, exist_ok=True)
-    cache_path.write_bytes(audio_data)
+def get_tts_cache_stats() -> dict:
+    """TTS 缓存统计（命中率、节省的上游流量、占用空间、上游请求与合并次数）"""
+    return {
+        **audio_cache.stats(),
+        'upstream': upstream.stats(),
+        'singleflight': _inflight.stats()
+    }
 
 
 def _make_tts_request(url: str, timeout: int = API_TIMEOUT_TTS, error_prefix: str = "有道 TTS") -> bytes:
@@ -63,20 +72,14 @@ def _make_tts_request(url: str, timeout: int = API_TIMEOUT_TTS, error_prefix: st
     Raises:
         Exception: 请求失败时抛出异常
     """
-    try:
-        response = requests.get(url, timeout=timeout)
-        if response.ok:
-            return response.content
-        raise Exception(f"{error_prefix}请求失败: {response.status_code}")
-    except requests.exceptions.RequestException as e:
-        raise Exception(f"{error_prefix}网络错误: {str(e)}")
+    return upstream.get(url, timeout=timeout, error_prefix=error_prefix)
 
 
 def get_youdao_tts(text: str, accent: str = "us") -> bytes:
     """使用有道 TTS 获取英语语音（支持 US/UK 口音）"""
     # type=1 美式发音, type=2 英式发音
     voice_type = 2 if accent == "uk" else 1
-    url = f"https://dict.youdao.com/dictvoice?audio={requests.utils.quote(text)}&type={voice_type}"
+    url = f"{Config.TTS_UPSTREAM_URL}?audio={requests.utils.quote(text)}&type={voice_type}"
     return _make_tts_request(url, timeout=API_TIMEOUT_TTS, error_prefix="有道 TTS")
 
 
@@ -84,10 +87,10 @@ def get_youdao_multilang_tts(text: str, lang: str) -> bytes:
     """使用有道 dictvoice API 获取多语言语音"""
     le_code = DICTVOICE_LANG_CODES.get(lang)
     if le_code:
-        url = f"https://dict.youdao.com/dictvoice?audio={requests.utils.quote(text)}&le={le_code}"
+        url = f"{Config.TTS_UPSTREAM_URL}?audio={requests.utils.quote(text)}&le={le_code}"
     else:
         # 默认英语
-        url = f"https://dict.youdao.com/dictvoice?audio={requests.utils.quote(text)}&type=1"
+        url = f"{Config.TTS_UPSTREAM_URL}?audio={requests.utils.quote(text)}&type=1"
     return _make_tts_request(url, timeout=API_TIMEOUT_TTS, error_prefix="有道多语言 TTS")
 
 
@@ -95,13 +98,246 @@ def get_youdao_sentence_tts(text: str, lang: str = "en") -> bytes:
     """使用有道 dictvoice API 获取句子语音"""
     le_code = DICTVOICE_LANG_CODES.get(lang)
     if le_code:
-        url = f"https://dict.youdao.com/dictvoice?audio={requests.utils.quote(text)}&le={le_code}"
+        url = f"{Config.TTS_UPSTREAM_URL}?audio={requests.utils.quote(text)}&le={le_code}"
     else:
         # 英语句子
-        url = f"https://dict.youdao.com/dictvoice?audio={requests.utils.quote(text)}&type=1"
+        url = f"{Config.TTS_UPSTREAM_URL}?audio={requests.utils.quote(text)}&type=1"
     return _make_tts_request(url, timeout=API_TIMEOUT_TTS, error_prefix="有道句子 TTS")
 
 
+def _send_audio(source, cache_key: str):
+    """
+    发送音频：缓存命中时直接传文件路径（WSGI 服务器可用 sendfile 零拷贝发送）
+    ETag 由缓存键生成（强校验），支持 If-None-Match / Range，单词音频内容不变，标记 immutable
+    """
+    response = send_file(
+        source,
+        mimetype="audio/mpeg",
+        conditional=True,
+        etag=cache_key,
+        max_age=TTS_AUDIO_MAX_AGE
+    )
+    response.cache_control.immutable = True
+    return response
+
+
+def _not_modified(cache_key: str):
+    """浏览器已有该音频（If-None-Match 命中），无需读取缓存"""
+    response = current_app.response_class(status=304)
+    response.set_etag(cache_key)
+    response.cache_control.public = True
+    response.cache_control.max_age = TTS_AUDIO_MAX_AGE
+    response.cache_control.immutable = True
+    return response
+
+
+def _fetch_and_cache(word: str, accent: str, lang: str, is_sentence: bool, cache_key: str) -> bytes:
+    """请求上游获取音频并写入缓存（由 SingleFlight 保证同一 cache_key 同时只执行一次）"""
+    # 前一次合并请求可能刚刚写入缓存
+    cached_audio = audio_cache.get(cache_key, record_miss=False)
+    if cached_audio:
+        return cached_audio
+
+    # 句子使用 fanyivoice API
+    if is_sentence or len(word.split()) > 3:
+        audio_data = get_youdao_sentence_tts(word, lang)
+    # 英语单词使用 dictvoice API（支持 US/UK 口音）
+    elif lang == 'en':
+        audio_data = get_youdao_tts(word, accent)
+    # 其他语言使用 fanyivoice API
+    else:
+        audio_data = get_youdao_multilang_tts(word, lang)
+
+    # 保存到缓存
+    audio_cache.put(cache_key, audio_data)
+    print(f"[TTS Cache] 保存缓存: {word} ({lang}, {accent})")
+    return audio_data
+
+
+def _get_audio(word: str, accent: str, lang: str, is_sentence: bool, cache_key: str) -> bytes:
+    """获取音频（同一音频的并发未命中合并为一次上游请求）"""
+    return _inflight.do(cache_key, lambda: _fetch_and_cache(word, accent, lang, is_sentence, cache_key))
+
+
+def warm_tts(items: List[Dict]) -> List[Dict]:
+    """
+    批量预热 TTS 缓存（在共享线程池中并发执行）
+    items: [{'text', 'lang', 'accent', 'sentence'}]，lang 默认 en，accent 默认 us
+    返回每项的状态清单: [{'text', 'lang', 'accent', 'key', 'url', 'status': cached|fetched|error, 'error'?}]
+    """
+    manifest = []
+    for item in items:
+        text = str(item.get('text') or '').strip()
+        lang = item.get('lang') or 'en'
+        accent = item.get('accent') or 'us'
+        if accent != 'us' and lang != 'en':
+            accent = 'us'
+
+        entry = {'text': text, 'lang': lang, 'accent': accent}
+        if not text:
+            entry.update(status='error', error='缺少 text')
+        elif lang not in DICTVOICE_LANG_CODES:
+            entry.update(status='error', error=f'不支持的语言: {lang}')
+        else:
+            entry['key'] = make_cache_key(text, accent, lang)
+            entry['url'] = '/api/tts?' + urlencode({'word': text, 'accent': accent, 'lang': lang})
+            entry['sentence'] = bool(item.get('sentence'))
+        manifest.append(entry)
+
+    def warm(entry):
+        if audio_cache.contains(entry['key']):
+            entry['status'] = 'cached'
+            return
+        try:
+            _get_audio(entry['text'], entry['accent'], entry['lang'], entry['sentence'], entry['key'])
+            entry['status'] = 'fetched'
+        except Exception as e:
+            entry['status'] = 'error'
+            entry['error'] = str(e)
+
+    pending = [entry for entry in manifest if 'key' in entry]
+    list(_warm_pool.map(warm, pending))
+
+    for entry in pending:
+        entry.pop('sentence')
+    return manifest
+
+
+@tts_bp.route("/api/tts/warm", methods=["POST"])
+@require_auth
+def tts_warm():
+    """
+    批量预热 TTS 缓存（有界并发请求上游），返回每项状态和音频 URL
+    需要登录：单次请求最多触发 MAX_TTS_WARM_ITEMS 次上游请求并写入磁盘缓存
+    POST /api/tts/warm
+    请求头: Authorization: Bearer <token>
+    请求: { "items": [{ "text": "hello", "lang": "en", "accent": "us" }, ...] }
+    响应: { "results": [{ "text", "lang", "accent", "key", "url", "status" }], "summary": { "cached": n, "fetched": n, "error": n } }
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+    if not isinstance(items, list):
+        return jsonify({"error": "items 必须是数组"}), 400
+
+    # 过滤无效输入，限制单次最多 MAX_TTS_WARM_ITEMS 个
+    items = [item for item in items if isinstance(item, dict)][:MAX_TTS_WARM_ITEMS]
+    if not items:
+        return jsonify({"error": "无有效条目"}), 400
+
+    results = warm_tts(items)
+    summary = {'cached': 0, 'fetched': 0, 'error': 0}
+    for entry in results:
+        summary[entry['status']] += 1
+
+    print(f"[TTS Warm] {len(results)} 项: 已缓存 {summary['cached']}，新获取 {summary['fetched']}，失败 {summary['error']}")
+    return jsonify({'results': results, 'summary': summary})
+
+
+def get_card_sprite(words: List[str], lang: str, accent: str) -> Dict:
+    """
+    获取单词卡音频雪碧图清单（必要时先预热缺失的单词音频并拼接）
+    雪碧图键由各单词的缓存键生成，单词卡内容变化后自动对应新的雪碧图
+    """
+    if accent != 'us' and lang != 'en':
+        accent = 'us'
+    keys = [make_cache_key(word, accent, lang) for word in words]
+    sprite_key = make_sprite_key(keys)
+
+    sprite = _sprite_manifests.get(sprite_key)
+    if sprite is not None and audio_cache.contains(sprite_key):
+        return sprite
+
+    def build():
+        # 合并同一张卡的并发构建
+        if audio_cache.contains(sprite_key) and _sprite_manifests.get(sprite_key) is not None:
+            return _sprite_manifests.get(sprite_key)
+
+        manifest = warm_tts([{'text': word, 'lang': lang, 'accent': accent} for word in words])
+        parts = []
+        missing = []
+        for entry in manifest:
+            data = audio_cache.get(entry['key'], record_miss=False) if entry['status'] != 'error' else None
+            if data:
+                parts.append((entry['text'], data))
+            else:
+                missing.append(entry['text'])
+
+        data, items, invalid = build_sprite(parts)
+        result = {
+            'key': sprite_key,
+            'url': f'/api/tts/sprite/{sprite_key}',
+            'duration': round(sum(item['duration'] for item in items), 4),
+            'size': len(data),
+            'items': items,
+            'missing': missing + invalid
+        }
+        if data:
+            audio_cache.put(sprite_key, data)
+            _sprite_manifests.put(sprite_key, result)
+        print(f"[TTS Sprite] 生成雪碧图: {len(items)} 个单词，{len(data) / 1024:.1f} KB，缺失 {len(result['missing'])} 个")
+        return result
+
+    return _inflight.do(f'sprite:{sprite_key}', build)
+
+
+@tts_bp.route("/api/tts/sprite", methods=["POST"])
+@require_auth
+def tts_sprite():
+    """
+    单词卡音频雪碧图：整张卡的单词音频拼接为一个 MP3，客户端一次请求获取
+    需要登录：生成时最多触发 MAX_TTS_SPRITE_WORDS 次上游请求并写入磁盘缓存（获取已生成的雪碧图音频无需登录）
+    POST /api/tts/sprite
+    请求头: Authorization: Bearer <token>
+    请求: { "words": ["apple", "banana"], "lang": "en", "accent": "us" }
+    响应: { "key", "url", "duration", "size", "items": [{ "text", "offset", "duration", "byteOffset", "byteLength" }], "missing": [...] }
+    每段的字节区间是完整的 MP3 帧，可用 Blob.slice 切出单独播放
+    """
+    data = request.get_json(silent=True) or {}
+    words = data.get('words')
+    lang = data.get('lang', 'en')
+    accent = data.get('accent', 'us')
+
+    if not isinstance(words, list):
+        return jsonify({"error": "words 必须是数组"}), 400
+    if lang not in DICTVOICE_LANG_CODES:
+        return jsonify({"error": f"不支持的语言: {lang}"}), 400
+
+    # 过滤无效输入并去重，限制单次最多 MAX_TTS_SPRITE_WORDS 个
+    words = list(dict.fromkeys(w.strip() for w in words if isinstance(w, str) and w.strip()))[:MAX_TTS_SPRITE_WORDS]
+    if not words:
+        return jsonify({"error": "无有效单词"}), 400
+
+    try:
+        sprite = get_card_sprite(words, lang, accent)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    if not sprite['items']:
+        return jsonify({"error": "音频获取失败", "missing": sprite['missing']}), 502
+    return jsonify(sprite)
+
+
+@tts_bp.route("/api/tts/sprite/<sprite_key>", methods=["GET"])
+def tts_sprite_audio(sprite_key):
+    """
+    获取雪碧图音频（键即内容哈希，内容不变）
+    GET /api/tts/sprite/<key>
+    """
+    if len(sprite_key) != 32 or not all(c in '0123456789abcdef' for c in sprite_key):
+        return jsonify({"error": "无效的雪碧图"}), 404
+
+    if request.if_none_match.contains(sprite_key):
+        return _not_modified(sprite_key)
+
+    path = audio_cache.get_path(sprite_key)
+    if path is None:
+        return jsonify({"error": "雪碧图不存在或已过期，请重新生成"}), 404
+    try:
+        return _send_audio(path, sprite_key)
+    except FileNotFoundError:
+        return jsonify({"error": "雪碧图不存在或已过期，请重新生成"}), 404
+
+
 @tts_bp.route("/api/tts", methods=["GET"])
 def tts():
     """
@@ -128,34 +364,22 @@ def tts():
         # 非英语语言不支持非 US 口音，自动重置
         accent = 'us'
 
+    cache_key = make_cache_key(word, accent, lang)
+    if request.if_none_match.contains(cache_key):
+        return _not_modified(cache_key)
+
     # 检查缓存
-    cache_path = _get_cache_path(word, accent, lang)
-    cached_audio = _get_cached_audio(cache_path)
-    if cached_audio:
+    cached_path = audio_cache.get_path(cache_key)
+    if cached_path:
         print(f"[TTS Cache] 命中缓存: {word} ({lang}, {accent})")
-        return send_file(
-            io.BytesIO(cached_audio),
-            mimetype="audio/mpeg"
-        )
+        try:
+            return _send_audio(cached_path, cache_key)
+        except FileNotFoundError:
+            # 发送前恰好被淘汰，重新获取
+            pass
 
     try:
-        # 句子使用 fanyivoice API
-        if is_sentence or len(word.split()) > 3:
-            audio_data = get_youdao_sentence_tts(word, lang)
-        # 英语单词使用 dictvoice API（支持 US/UK 口音）
-        elif lang == 'en':
-            audio_data = get_youdao_tts(word, accent)
-        # 其他语言使用 fanyivoice API
-        else:
-            audio_data = get_youdao_multilang_tts(word, lang)
-
-        # 保存到缓存
-        _save_cached_audio(cache_path, audio_data)
-        print(f"[TTS Cache] 保存缓存: {word} ({lang}, {accent})")
-
-        return send_file(
-            io.BytesIO(audio_data),
-            mimetype="audio/mpeg"
-        )
+        audio_data = _get_audio(word, accent, lang, is_sentence, cache_key)
+        return _send_audio(io.BytesIO(audio_data), cache_key)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
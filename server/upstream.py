@@ -0,0 +1,145 @@
+"""
+上游 HTTP 请求模块
+- UpstreamClient: 共享 requests.Session（连接池 + keep-alive）、并发上限、抖动退避重试
+- SingleFlight: 同一键的并发请求合并为一次执行，其余调用方等待并共享结果
+"""
+
+import time
+import random
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 需要重试的状态码（限流、网关错误、服务暂不可用）
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class UpstreamError(Exception):
+    """上游请求失败（消息直接返回给前端）"""
+
+
+class UpstreamClient:
+    """
+    带连接池的上游 HTTP 客户端
+    - pool_size: 每个主机保持的最大连接数
+    - max_concurrency: 同时进行的上游请求上限，超出时等待
+    - retries: 失败后的重试次数（仅网络错误和 RETRY_STATUS_CODES）
+    - backoff: 退避基数（秒），第 n 次重试等待 [0, backoff * 2^n) 的随机时间
+    """
+
+    def __init__(self, pool_size: int = 16, max_concurrency: int = 8,
+                 retries: int = 2, backoff: float = 0.2):
+        self.retries = retries
+        self.backoff = backoff
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': 0,   # 实际发出的 HTTP 请求数（含重试）
+            'retries': 0,
+            'failures': 0,
+            'waits': 0       # 因并发上限而等待的次数
+        }
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def get(self, url: str, timeout: float, error_prefix: str = "上游") -> bytes:
+        """GET 请求，成功返回响应内容，失败抛出 UpstreamError"""
+        if not self._semaphore.acquire(blocking=False):
+            self._count('waits')
+            if not self._semaphore.acquire(timeout=timeout):
+                self._count('failures')
+                raise UpstreamError(f"{error_prefix}请求繁忙，请稍后重试")
+
+        try:
+            error = None
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    self._count('retries')
+                    time.sleep(random.uniform(0, self.backoff * (2 ** (attempt - 1))))
+
+                self._count('requests')
+                try:
+                    response = self._session.get(url, timeout=timeout)
+                except requests.exceptions.RequestException as e:
+                    error = UpstreamError(f"{error_prefix}网络错误: {str(e)}")
+                    continue
+
+                if response.ok:
+                    return response.content
+                error = UpstreamError(f"{error_prefix}请求失败: {response.status_code}")
+                if response.status_code not in RETRY_STATUS_CODES:
+                    break
+
+            self._count('failures')
+            raise error
+        finally:
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """请求统计"""
+        with self._lock:
+            return dict(self._stats)
+
+
+class _Call:
+    """一次进行中的调用"""
+
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    请求合并
+    同一 key 同时只有一个调用方（leader）执行 fn，其余调用方等待其完成并得到相同的结果或异常
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> _Call
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'coalesced': 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._stats['calls'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """合并统计"""
+        with self._lock:
+            return {**self._stats, 'in_flight': len(self._calls)}
@@ -83,3 +83,18 @@ def build_auth_response(user, token):
     }
 
 
+
+
+def count_words(words):
+    """
+    统计单词卡中的单词数（每行一个单词，忽略空行）
+
+    Args:
+        words: 单词卡内容
+
+    Returns:
+        int: 非空行数
+    """
+    if not words:
+        return 0
+    return sum(1 for line in words.split('\n') if line.strip())